@@ -0,0 +1,73 @@
+"""Benchmark TPlot construction time against the number of obstructions.
+
+Run from the repository root with
+
+    python benchmarks/tplot_construction.py
+
+Each row lays out a tiling of random obstructions, the cost every action pays
+when it creates a new plot.
+"""
+
+import argparse
+import random
+import timeit
+
+import pyglet
+
+pyglet.options["headless"] = True
+
+# pylint: disable=wrong-import-position
+from permuta import Perm  # noqa: E402
+from tilings import GriddedPerm, Tiling  # noqa: E402
+from tilingsgui.tplot import TPlot  # noqa: E402
+
+
+def random_gridded_perm(length: int, width: int, height: int) -> GriddedPerm:
+    """Create a random gridded permutation that fits in a grid of the given size."""
+    patt = list(range(length))
+    random.shuffle(patt)
+    cols = sorted(random.randrange(width) for _ in range(length))
+    rows = sorted(random.randrange(height) for _ in range(length))
+    return GriddedPerm(Perm(patt), [(cols[i], rows[patt[i]]) for i in range(length)])
+
+
+def random_tiling(obstructions: int, length: int, size: int) -> Tiling:
+    """Create a tiling with the given number of random obstructions."""
+    return Tiling(
+        obstructions=[
+            random_gridded_perm(length, size, size) for _ in range(obstructions)
+        ],
+        simplify=False,
+        derive_empty=False,
+        remove_empty_rows_and_cols=False,
+    )
+
+
+def main() -> None:
+    """Print the average construction time for growing obstruction counts."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--length", type=int, default=6, help="obstruction length")
+    parser.add_argument("--size", type=int, default=3, help="grid width and height")
+    parser.add_argument("--repeat", type=int, default=5, help="runs per row")
+    parser.add_argument(
+        "--counts",
+        type=int,
+        nargs="+",
+        default=[10, 100, 1000, 5000, 20000],
+        help="obstruction counts to measure",
+    )
+    args = parser.parse_args()
+    random.seed(0)
+    print(f"{'obstructions':>12} {'points':>9} {'ms':>10}")
+    for count in args.counts:
+        tiling = random_tiling(count, args.length, args.size)
+        seconds = min(
+            timeit.repeat(
+                lambda t=tiling: TPlot(t, 800, 600), number=1, repeat=args.repeat
+            )
+        )
+        print(f"{count:>12} {count * args.length:>9} {seconds * 1000:>10.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -18,7 +18,7 @@ def get_version():
 
 def get_install_requires():
     """Get install requirements."""
-    return ["pyperclip>=1.9.0", "pyglet>=2.0.0", "tilings>=2.5.0"]
+    return ["psutil>=5.8.0", "pyperclip>=1.9.0", "pyglet>=2.0.0", "tilings>=2.5.0"]
 
 
 setup(
@@ -0,0 +1,5 @@
+import pyglet
+
+# Plots are drawn without a window, which needs pyglet's headless mode to be set
+# before pyglet.window is first imported.
+pyglet.options["headless"] = True
@@ -0,0 +1,190 @@
+import itertools
+import json
+import sqlite3
+import time
+
+import pytest
+
+from tilings import Tiling
+from tilingsgui import files
+from tilingsgui.files import History, HistoryStore, PathManager, VerificationCache
+from tilingsgui.symmetry import SYMMETRIES, canonical_form
+
+
+def exported(tiling):
+    return json.loads(json.dumps(tiling.to_jsonable()))
+
+
+AV_12 = exported(Tiling.from_string("12"))
+AV_123 = exported(Tiling.from_string("123"))
+PLACED = exported(Tiling.from_string("12").place_point_in_cell((0, 0), 1))
+
+
+@pytest.fixture
+def store(tmp_path):
+    history = HistoryStore(tmp_path / "history.sqlite3")
+    yield history
+    history.close()
+
+
+def test_sessions_without_time_are_kept_apart(store):
+    store.add_session("a.json#0", "", [("2024-01-01 10:00:00", AV_12)])
+    store.add_session("b.json#0", "", [("2024-01-02 10:00:00", AV_123)])
+    assert store.count() == 2
+
+
+def test_adding_a_session_again_changes_nothing(store):
+    exports = [("2024-01-01 10:00:00", AV_12), ("2024-01-01 10:05:00", AV_123)]
+    store.add_session("a.jsonl", "2024-01-01 09:00:00", exports)
+    store.add_session("a.jsonl", "2024-01-01 09:00:00", exports)
+    assert store.count() == 2
+
+
+def test_tilings_are_stored_once(store):
+    store.add_session("a.jsonl", "2024-01-01", [("2024-01-01 10:00:00", AV_12)])
+    store.add_session(
+        "b.jsonl",
+        "2024-01-02",
+        [("2024-01-02 10:00:00", AV_123), ("2024-01-02 11:00:00", AV_12)],
+    )
+    assert store.count() == 3
+    assert [json.loads(text) for text in store.tilings()] == [AV_12, AV_123]
+
+
+def test_page_is_most_recent_first_and_filtered(store):
+    store.add_session(
+        "a.jsonl",
+        "2024-01-01 09:00:00",
+        [
+            ("2024-01-01 10:00:00", AV_12),
+            ("2024-01-01 12:00:00", PLACED),
+            ("2024-01-01 11:00:00", AV_123),
+        ],
+    )
+    entries = store.page(0, 10)
+    assert [entry.tiling_time for entry in entries] == [
+        "2024-01-01 12:00:00",
+        "2024-01-01 11:00:00",
+        "2024-01-01 10:00:00",
+    ]
+    assert entries[0].session_time == "2024-01-01 09:00:00"
+    assert entries[0].tiling == PLACED
+    assert [entry.tiling for entry in store.page(1, 1)] == [AV_123]
+    assert store.count(dimensions=(1, 1)) == 2
+    assert [entry.tiling for entry in store.page(0, 10, dimensions=(1, 1))] == [
+        AV_123,
+        AV_12,
+    ]
+    width, height = entries[0].dimensions
+    assert store.count(dimensions=(width, height)) == 1
+    assert store.count(obstructions=1) == 2
+
+
+def write_segment(directory, name, tiling_json):
+    path = directory / name
+    lines = [
+        {"session_time": "2024-01-01T09:00:00"},
+        {"tiling_time": "2024-01-01 10:00:00", "tiling": tiling_json},
+        {"session_time": "2024-01-01T09:00:00", "closed_time": "2024-01-01 11:00"},
+    ]
+    path.write_text("".join(json.dumps(line) + "\n" for line in lines))
+    return path
+
+
+def test_maintenance_skips_segments_it_cannot_move(tmp_path, monkeypatch):
+    monkeypatch.setattr(PathManager, "get_exports_abs_path", lambda: tmp_path)
+    directory = tmp_path / "history"
+    directory.mkdir()
+    gone = write_segment(directory, "session-1.jsonl", AV_12)
+    locked = write_segment(directory, "session-2.jsonl", AV_123)
+    moved = write_segment(directory, "session-3.jsonl", PLACED)
+    read_segment, add_session = History.read_segment, HistoryStore.add_session
+    close = HistoryStore.close
+
+    def read_moved_segment(path):
+        if path == gone:
+            # Another window moved it first.
+            path.unlink()
+        return read_segment(path)
+
+    def add_unless_locked(store, source, *args):
+        if source == locked.name:
+            raise sqlite3.OperationalError("database is locked")
+        add_session(store, source, *args)
+
+    closed = []
+
+    def record_close(store):
+        closed.append(store)
+        close(store)
+
+    monkeypatch.setattr(History, "read_segment", staticmethod(read_moved_segment))
+    monkeypatch.setattr(HistoryStore, "add_session", add_unless_locked)
+    monkeypatch.setattr(HistoryStore, "close", record_close)
+    History()._maintenance.join()
+    assert sorted(History.segments()) == [locked]
+    assert len(closed) == 1
+    assert not moved.exists()
+    store = HistoryStore()
+    assert [entry.tiling for entry in store.page(0, 10)] == [PLACED]
+    store.close()
+
+
+INSERTION = "InsertionEncodingVerificationStrategy"
+ONE_BY_ONE = "OneByOneVerificationStrategy"
+
+
+@pytest.fixture
+def cache(tmp_path):
+    verification_cache = VerificationCache(tmp_path / "verification.sqlite3")
+    yield verification_cache
+    verification_cache.close()
+
+
+def cached(verification_cache, tiling):
+    return verification_cache.get(tiling, canonical_form(tiling))
+
+
+def test_symmetric_strategies_share_results(cache):
+    tiling = Tiling.from_string("132")
+    cache.put(tiling, canonical_form(tiling), ONE_BY_ONE, True)
+    cache.put(tiling, canonical_form(tiling), INSERTION, False)
+    for sym in SYMMETRIES:
+        other = sym.tiling(tiling)
+        if other == tiling:
+            assert cached(cache, other) == {ONE_BY_ONE: True, INSERTION: False}
+        else:
+            assert cached(cache, other) == {ONE_BY_ONE: True}
+    assert cache.stats().tilings == 2
+
+
+def test_results_of_other_versions_are_not_used(tmp_path, monkeypatch):
+    path = tmp_path / "verification.sqlite3"
+    tiling = Tiling.from_string("123")
+    verification_cache = VerificationCache(path)
+    verification_cache.put(tiling, canonical_form(tiling), ONE_BY_ONE, True)
+    verification_cache.close()
+    monkeypatch.setattr(files.importlib.metadata, "version", lambda _: "0.0.0")
+    verification_cache = VerificationCache(path)
+    assert cached(verification_cache, tiling) == {}
+    verification_cache.put(tiling, canonical_form(tiling), ONE_BY_ONE, False)
+    assert cached(verification_cache, tiling) == {ONE_BY_ONE: False}
+    assert sorted(verification_cache.stats().by_version.values()) == [1, 1]
+    verification_cache.close()
+
+
+def test_least_recently_used_quarter_is_evicted(cache, monkeypatch):
+    clock = itertools.count()
+    monkeypatch.setattr(time, "time", lambda: float(next(clock)))
+    tilings = [
+        Tiling.from_string(basis)
+        for basis in ("12", "21", "123", "132", "213", "231", "312", "321")
+    ]
+    for tiling in tilings:
+        cache.put(tiling, canonical_form(tiling), INSERTION, True)
+    cached(cache, tilings[0])
+    cache._budget = 0
+    last = Tiling.from_string("1234")
+    cache.put(last, canonical_form(last), INSERTION, True)
+    kept = [tiling for tiling in (*tilings, last) if cached(cache, tiling)]
+    assert kept == [tilings[0], *tilings[3:], last]
@@ -0,0 +1,94 @@
+import random
+from array import array
+
+import pytest
+
+from tilingsgui.geometry import Point, PointStore, SpatialHash
+
+
+def closest_key(points, point, radius_squared):
+    keys = [
+        key
+        for key, (x, y) in points.items()
+        if point.dist_squared_to(Point(x, y)) <= radius_squared
+    ]
+    return min(keys, default=None)
+
+
+def test_spatial_hash_finds_across_buckets():
+    spatial_hash = SpatialHash(10)
+    spatial_hash.insert((0, 0), 9.5, 9.5)
+    assert spatial_hash.find(Point(10.5, 10.5), 2) == (0, 0)
+    assert spatial_hash.find(Point(10.5, 10.5), 1) is None
+
+
+def test_spatial_hash_prefers_smallest_key():
+    spatial_hash = SpatialHash(10)
+    spatial_hash.insert((1, 0), 0, 0)
+    spatial_hash.insert((0, 2), 3, 0)
+    spatial_hash.insert((0, 5), 1, 0)
+    assert spatial_hash.find(Point(1, 0), 16) == (0, 2)
+
+
+def test_spatial_hash_move_and_remove():
+    spatial_hash = SpatialHash(10)
+    spatial_hash.insert((0,), 5, 5)
+    spatial_hash.move((0,), 6, 6)
+    assert spatial_hash.find(Point(6, 6), 0) == (0,)
+    spatial_hash.move((0,), 45, 45)
+    assert spatial_hash.find(Point(6, 6), 100) is None
+    assert spatial_hash.find(Point(45, 45), 0) == (0,)
+    spatial_hash.remove((0,))
+    assert spatial_hash.find(Point(45, 45), 100) is None
+
+
+def test_spatial_hash_matches_linear_scan():
+    rng = random.Random(0)
+    spatial_hash = SpatialHash(8)
+    points = {}
+    for i in range(300):
+        key = (i % 7, i)
+        points[key] = (rng.uniform(-50, 50), rng.uniform(-50, 50))
+        spatial_hash.insert(key, *points[key])
+    for key in rng.sample(sorted(points), 100):
+        points[key] = (rng.uniform(-50, 50), rng.uniform(-50, 50))
+        spatial_hash.move(key, *points[key])
+    for key in rng.sample(sorted(points), 50):
+        del points[key]
+        spatial_hash.remove(key)
+    for _ in range(500):
+        point = Point(rng.uniform(-60, 60), rng.uniform(-60, 60))
+        radius_squared = rng.uniform(0, 64)
+        assert spatial_hash.find(point, radius_squared) == closest_key(
+            points, point, radius_squared
+        )
+
+
+def test_point_store_views():
+    store = PointStore([[Point(0, 1), Point(2, 3)], [], [Point(4, 5)]])
+    assert len(store) == 3
+    assert [len(path) for path in store] == [2, 0, 1]
+    assert list(store[-1][0]) == [4, 5]
+    assert [list(pnt) for pnt in store[0][:]] == [[0, 1], [2, 3]]
+    with pytest.raises(IndexError):
+        store[1][0]
+    with pytest.raises(IndexError):
+        store[3]
+
+
+def test_point_store_writes_through_views():
+    store = PointStore([[Point(0, 1)], [Point(2, 3), Point(4, 5)]])
+    store[1][0].x = 7
+    store[1][-1] = Point(8, 9)
+    assert list(store.xs) == [0, 7, 8]
+    assert list(store.ys) == [1, 3, 9]
+    assert store[1].coordinates() == (array("d", [7, 8]), array("d", [3, 9]))
+
+
+def test_point_store_scale_and_from_arrays():
+    store = PointStore.from_arrays(
+        array("d", [1, 2, 3]), array("d", [4, 5, 6]), array("q", [0, 1, 3])
+    )
+    store.scale(2, 0.5)
+    assert [list(pnt) for pnt in store[1]] == [[4, 2.5], [6, 3]]
+    assert list(store[0][0]) == [2, 2]
@@ -0,0 +1,26 @@
+import json
+
+from tilings import Tiling
+from tilingsgui.main import _read_tilings
+
+TILING = json.dumps(Tiling.from_string("123").to_jsonable())
+
+
+def test_read_tilings_passes_malformed_lines_on(tmp_path):
+    path = tmp_path / "tilings.jsonl"
+    path.write_text(
+        "\n".join(
+            [
+                TILING,
+                "{not json",
+                json.dumps({"session_time": "2024-01-01 10:00:00"}),
+                json.dumps({"input": 2, "error": "failed"}),
+                json.dumps({"input": 3, "tiling": json.loads(TILING)}),
+                "",
+                "[1, 2]",
+            ]
+        )
+        + "\n"
+    )
+    lines = [line.strip() for line in _read_tilings(path)]
+    assert lines == [TILING, "{not json", TILING, "[1, 2]"]
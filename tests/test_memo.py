@@ -0,0 +1,56 @@
+import sys
+
+from tilingsgui.memo import OperationMemo
+
+
+def key(i):
+    return OperationMemo.key("fusion", bytes([i]) * 16, (i, None))
+
+
+def size(i, value):
+    return sys.getsizeof(key(i)) + sys.getsizeof(value)
+
+
+def test_get_and_put():
+    memo = OperationMemo()
+    assert memo.get(key(0)) is None
+    memo.put(key(0), b"result")
+    assert memo.get(key(0)) == b"result"
+    assert memo.get(OperationMemo.key("fusion", bytes(16), (None, 0))) is None
+    stats = memo.stats()
+    assert (stats.hits, stats.misses, stats.entries) == (1, 2, 1)
+    assert stats.nbytes == size(0, b"result")
+
+
+def test_only_last_lookup_counts_a_miss():
+    memo = OperationMemo()
+    assert memo.get(key(0), last=False) is None
+    assert memo.stats().misses == 0
+
+
+def test_least_recently_used_are_dropped():
+    value = bytes(100)
+    memo = OperationMemo(3 * size(0, value))
+    for i in range(3):
+        memo.put(key(i), value)
+    assert memo.get(key(0)) == value
+    memo.put(key(3), value)
+    assert memo.get(key(1)) is None
+    assert all(memo.get(key(i)) == value for i in (0, 2, 3))
+    assert memo.stats().nbytes <= memo.stats().budget
+
+
+def test_replacing_a_result_keeps_the_size_right():
+    memo = OperationMemo()
+    memo.put(key(0), bytes(100))
+    memo.put(key(0), bytes(10))
+    assert memo.stats().entries == 1
+    assert memo.stats().nbytes == size(0, bytes(10))
+
+
+def test_results_over_budget_are_not_kept():
+    memo = OperationMemo(1000)
+    memo.put(key(0), bytes(10))
+    memo.put(key(1), bytes(2000))
+    assert memo.get(key(1)) is None
+    assert memo.get(key(0)) == bytes(10)
@@ -0,0 +1,84 @@
+import gzip
+import os
+
+import pytest
+
+from tilingsgui import oeis
+from tilingsgui.oeis import OeisIndex
+
+DUMP = """# OEIS stripped file
+A000027 ,1,2,3,4,5,6,7,8,9,10,11,12,
+A000045 ,0,1,1,2,3,5,8,13,21,34,55,89,
+A000108 ,1,1,2,5,14,42,132,429,1430,4862,16796,
+A000001 ,0,1,1,
+"""
+
+CHANGED_DUMP = """# OEIS stripped file
+A000142 ,1,1,2,6,24,120,720,5040,40320,
+"""
+
+
+def write_dump(path, text):
+    if path.suffix == ".gz":
+        with gzip.open(path, "wt") as dump_file:
+            dump_file.write(text)
+    else:
+        path.write_text(text)
+
+
+@pytest.fixture(params=["stripped", "stripped.gz"])
+def dump(request, tmp_path):
+    path = tmp_path / request.param
+    write_dump(path, DUMP)
+    return path
+
+
+def test_build_and_reload(dump, tmp_path, monkeypatch):
+    index = tmp_path / "oeis.idx"
+    assert OeisIndex(dump, index).search([1, 1, 2, 5, 14, 42]) == ["A000108"]
+    assert index.exists()
+
+    def fail(*_args):
+        raise AssertionError("the index was rebuilt")
+
+    monkeypatch.setattr(OeisIndex, "build", staticmethod(fail))
+    reloaded = OeisIndex(dump, index)
+    assert reloaded.is_current()
+    assert reloaded.search([0, 1, 1, 2, 3, 5, 8]) == ["A000045"]
+
+
+def test_rebuild_after_dump_changes(dump, tmp_path):
+    index = tmp_path / "oeis.idx"
+    old = OeisIndex(dump, index)
+    assert old.search([1, 2, 6, 24, 120]) == []
+    write_dump(dump, CHANGED_DUMP)
+    stat = dump.stat()
+    os.utime(dump, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+    assert not old.is_current()
+    assert OeisIndex(dump, index).search([1, 2, 6, 24, 120]) == ["A000142"]
+
+
+def test_search_rebuilds_stale_index(dump, tmp_path):
+    index = tmp_path / "oeis.idx"
+    assert oeis.search(str(dump), str(index), [1, 2, 6, 24, 120]) == []
+    write_dump(dump, CHANGED_DUMP)
+    stat = dump.stat()
+    os.utime(dump, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+    assert oeis.search(str(dump), str(index), [1, 2, 6, 24, 120]) == ["A000142"]
+
+
+def test_match_skips_leading_terms(dump, tmp_path):
+    index = OeisIndex(dump, tmp_path / "oeis.idx")
+    assert index.search([7, 1, 2, 5, 14, 42, 132]) == ["A000108"]
+    assert index.search([2, 5, 14, 42, 132, 429]) == ["A000108"]
+
+
+def test_no_match_for_short_query(dump, tmp_path):
+    index = OeisIndex(dump, tmp_path / "oeis.idx")
+    query = [1, 1, 2, 5, 14, 42][: OeisIndex.WINDOW - 1]
+    assert index.search(query) == []
+
+
+def test_short_sequences_are_skipped(dump, tmp_path):
+    index = OeisIndex(dump, tmp_path / "oeis.idx")
+    assert index.search([0, 1, 1, 2, 3]) == ["A000045"]
@@ -0,0 +1,71 @@
+import pytest
+
+from permuta import Perm
+from permuta.misc import DIR_NORTH
+from tilings import GriddedPerm, Tiling
+from tilings.algorithms import Factor, FactorWithInterleaving
+from tilings.assumptions import TrackingAssumption
+from tilingsgui import operations
+
+
+def placed_tiling():
+    tiling = Tiling.from_string("1324").add_single_cell_requirement(
+        Perm((0, 1)), (0, 0)
+    )
+    return tiling.place_point_of_gridded_permutation(
+        GriddedPerm.single_cell(Perm((0, 1)), (0, 0)), 1, DIR_NORTH
+    )
+
+
+def diagonal_tiling():
+    return Tiling(
+        obstructions=(
+            GriddedPerm(Perm((0, 1)), ((0, 0), (0, 0))),
+            GriddedPerm(Perm((1, 0)), ((1, 1), (1, 1))),
+            GriddedPerm(Perm((0, 1)), ((2, 2), (2, 2))),
+        ),
+        requirements=((GriddedPerm(Perm((0,)), ((2, 2),)),),),
+        assumptions=(
+            TrackingAssumption(
+                (
+                    GriddedPerm(Perm((0,)), ((0, 0),)),
+                    GriddedPerm(Perm((0,)), ((2, 2),)),
+                )
+            ),
+            TrackingAssumption((GriddedPerm(Perm((0,)), ((1, 1),)),)),
+        ),
+    )
+
+
+def empty_tiling():
+    return Tiling(
+        obstructions=(
+            GriddedPerm(Perm((0, 1)), ((0, 0), (0, 0))),
+            GriddedPerm(Perm((1, 0)), ((1, 1), (1, 1))),
+        ),
+        requirements=(
+            (GriddedPerm(Perm((0, 1)), ((0, 0), (0, 0))),),
+            (GriddedPerm(Perm((0,)), ((1, 1),)),),
+        ),
+        simplify=False,
+    )
+
+
+@pytest.mark.parametrize("make_tiling", [placed_tiling, diagonal_tiling, empty_tiling])
+@pytest.mark.parametrize(
+    "interleaving, algorithm", [(False, Factor), (True, FactorWithInterleaving)]
+)
+def test_factor_component_matches_factors(make_tiling, interleaving, algorithm):
+    tiling = make_tiling()
+    components = operations.factor_components(tiling, interleaving)
+    factors = algorithm(tiling).factors()
+    assert len(components) > 1
+    if tiling.is_empty():
+        # The empty tiling is the only factor, whichever cells are asked for.
+        factors = factors * len(components)
+    assert (
+        tuple(
+            operations.factor_component(tiling, component) for component in components
+        )
+        == factors
+    )
@@ -0,0 +1,50 @@
+import struct
+import zlib
+
+from tilingsgui.raster import Raster
+
+RED_COLOR, BLUE_COLOR = (1, 0, 0), (0, 0, 1)
+WHITE, RED, BLUE = b"\xff\xff\xff", b"\xff\x00\x00", b"\x00\x00\xff"
+
+
+def decode(png):
+    assert png[:8] == b"\x89PNG\r\n\x1a\n"
+    chunks, offset = {}, 8
+    while offset < len(png):
+        (length,) = struct.unpack(">I", png[offset : offset + 4])
+        kind = png[offset + 4 : offset + 8]
+        data = png[offset + 8 : offset + 8 + length]
+        (crc,) = struct.unpack(">I", png[offset + 8 + length : offset + 12 + length])
+        assert crc == zlib.crc32(kind + data)
+        chunks[kind] = data
+        offset += 12 + length
+    assert list(chunks) == [b"IHDR", b"IDAT", b"IEND"]
+    width, height, depth, color_type = struct.unpack(">IIBB", chunks[b"IHDR"][:10])
+    assert (depth, color_type) == (8, 2)
+    rows = zlib.decompress(chunks[b"IDAT"])
+    stride = 1 + 3 * width
+    assert len(rows) == height * stride
+    # Rows are stored from the top down, each after a filter byte.
+    return (
+        width,
+        height,
+        [rows[y * stride + 1 : (y + 1) * stride] for y in range(height)],
+    )
+
+
+def test_png_has_the_shapes():
+    raster = Raster(10, 6)
+    raster.add_rectangle(1, 1, 3, 2, RED_COLOR)
+    raster.add_circle(6, 3, 1.5, BLUE_COLOR, layer=1)
+    raster.add_rectangle(5, 0, 1, 6, RED_COLOR)
+    width, height, rows = decode(raster.to_png())
+    assert (width, height) == (10, 6)
+    for row, y in zip(rows, reversed(range(height))):
+        for x in range(width):
+            if (x + 0.5 - 6) ** 2 + (y + 0.5 - 3) ** 2 <= 1.5**2:
+                expected = BLUE
+            elif 1 <= x < 4 and 1 <= y < 3 or x == 5:
+                expected = RED
+            else:
+                expected = WHITE
+            assert row[3 * x : 3 * x + 3] == expected, (x, y)
@@ -0,0 +1,68 @@
+import json
+import re
+
+import pytest
+
+from permuta import Perm
+from permuta.misc import DIR_NORTH, DIR_WEST
+from tilings import Tiling
+from tilingsgui.script import ScriptError, parse, run, run_json
+
+
+def test_parse_steps():
+    steps = parse(
+        "row_and_column_separation; obstruction_inferral\n"
+        "# a comment\n"
+        "place_point 1,0 West 01 1  # trailing comment\n"
+        "fusion col 2; factor 0,1 interleaving\n"
+    )
+    assert [(step.name, step.args) for step in steps] == [
+        ("row_and_column_separation", ()),
+        ("obstruction_inferral", (3,)),
+        ("place_point", ((1, 0), Perm((0, 1)), 1, DIR_WEST)),
+        ("fusion", (None, 2)),
+        ("factor", ((0, 1), True)),
+    ]
+    assert steps[2].text == "place_point 1,0 West 01 1"
+
+
+def test_placement_defaults_to_a_point():
+    (step,) = parse("partial_place_point 0,0 north")
+    assert step.args == ((0, 0), Perm((0,)), 0, DIR_NORTH)
+
+
+@pytest.mark.parametrize(
+    "script, message",
+    [
+        ("", "no steps"),
+        ("# only a comment", "no steps"),
+        ("rotate", "unknown operation: rotate"),
+        ("fusion diagonal 1", "expected: fusion row|col INDEX"),
+        ("place_point 0,0 up", "expected: place_point X,Y"),
+        ("add_single_cell_requirement 01", "expected: add_single_cell_requirement"),
+        ("obstruction_transitivity now", "expected: obstruction_transitivity"),
+        ("factor 0,0 yes", "expected: factor X,Y [interleaving]"),
+    ],
+)
+def test_parse_errors(script, message):
+    with pytest.raises(ScriptError, match=re.escape(message)):
+        parse(script)
+
+
+def test_run_applies_steps_in_order():
+    tiling = Tiling.from_string("123")
+    steps = parse("add_single_cell_requirement 0 0,0; place_point 0,0 north")
+    expected = tiling.add_single_cell_requirement(Perm((0,)), (0, 0))
+    expected = expected.place_point_in_cell((0, 0), DIR_NORTH)
+    assert run(tiling, steps) == expected
+
+
+def test_run_json_reports_failing_step():
+    steps = parse("add_single_cell_obstruction 0 0,0; fusion row 0")
+    outcome = json.loads(
+        run_json(steps, (4, json.dumps(Tiling.from_string("12").to_jsonable())))
+    )
+    assert outcome["input"] == 4
+    assert outcome["step"] == "fusion row 0"
+    assert "tiling" not in outcome
+    assert outcome["error"]
@@ -0,0 +1,180 @@
+import pytest
+
+from permuta import Perm
+from permuta.misc import DIR_NORTH, DIR_WEST
+from tilings import GriddedPerm, Tiling
+from tilingsgui import memo, operations
+from tilingsgui.memo import OperationMemo
+from tilingsgui.symmetry import SYMMETRIES, canonical_form, hash_bytes
+
+
+def placed_tiling():
+    tiling = Tiling.from_string("1324").add_single_cell_requirement(
+        Perm((0, 1)), (0, 0)
+    )
+    return tiling.place_point_of_gridded_permutation(
+        GriddedPerm.single_cell(Perm((0, 1)), (0, 0)), 1, DIR_NORTH
+    )
+
+
+def increasing_rows():
+    cells = [(0, 0), (0, 1), (0, 2)]
+    return Tiling(
+        obstructions=[
+            GriddedPerm(Perm((1, 0)), (upper, lower))
+            for lower in cells
+            for upper in cells
+            if upper >= lower
+        ]
+    )
+
+
+def separable_row():
+    return Tiling(
+        obstructions=(
+            GriddedPerm(Perm((0, 1)), ((0, 0), (1, 0))),
+            GriddedPerm(Perm((1, 0)), ((0, 0), (0, 0))),
+            GriddedPerm(Perm((1, 0)), ((0, 0), (1, 0))),
+            GriddedPerm(Perm((0, 2, 1)), ((1, 0), (1, 0), (1, 0))),
+        )
+    )
+
+
+def transitive_row():
+    return Tiling(
+        obstructions=(
+            GriddedPerm(Perm((0, 1)), ((0, 0), (1, 0))),
+            GriddedPerm(Perm((0, 1)), ((1, 0), (2, 0))),
+        ),
+        requirements=((GriddedPerm(Perm((0,)), ((1, 0),)),),),
+    )
+
+
+CASES = [
+    (placed_tiling, "add_single_cell_requirement", (Perm((1, 0)), (0, 0))),
+    (placed_tiling, "add_single_cell_obstruction", (Perm((1, 0)), (2, 0))),
+    (
+        placed_tiling,
+        "place_point",
+        (GriddedPerm.single_cell(Perm((0, 1)), (0, 0)), 0, DIR_WEST),
+    ),
+    (
+        placed_tiling,
+        "partial_place_point",
+        (GriddedPerm.single_cell(Perm((0,)), (0, 0)), 0, DIR_NORTH),
+    ),
+    (placed_tiling, "factor", ((0, 2), False)),
+    (placed_tiling, "factor_component", (frozenset({(0, 0), (0, 2), (2, 0)}),)),
+    (placed_tiling, "obstruction_inferral", (3,)),
+    (transitive_row, "obstruction_transitivity", ()),
+    (separable_row, "row_and_column_separation", ()),
+    (increasing_rows, "fusion", (1, None)),
+    (increasing_rows, "component_fusion", (1, None)),
+]
+
+SHARED_CASES = [case for case in CASES if case[1] in operations.SYMMETRIC_OPERATIONS]
+
+
+def apply(name, tiling, args):
+    result = getattr(operations, name)(tiling, *args)
+    return result[0] if name == operations.factor.__name__ else result
+
+
+def test_inverse_undoes_symmetry():
+    tiling = placed_tiling()
+    for sym in SYMMETRIES:
+        assert sym.inverse().tiling(sym.tiling(tiling)) == tiling
+
+
+def test_symmetries_share_canonical_form():
+    tiling = placed_tiling()
+    forms = [canonical_form(sym.tiling(tiling)) for sym in SYMMETRIES]
+    assert len({form.digest for form in forms}) == 1
+    for sym, form in zip(SYMMETRIES, forms):
+        canonical_tiling = form.symmetry.tiling(sym.tiling(tiling))
+        assert hash_bytes(canonical_tiling.to_bytes()) == form.digest
+
+
+@pytest.mark.parametrize("make_tiling, name, args", SHARED_CASES)
+def test_operations_commute_with_symmetries(make_tiling, name, args):
+    tiling = make_tiling()
+    result = apply(name, tiling, args)
+    assert result is not None
+    map_args = operations.SYMMETRIC_OPERATIONS[name]
+    for sym in SYMMETRIES:
+        mapped = apply(name, sym.tiling(tiling), map_args(sym, tiling, args))
+        assert mapped == sym.tiling(result)
+
+
+def symmetric_results(make_tiling, name, args):
+    tiling = make_tiling()
+    func = getattr(operations, name)
+    map_args = operations.SYMMETRIC_OPERATIONS[name]
+    for sym in SYMMETRIES:
+        other = sym.tiling(tiling)
+        other_args = map_args(sym, tiling, args)
+        form = canonical_form(other)
+        run = memo.run(func, other, other_args, form.symmetry)
+        key = OperationMemo.symmetric_key(name, other, other_args, form)
+        yield sym, form, run, key
+
+
+@pytest.mark.parametrize("make_tiling, name, args", SHARED_CASES)
+def test_equal_keys_share_results(make_tiling, name, args):
+    result = apply(name, make_tiling(), args)
+    stored = {}
+    for sym, form, run, key in symmetric_results(make_tiling, name, args):
+        assert run.data == sym.tiling(result).to_bytes()
+        assert stored.setdefault(key, run.symmetric_data) == run.symmetric_data
+        restored = memo.restore(stored[key], form.symmetry)
+        assert restored.value == sym.tiling(result)
+        assert restored.data == run.data
+
+
+@pytest.mark.parametrize(
+    "make_tiling, name, args",
+    [case for case in SHARED_CASES if case[0] is placed_tiling],
+)
+def test_symmetries_share_one_key(make_tiling, name, args):
+    keys = {key for _, _, _, key in symmetric_results(make_tiling, name, args)}
+    assert len(keys) == 1
+
+
+@pytest.mark.parametrize(
+    "make_tiling, name, args",
+    [case for case in CASES if case not in SHARED_CASES],
+)
+def test_operations_that_do_not_commute_are_not_shared(make_tiling, name, args):
+    tiling = make_tiling()
+    result = apply(name, tiling, args)
+    assert any(
+        apply(name, sym.tiling(tiling), args) != sym.tiling(result)
+        for sym in SYMMETRIES
+    )
+    form = canonical_form(tiling)
+    assert OperationMemo.symmetric_key(name, tiling, args, form) is None
+    run = memo.run(getattr(operations, name), tiling, args, None)
+    assert run.data == result.to_bytes()
+    assert run.symmetric_data is None
+
+
+def test_other_operations_have_no_symmetric_key():
+    tiling = placed_tiling()
+    form = canonical_form(tiling)
+    assert (
+        OperationMemo.symmetric_key("count_gridded_perms", tiling, (3,), form) is None
+    )
+
+
+def test_memo_remembers_recent_forms(monkeypatch):
+    monkeypatch.setattr(OperationMemo, "_FORMS_SIZE", 2)
+    operation_memo = OperationMemo()
+    tiling = placed_tiling()
+    forms = [canonical_form(sym.tiling(tiling)) for sym in SYMMETRIES[:3]]
+    operation_memo.put_form(b"a", forms[0])
+    operation_memo.put_form(b"b", forms[1])
+    assert operation_memo.form(b"a") == forms[0]
+    operation_memo.put_form(b"c", forms[2])
+    assert operation_memo.form(b"b") is None
+    assert operation_memo.form(b"a") == forms[0]
+    assert operation_memo.form(b"c") == forms[2]
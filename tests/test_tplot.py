@@ -0,0 +1,44 @@
+import pathlib
+import random
+
+import pytest
+
+from permuta.misc import DIR_NORTH
+from tilings import Tiling
+from tilingsgui.state import GuiState
+from tilingsgui.tplot import TPlot, TPlotManager
+
+
+@pytest.fixture
+def manager():
+    tplot_manager = TPlotManager(400, 400, GuiState())
+    yield tplot_manager
+    tplot_manager.on_close()
+
+
+def history_bytes(tplot_manager):
+    return sum(snap.nbytes for deq in tplot_manager.deques for snap in deq)
+
+
+def test_undo_and_redo_keep_history_within_budget(manager):
+    for basis in ["1", "12", "1234567", "123", "7654321"]:
+        manager._add_tiling(Tiling.from_string(basis))
+    # Everything fits while the largest tiling is the current one, but undoing
+    # moves it into the history.
+    manager._history_budget = manager._history_bytes
+    for _ in range(3):
+        for _ in range(4):
+            manager.on_undo()
+            assert manager._history_bytes == history_bytes(manager)
+            assert manager._history_bytes <= manager._history_budget
+        for _ in range(4):
+            manager.on_redo()
+            assert manager._history_bytes == history_bytes(manager)
+            assert manager._history_bytes <= manager._history_budget
+
+
+def test_to_tikz():
+    random.seed(0)
+    tiling = Tiling.from_string("21").place_point_in_cell((0, 0), DIR_NORTH)
+    expected = pathlib.Path(__file__).parent.joinpath("data", "placed_point.tex")
+    assert TPlot(tiling, 200, 200).to_tikz() + "\n" == expected.read_text()
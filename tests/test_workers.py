@@ -0,0 +1,61 @@
+import time
+
+import pytest
+
+from tilingsgui.workers import Limits, TimeLimitExceededError, WorkerPool
+
+
+@pytest.fixture
+def pool():
+    worker_pool = WorkerPool(1)
+    yield worker_pool
+    worker_pool.close()
+
+
+def collect(worker_pool, timeout=30):
+    results = []
+    deadline = time.monotonic() + timeout
+    while worker_pool.pending() and time.monotonic() < deadline:
+        results.extend(worker_pool.poll())
+        time.sleep(0.01)
+    assert not worker_pool.pending()
+    return results
+
+
+def pid(worker_pool):
+    return worker_pool._workers[0]._process.pid
+
+
+def test_same_job_submitted_twice_comes_back_in_order(pool):
+    first = pool.submit(pow, 2, 10)
+    second = pool.submit(pow, 2, 10)
+    assert first != second
+    assert collect(pool) == [(first, 1024, None), (second, 1024, None)]
+
+
+def test_cancelling_a_queued_job(pool):
+    running = pool.submit(time.sleep, 0.2)
+    queued = pool.submit(pow, 2, 3)
+    pool.cancel(queued)
+    assert pool.pending() == 1
+    assert collect(pool) == [(running, None, None)]
+
+
+def test_cancelling_a_running_job(pool):
+    running = pool.submit(time.sleep, 60)
+    queued = pool.submit(pow, 2, 3)
+    old_pid = pid(pool)
+    pool.cancel(running)
+    assert pid(pool) != old_pid
+    assert collect(pool) == [(queued, 8, None)]
+
+
+def test_job_over_time_limit_is_stopped(pool):
+    slow = pool.submit(time.sleep, 60, limits=Limits(seconds=0.2))
+    old_pid = pid(pool)
+    ((job_id, value, error),) = collect(pool)
+    assert (job_id, value) == (slow, None)
+    assert isinstance(error, TimeLimitExceededError)
+    assert pid(pool) != old_pid
+    after = pool.submit(pow, 2, 3)
+    assert collect(pool) == [(after, 8, None)]
@@ -5,8 +5,11 @@ runs it.
 
 # pylint: disable=abstract-method
 
+import importlib
+import pathlib
 import sys
-from typing import ClassVar, Literal, Tuple
+import threading
+from typing import ClassVar, Dict, List, Literal, Optional, Tuple
 
 import pyglet
 
@@ -48,14 +51,17 @@ if sys.platform == "darwin" and sys.implementation.name == "pypy":
     sys.exit(1)
 
 # pylint: disable=wrong-import-position
-from .files import History, PathManager
-from .graphics import Color
+from .files import History, VerificationCache
+from .graphics import Color, Redrawable
+from .memo import OperationMemo
 from .menu import RightMenu, TopMenu
 from .state import GuiState
 from .tplot import TPlotManager
+from .utils import StartupReport
+from .workers import Limits
 
 
-class TilingGui(pyglet.window.Window):
+class TilingGui(pyglet.window.Window):  # pylint: disable=too-many-instance-attributes
     """The TilingsGui application."""
 
     _TITLE: ClassVar[str] = "Tilings GUI"
@@ -65,13 +71,34 @@ class TilingGui(pyglet.window.Window):
     _INITIAL_HEIGHT: ClassVar[int] = 1200
     _RIGHT_BAR_WIDTH: ClassVar[int] = 400
     _TOP_BAR_HEIGHT: ClassVar[int] = 50
+    _REDRAW_CHECK_INTERVAL: ClassVar[float] = 1 / 60
+    _DEFERRED_IMPORTS: ClassVar[Tuple[str, ...]] = ("tilings", "tilings.exception")
     _CLEAR_COLOR: ClassVar[Tuple[float, float, float, float]] = (
         Color.alpha_extend_and_scale_to_01(Color.WHITE)
     )
 
-    def __init__(self, init_tiling: str, *args, **kargs) -> None:
+    def __init__(
+        self,
+        init_tiling: str,
+        *args,
+        history_budget: int = TPlotManager.DEFAULT_HISTORY_BUDGET,
+        default_limits: Limits = TPlotManager.DEFAULT_LIMITS,
+        action_limits: Optional[Dict[str, Limits]] = None,
+        verification_cache_budget: int = VerificationCache.DEFAULT_BUDGET,
+        oeis_dump: Optional[pathlib.Path] = None,
+        memo_budget: int = OperationMemo.DEFAULT_BUDGET,
+        startup_report: Optional[StartupReport] = None,
+        **kargs,
+    ) -> None:
         """Instantiate the parent window class and create all
-        sub components and systems for the app.
+        sub components and systems for the app. The history budget is the most
+        bytes kept for undo and redo. The limits are the time and memory that
+        operations may use, for all operations and for specific ones by name. The
+        verification cache budget is the most bytes of verification results kept
+        between sessions, 0 turns the cache off. Printed sequences are looked up
+        in the OEIS dump, if one is given. The memo budget is the most bytes of
+        operation results remembered during the session. If given, the startup
+        report is told when the first frame is drawn and tilings has loaded.
         """
         super().__init__(
             TilingGui._INITIAL_WIDTH,
@@ -81,9 +108,6 @@ class TilingGui(pyglet.window.Window):
             **kargs,
         )
 
-        # Create a list of all directories pyglet should search for resources
-        pyglet.resource.path = [PathManager.as_string(PathManager.get_png_abs_path())]
-
         # The current state with initial values.
         self._state: GuiState = GuiState()
 
@@ -107,12 +131,32 @@ class TilingGui(pyglet.window.Window):
 
         # The tiling plot.
         self._tplot_man: TPlotManager = TPlotManager(
-            self.width, self.height, self._state, init_tiling=init_tiling
+            self.width,
+            self.height,
+            self._state,
+            init_tiling=init_tiling,
+            history_budget=history_budget,
+            default_limits=default_limits,
+            action_limits=action_limits,
+            verification_cache=(
+                VerificationCache(budget=verification_cache_budget)
+                if verification_cache_budget > 0
+                else None
+            ),
+            oeis_dump=oeis_dump,
+            memo_budget=memo_budget,
         )
 
         # export data handler.
         self._history: History = History()
 
+        # Components that are only redrawn when one of them has changed.
+        self._redrawables: List[Redrawable] = [
+            self._top_bar,
+            self._right_bar,
+            self._tplot_man,
+        ]
+
         # Add dispatchers. Order matters if events are consumed. Those that add
         # a dispatcher later will receive callbacks before.
         self._tplot_man.add_dispatchers([self, self._top_bar, self._right_bar])
@@ -120,10 +164,48 @@ class TilingGui(pyglet.window.Window):
         self._top_bar.add_dispatcher(self)
         self._right_bar.add_dispatcher(self)
 
+        self._startup_report: Optional[StartupReport] = startup_report
+        self._first_frame_drawn: bool = False
+
     def start(self) -> None:
-        """Start the app."""
+        """Start the app. Instead of redrawing at a fixed frame rate, the window is
+        only redrawn when a component reports that it has changed.
+        """
         self._initial_config()
-        pyglet.app.run()
+        pyglet.clock.schedule_interval(
+            self._redraw_if_dirty, TilingGui._REDRAW_CHECK_INTERVAL
+        )
+        pyglet.app.run(None)
+
+    def _redraw_if_dirty(self, dt: float) -> None:
+        """Redraw the window if any of its components have changed.
+
+        Args:
+            dt (float): The time since the last check.
+        """
+        if any(component.is_dirty() for component in self._redrawables):
+            self.draw(dt)
+            if not self._first_frame_drawn:
+                self._first_frame_drawn = True
+                if self._startup_report is not None:
+                    loaded = "loaded" if "tilings" in sys.modules else "not loaded"
+                    self._startup_report.mark(f"first frame (tilings {loaded})")
+                threading.Thread(target=self._load_tilings, daemon=True).start()
+
+    def _load_tilings(self) -> None:
+        """Import tilings, which the window does not need until the first tiling is
+        shown. Runs in a background thread after the first frame, so that the
+        first action does not wait for it.
+        """
+        for module in TilingGui._DEFERRED_IMPORTS:
+            importlib.import_module(module)
+        if self._startup_report is not None:
+            self._startup_report.mark("tilings loaded")
+
+    def _mark_all_dirty(self) -> None:
+        """Force a full redraw on the next check."""
+        for component in self._redrawables:
+            component.mark_dirty()
 
     def _initial_config(self) -> None:
         """Configuration done before starting."""
@@ -162,6 +244,13 @@ class TilingGui(pyglet.window.Window):
             width - TilingGui._RIGHT_BAR_WIDTH, height - TilingGui._TOP_BAR_HEIGHT
         )
         self._right_bar.position(width - TilingGui._RIGHT_BAR_WIDTH, height)
+        self._mark_all_dirty()
 
         # on_resize is not handle anywhere else, so we can stop looking for handlers.
         return True
+
+    def on_expose(self) -> None:
+        """Event handler for when the window is uncovered and needs to be
+        redrawn by the application.
+        """
+        self._mark_all_dirty()
@@ -1,15 +1,43 @@
 """A collection of file and path related functionality."""
 
+from __future__ import annotations
+
+import datetime
+import hashlib
+import importlib.metadata
 import json
+import os
 import pathlib
 import shutil
-from typing import Any, ClassVar, Dict, Iterable, List
-
+import sqlite3
+import threading
+import time
+from itertools import chain
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    ClassVar,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    NamedTuple,
+    Optional,
+    TextIO,
+    Tuple,
+)
+
+import psutil
 import pyglet
 
 from .events import Observer
+from .operations import SYMMETRIC_STRATEGIES
+from .symmetry import CanonicalForm
 from .utils import get_current_time_string
 
+if TYPE_CHECKING:
+    from tilings import Tiling
+
 
 class PathManager:
     """A collection of functions to fetch various paths."""
@@ -75,32 +103,43 @@ class PathManager:
 
 
 class History(Observer):
-    """A class that handles loading and saving exported tilings."""
-
-    _MAX_SESSIONS: ClassVar[int] = 10
-    _FILE_NAME: ClassVar[str] = "history.json"
+    """A class that handles saving exported tilings. Each session that exports
+    tilings gets its own segment in the history directory, a JSON lines file
+    whose first line describes the session and each following line an exported
+    tiling. Exports are appended as they happen, so they survive a crash. The
+    segments of sessions that have ended are moved into the history store in the
+    background when the next session starts. A session has ended when it has
+    written its closing line, or when the process that wrote its first line is no
+    longer running, so the segments of other open windows are left alone.
+    """
+
+    _SYNC_DELAY: ClassVar[float] = 2.0
+    _DIR_NAME: ClassVar[str] = "history"
+    _LEGACY_FILE_NAME: ClassVar[str] = "history.json"
+    _SEGMENT_PATTERN: ClassVar[str] = "session-*.jsonl"
     _SESSION_TIME: ClassVar[str] = "session_time"
+    _CLOSED_TIME: ClassVar[str] = "closed_time"
+    _PID: ClassVar[str] = "pid"
+    _PROCESS_STARTED: ClassVar[str] = "process_started"
+    # How far apart the start times of a process may be and still be the same.
+    _PROCESS_STARTED_TOLERANCE: ClassVar[float] = 1.0
     _TILINGS: ClassVar[str] = "tilings"
     _TILING_TIME: ClassVar[str] = "tiling_time"
     _TILING: ClassVar[str] = "tiling"
 
     @staticmethod
-    def _get_empty_session_object() -> Dict[str, Any]:
-        """Create an empty session json object.
-
-        Returns:
-            Dict[str, Any]: A dictionary for a session.
-        """
-        return {History._SESSION_TIME: get_current_time_string(), History._TILINGS: []}
-
-    @staticmethod
-    def _get_empty_json_object() -> List[Dict[str, Any]]:
-        """Create an empty history json object.
+    def segments() -> List[pathlib.Path]:
+        """Find the segments that have not been moved into the history store,
+        including the current session's.
 
         Returns:
-            List[Dict[str, Any]]: A list with a single empty session.
+            List[pathlib.Path]: The segments, oldest first.
         """
-        return [History._get_empty_session_object()]
+        return sorted(
+            PathManager.get_exports_abs_path()
+            .joinpath(History._DIR_NAME)
+            .glob(History._SEGMENT_PATTERN)
+        )
 
     @staticmethod
     def _create_tiling_entry(tiling_json: dict) -> Dict[str, Any]:
@@ -120,9 +159,10 @@ class History(Observer):
     def __init__(
         self, dispatchers: Iterable[pyglet.event.EventDispatcher] = ()
     ) -> None:
-        """Creates exports folder and file if they don't exists. If they
-        do exists, the files content is loaded and used if valid JSON. If
-        not, we start with a fresh one.
+        """Creates the history directory if it does not exist. The history is not
+        read. The segments of earlier sessions, and a history file in the old
+        format, a single JSON array, are moved into the history store in the
+        background.
 
         Args:
             dispatchers (Iterable[pyglet.event.EventDispatcher]): All dispatchers that
@@ -130,32 +170,49 @@ class History(Observer):
         """
         super().__init__(dispatchers)
         export_path = PathManager.get_exports_abs_path()
-        export_path.mkdir(parents=True, exist_ok=True)
-
-        self._path: pathlib.Path = export_path.joinpath(History._FILE_NAME)
-        self._data: List[Dict[str, Any]] = self._get_history_data()
+        self._dir: pathlib.Path = export_path.joinpath(History._DIR_NAME)
+        self._dir.mkdir(parents=True, exist_ok=True)
+        now = datetime.datetime.now()
+        self._session_time: str = now.isoformat()
+        self._path: pathlib.Path = self._dir.joinpath(
+            f"session-{now:%Y%m%dT%H%M%S%f}.jsonl"
+        )
+        self._file: Optional[TextIO] = None
+        self._maintenance: threading.Thread = threading.Thread(
+            target=self._maintain,
+            args=(export_path.joinpath(History._LEGACY_FILE_NAME),),
+            daemon=True,
+        )
+        self._maintenance.start()
 
     def on_close(self) -> bool:
-        """A handler for the closing of the window event. If any exports have occurred
-        this session, add them to the history file. There is a session limit so in case
-        the limit is reacehed, the oldest one is removed.
+        """A handler for the closing of the window event. Marks this session's
+        segment as closed, makes sure it is on disk and places a copy of it in the
+        current working directory.
 
         Returns:
             bool: False as we do not want to consume this event.
         """
-        if self._session_has_export():
-            with open(self._path.as_posix(), "w", encoding="utf-8") as history_file:
-                if len(self._data) > History._MAX_SESSIONS:
-                    json.dump(self._data[1:], history_file)
-                else:
-                    json.dump(self._data, history_file)
+        self._maintenance.join()
+        if self._file is not None:
+            self._write(
+                {
+                    History._SESSION_TIME: self._session_time,
+                    History._CLOSED_TIME: get_current_time_string(),
+                }
+            )
+            self._sync()
+            self._file.close()
+            self._file = None
             shutil.copy(
-                self._path.as_posix(), f"{pathlib.Path.cwd()}/tilings_export.json"
+                self._path.as_posix(), f"{pathlib.Path.cwd()}/tilings_export.jsonl"
             )
         return False
 
     def on_export(self, tiling_json: dict) -> bool:
-        """Add a tiling json to the current session.
+        """Append a tiling json to the current session's segment. It is written
+        through to the file at once, while syncing it to disk is batched with the
+        exports that follow shortly after.
 
         Args:
             tiling_json (dict): A json representation of a tiling.
@@ -164,55 +221,607 @@ class History(Observer):
             bool: True as this event is unique to this handler.
         """
         if tiling_json is not None:
-            self._get_current_session_tiling_list().append(
-                History._create_tiling_entry(tiling_json)
-            )
+            if self._file is None:
+                # The segment stays open for the rest of the session.
+                self._file = open(  # pylint: disable=consider-using-with
+                    self._path.as_posix(), "a", encoding="utf-8"
+                )
+                self._write(
+                    {
+                        History._SESSION_TIME: self._session_time,
+                        History._PID: os.getpid(),
+                        History._PROCESS_STARTED: psutil.Process().create_time(),
+                    }
+                )
+            self._write(History._create_tiling_entry(tiling_json))
+            pyglet.clock.unschedule(self._sync)
+            pyglet.clock.schedule_once(self._sync, History._SYNC_DELAY)
         return True
 
-    def _get_history_data(self) -> List[Dict[str, Any]]:
-        """Tries to open the export file and retrieve any json object
-        from it. If either the directory or file does not exist, it is
-        created. If the file does not exists or is invalid, an empty
-        export object is returned. Otherwise, the existing object is
-        returned.
+    def _write(self, entry: Dict[str, Any]) -> None:
+        """Write a line to the current session's segment.
+
+        Args:
+            entry (Dict[str, Any]): The json object of the line.
+        """
+        assert self._file is not None
+        self._file.write(json.dumps(entry) + "\n")
+        self._file.flush()
+
+    def _sync(self, _dt: float = 0.0) -> None:
+        """Make sure the current session's segment is on disk.
+
+        Args:
+            _dt (float): The time since it was scheduled. Unused.
+        """
+        pyglet.clock.unschedule(self._sync)
+        if self._file is not None:
+            os.fsync(self._file.fileno())
+
+    def _maintain(self, legacy: pathlib.Path) -> None:
+        """Move a history file in the old format and the segments of sessions that
+        have ended into the history store. Runs in a background thread. Another
+        window may be moving the same files, so a file that has gone or a store
+        that stays locked only skips that file, which is moved next time.
+
+        Args:
+            legacy (pathlib.Path): The history file in the old format.
+        """
+        store = HistoryStore()
+        try:
+            try:
+                with open(legacy.as_posix(), "r", encoding="utf-8") as history_file:
+                    sessions = json.load(history_file)
+                for i, session in enumerate(sessions):
+                    store.add_session(
+                        f"{legacy.name}#{i}",
+                        session.get(History._SESSION_TIME, ""),
+                        (
+                            (entry[History._TILING_TIME], entry[History._TILING])
+                            for entry in session.get(History._TILINGS, ())
+                        ),
+                    )
+                legacy.unlink(missing_ok=True)
+            except (
+                FileNotFoundError,
+                json.decoder.JSONDecodeError,
+                sqlite3.OperationalError,
+            ):
+                pass
+            for path in History.segments():
+                if path == self._path:
+                    continue
+                try:
+                    if History._has_ended(path):
+                        store.add_session(path.name, *History.read_segment(path))
+                        path.unlink(missing_ok=True)
+                except (FileNotFoundError, sqlite3.OperationalError):
+                    continue
+        finally:
+            store.close()
+
+    @staticmethod
+    def _has_ended(path: pathlib.Path) -> bool:
+        """Check if the session that writes a segment has ended. Segments from
+        before sessions recorded their process are taken to have ended, while one
+        whose first line has not been written yet is not.
+
+        Args:
+            path (pathlib.Path): The segment.
 
         Returns:
-            List[Dict[str, Any]]: A list of sessions, including the current one.
+            bool: True iff the segment was closed or its process has exited.
         """
+        session: Dict[str, Any] = {}
+        with open(path.as_posix(), "r", encoding="utf-8") as segment:
+            for line in segment:
+                try:
+                    entry = json.loads(line)
+                except json.decoder.JSONDecodeError:
+                    continue
+                if History._CLOSED_TIME in entry:
+                    return True
+                if History._SESSION_TIME in entry:
+                    session = entry
+        if not session:
+            return False
+        if History._PID not in session:
+            return True
         try:
-            with open(self._path.as_posix(), "r", encoding="utf-8") as history_file:
-                data = json.load(history_file)
-            data.append(History._get_empty_session_object())
-            return data
-        except FileNotFoundError:
-            self._path.touch()
-            return History._get_empty_json_object()
-        except json.decoder.JSONDecodeError:
-            return History._get_empty_json_object()
+            started = psutil.Process(session[History._PID]).create_time()
+        except psutil.NoSuchProcess:
+            return True
+        except psutil.Error:
+            return False
+        return (
+            abs(started - session[History._PROCESS_STARTED])
+            > History._PROCESS_STARTED_TOLERANCE
+        )
+
+    @staticmethod
+    def read_segment(
+        path: pathlib.Path,
+    ) -> Tuple[str, List[Tuple[str, Dict[str, Any]]]]:
+        """Read a session's segment. A line that was cut short by a crash, which
+        can only be the last one, is skipped.
 
-    def _get_current_session(self) -> Dict[str, Any]:
-        """Retrieve the current session object.
+        Args:
+            path (pathlib.Path): The segment.
 
         Returns:
-            Dict[str, Any]: The current session dictionary.
+            Tuple[str, List[Tuple[str, Dict[str, Any]]]]: The time the session
+            started and the time and json of each exported tiling.
         """
-        return self._data[-1]
+        session_time, exports = "", []
+        with open(path.as_posix(), "r", encoding="utf-8") as segment:
+            for line in segment:
+                try:
+                    entry = json.loads(line)
+                except json.decoder.JSONDecodeError:
+                    continue
+                if History._SESSION_TIME in entry:
+                    session_time = entry[History._SESSION_TIME]
+                else:
+                    exports.append(
+                        (entry[History._TILING_TIME], entry[History._TILING])
+                    )
+        return session_time, exports
+
+
+class HistoryEntry(NamedTuple):
+    """An exported tiling in the history store."""
+
+    session_time: str
+    tiling_time: str
+    dimensions: Tuple[int, int]
+    obstructions: int
+    tiling: Dict[str, Any]
+
+
+class HistoryStore:
+    """A store of all exported tilings. Each distinct tiling is stored once, by a
+    hash of its json, and sessions refer to the tilings they exported. Exports
+    are indexed by time, and tilings by dimensions and number of obstructions,
+    so the history can be paged through without loading all of it.
+    """
+
+    _FILE_NAME: ClassVar[str] = "history.sqlite3"
+    _SCHEMA: ClassVar[str] = """
+        CREATE TABLE IF NOT EXISTS tilings (
+            hash BLOB PRIMARY KEY,
+            width INTEGER NOT NULL,
+            height INTEGER NOT NULL,
+            obstructions INTEGER NOT NULL,
+            tiling TEXT NOT NULL
+        ) WITHOUT ROWID;
+        CREATE INDEX IF NOT EXISTS tilings_dimensions ON tilings (width, height);
+        CREATE INDEX IF NOT EXISTS tilings_obstructions ON tilings (obstructions);
+        CREATE TABLE IF NOT EXISTS sessions (
+            id INTEGER PRIMARY KEY,
+            source TEXT NOT NULL UNIQUE,
+            session_time TEXT NOT NULL
+        );
+        CREATE TABLE IF NOT EXISTS exports (
+            session INTEGER NOT NULL REFERENCES sessions (id),
+            position INTEGER NOT NULL,
+            tiling_time TEXT NOT NULL,
+            tiling BLOB NOT NULL REFERENCES tilings (hash),
+            PRIMARY KEY (session, position)
+        );
+        CREATE INDEX IF NOT EXISTS exports_time ON exports (tiling_time);
+        CREATE INDEX IF NOT EXISTS exports_tiling ON exports (tiling);
+    """
 
-    def _get_current_session_tiling_list(self) -> List:
-        """Return the current session's list of tilings.
+    @staticmethod
+    def default_path() -> pathlib.Path:
+        """Get the path of the store in the exports directory.
 
         Returns:
-            List: A list of tiling entries.
+            pathlib.Path: Absolute path of './exports/history.sqlite3'.
         """
-        return self._data[-1][History._TILINGS]
+        return PathManager.get_exports_abs_path().joinpath(HistoryStore._FILE_NAME)
+
+    @staticmethod
+    def _describe(tiling_json: Dict[str, Any]) -> Tuple[bytes, int, int, int]:
+        """Find the hash, dimensions and number of obstructions of a tiling from
+        its json, without building the tiling.
 
-    def _session_has_export(self) -> bool:
-        """Check if any exports have taken place this session.
+        Args:
+            tiling_json (Dict[str, Any]): A json representation of a tiling.
 
         Returns:
-            bool: True iff the user has exported this session.
+            Tuple[bytes, int, int, int]: The hash, width, height and number of
+            obstructions.
+        """
+        text = json.dumps(tiling_json, sort_keys=True, separators=(",", ":"))
+        obstructions = tiling_json.get("obstructions", [])
+        cells = [
+            cell
+            for g_perm in chain(obstructions, *tiling_json.get("requirements", []))
+            for cell in g_perm["pos"]
+        ]
+        return (
+            hashlib.sha256(text.encode()).digest(),
+            max((x for x, _ in cells), default=0) + 1,
+            max((y for _, y in cells), default=0) + 1,
+            len(obstructions),
+        )
+
+    def __init__(self, path: Optional[pathlib.Path] = None) -> None:
+        """Open the store, creating it if needed.
+
+        Args:
+            path (Optional[pathlib.Path]): The store's file. Defaults to
+            HistoryStore.default_path().
         """
-        return bool(self._get_current_session_tiling_list())
+        self._path: pathlib.Path = path or HistoryStore.default_path()
+        self._path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn: sqlite3.Connection = sqlite3.connect(self._path.as_posix())
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(HistoryStore._SCHEMA)
+
+    def add_session(
+        self,
+        source: str,
+        session_time: str,
+        exports: Iterable[Tuple[str, Dict[str, Any]]],
+    ) -> None:
+        """Store a session's exports. Sessions are told apart by where they were
+        read from, as their times may be missing. Adding a session from the same
+        source again replaces its exports by position, so it is safe to repeat.
+
+        Args:
+            source (str): Where the session was read from, unique to it.
+            session_time (str): The time the session started.
+            exports (Iterable[Tuple[str, Dict[str, Any]]]): The time and json of
+            each exported tiling.
+        """
+        with self._conn:
+            self._conn.execute(
+                "INSERT OR IGNORE INTO sessions (source, session_time) VALUES (?, ?)",
+                (source, session_time),
+            )
+            ((session,),) = self._conn.execute(
+                "SELECT id FROM sessions WHERE source = ?", (source,)
+            ).fetchall()
+            for position, (tiling_time, tiling_json) in enumerate(exports):
+                key, width, height, obstructions = HistoryStore._describe(tiling_json)
+                self._conn.execute(
+                    "INSERT OR IGNORE INTO tilings VALUES (?, ?, ?, ?, ?)",
+                    (key, width, height, obstructions, json.dumps(tiling_json)),
+                )
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO exports VALUES (?, ?, ?, ?)",
+                    (session, position, tiling_time, key),
+                )
+
+    @staticmethod
+    def _filter(
+        dimensions: Optional[Tuple[int, int]], obstructions: Optional[int]
+    ) -> Tuple[str, Tuple[int, ...]]:
+        """Create the condition that selects exports.
+
+        Args:
+            dimensions (Optional[Tuple[int, int]]): Only tilings of these
+            dimensions, if given.
+            obstructions (Optional[int]): Only tilings with at most this many
+            obstructions, if given.
+
+        Returns:
+            Tuple[str, Tuple[int, ...]]: The condition and its parameters.
+        """
+        conditions: List[str] = ["1"]
+        params: List[int] = []
+        if dimensions is not None:
+            conditions.append("tilings.width = ? AND tilings.height = ?")
+            params.extend(dimensions)
+        if obstructions is not None:
+            conditions.append("tilings.obstructions <= ?")
+            params.append(obstructions)
+        return " AND ".join(conditions), tuple(params)
+
+    def count(
+        self,
+        dimensions: Optional[Tuple[int, int]] = None,
+        obstructions: Optional[int] = None,
+    ) -> int:
+        """Count the exports.
+
+        Args:
+            dimensions (Optional[Tuple[int, int]]): Only tilings of these
+            dimensions, if given. Defaults to None.
+            obstructions (Optional[int]): Only tilings with at most this many
+            obstructions, if given. Defaults to None.
+
+        Returns:
+            int: The number of exports.
+        """
+        condition, params = HistoryStore._filter(dimensions, obstructions)
+        ((count,),) = self._conn.execute(
+            "SELECT COUNT(*) FROM exports "
+            f"JOIN tilings ON exports.tiling = tilings.hash WHERE {condition}",
+            params,
+        ).fetchall()
+        return int(count)
+
+    def page(
+        self,
+        offset: int,
+        limit: int,
+        dimensions: Optional[Tuple[int, int]] = None,
+        obstructions: Optional[int] = None,
+    ) -> List[HistoryEntry]:
+        """Get a page of exports, most recent first.
+
+        Args:
+            offset (int): How many exports to skip.
+            limit (int): The most exports to get.
+            dimensions (Optional[Tuple[int, int]]): Only tilings of these
+            dimensions, if given. Defaults to None.
+            obstructions (Optional[int]): Only tilings with at most this many
+            obstructions, if given. Defaults to None.
+
+        Returns:
+            List[HistoryEntry]: The exports.
+        """
+        condition, params = HistoryStore._filter(dimensions, obstructions)
+        rows = self._conn.execute(
+            "SELECT sessions.session_time, exports.tiling_time, tilings.width, "
+            "tilings.height, tilings.obstructions, tilings.tiling FROM exports "
+            "JOIN tilings ON exports.tiling = tilings.hash "
+            "JOIN sessions ON exports.session = sessions.id "
+            f"WHERE {condition} ORDER BY exports.tiling_time DESC LIMIT ? OFFSET ?",
+            (*params, limit, offset),
+        ).fetchall()
+        return [
+            HistoryEntry(
+                session_time, tiling_time, (width, height), count, json.loads(text)
+            )
+            for session_time, tiling_time, width, height, count, text in rows
+        ]
+
+    def tilings(self) -> Iterator[str]:
+        """Iterate over the distinct exported tilings, most recently exported
+        first.
+
+        Yields:
+            Iterator[str]: The json of each tiling.
+        """
+        for (text,) in self._conn.execute(
+            "SELECT tilings.tiling FROM tilings "
+            "JOIN exports ON exports.tiling = tilings.hash "
+            "GROUP BY tilings.hash ORDER BY MAX(exports.tiling_time) DESC"
+        ):
+            yield text
+
+    def close(self) -> None:
+        """Close the store's file."""
+        self._conn.close()
+
+
+class CacheStats(NamedTuple):
+    """A summary of the contents of a verification cache."""
+
+    path: pathlib.Path
+    entries: int
+    tilings: int
+    used_bytes: int
+    file_bytes: int
+    budget: int
+    by_version: Dict[str, int]
+    by_strategy: Dict[str, Dict[bool, int]]
+
+
+class VerificationCache:
+    """An on-disk cache of verification results that persists between sessions.
+    Results are keyed by a hash of the tiling's bytes, the strategy's name and
+    the version of tilings that computed them. For the strategies whose verdict
+    is the same for all symmetries of a tiling, the hash of its canonical form is
+    used instead, so the result is shared between them. When the cache
+    grows beyond its byte budget, the least recently used results are evicted.
+    """
+
+    DEFAULT_BUDGET: ClassVar[int] = 16 * 2**20
+    _FILE_NAME: ClassVar[str] = "verification.sqlite3"
+    _EVICT_FRACTION: ClassVar[float] = 0.25
+    _SCHEMA: ClassVar[str] = """
+        CREATE TABLE IF NOT EXISTS verification (
+            tiling BLOB NOT NULL,
+            strategy TEXT NOT NULL,
+            version TEXT NOT NULL,
+            verified INTEGER NOT NULL,
+            used REAL NOT NULL,
+            PRIMARY KEY (tiling, strategy, version)
+        ) WITHOUT ROWID;
+        CREATE INDEX IF NOT EXISTS verification_used ON verification (used);
+    """
+
+    @staticmethod
+    def default_path() -> pathlib.Path:
+        """Get the path of the cache file in the exports directory.
+
+        Returns:
+            pathlib.Path: Absolute path of './exports/verification.sqlite3'.
+        """
+        return PathManager.get_exports_abs_path().joinpath(VerificationCache._FILE_NAME)
+
+    @staticmethod
+    def key(tiling: Tiling, strategy: str, form: CanonicalForm) -> bytes:
+        """Hash a tiling for a strategy. Equal tilings have equal bytes, so they
+        share a key.
+
+        Args:
+            tiling (Tiling): The tiling.
+            strategy (str): The name of the strategy.
+            form (CanonicalForm): The canonical form of the tiling.
+
+        Returns:
+            bytes: The sha256 digest of the tiling's bytes, or the hash of its
+            canonical form if the strategy does not tell symmetries apart.
+        """
+        if strategy in SYMMETRIC_STRATEGIES:
+            return form.digest
+        return hashlib.sha256(tiling.to_bytes()).digest()
+
+    def __init__(
+        self, path: Optional[pathlib.Path] = None, budget: int = DEFAULT_BUDGET
+    ) -> None:
+        """Open the cache, creating it if needed. A file that is not a valid cache
+        is replaced by an empty one.
+
+        Args:
+            path (Optional[pathlib.Path]): The cache file. Defaults to
+            VerificationCache.default_path().
+            budget (int): How many bytes the results may take up. Defaults to
+            VerificationCache.DEFAULT_BUDGET.
+        """
+        self._path: pathlib.Path = path or VerificationCache.default_path()
+        self._path.parent.mkdir(parents=True, exist_ok=True)
+        self._budget: int = budget
+        self._version: str = importlib.metadata.version("tilings")
+        try:
+            self._conn: sqlite3.Connection = self._connect()
+        except sqlite3.DatabaseError:
+            self._path.unlink()
+            self._conn = self._connect()
+
+    def _connect(self) -> sqlite3.Connection:
+        """Open the cache file and make sure it has the cache's table.
+
+        Returns:
+            sqlite3.Connection: The connection.
+        """
+        conn = sqlite3.connect(self._path.as_posix())
+        try:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.executescript(VerificationCache._SCHEMA)
+        except sqlite3.DatabaseError:
+            conn.close()
+            raise
+        return conn
+
+    def get(self, tiling: Tiling, form: CanonicalForm) -> Dict[str, bool]:
+        """Look up the cached results for a tiling and mark them as used. This
+        includes the results of symmetric strategies on its symmetries.
+
+        Args:
+            tiling (Tiling): The tiling.
+            form (CanonicalForm): The canonical form of the tiling.
+
+        Returns:
+            Dict[str, bool]: The cached results, by strategy name.
+        """
+        keys = (hashlib.sha256(tiling.to_bytes()).digest(), form.digest)
+        with self._conn:
+            rows = self._conn.execute(
+                "SELECT tiling, strategy, verified FROM verification "
+                "WHERE tiling IN (?, ?) AND version = ?",
+                (*keys, self._version),
+            ).fetchall()
+            if rows:
+                self._conn.execute(
+                    "UPDATE verification SET used = ? "
+                    "WHERE tiling IN (?, ?) AND version = ?",
+                    (time.time(), *keys, self._version),
+                )
+        return {
+            strategy: bool(verified)
+            for key, strategy, verified in rows
+            if key == VerificationCache.key(tiling, strategy, form)
+        }
+
+    def put(
+        self, tiling: Tiling, form: CanonicalForm, strategy: str, verified: bool
+    ) -> None:
+        """Store a result, evicting old ones if the cache is over budget.
+
+        Args:
+            tiling (Tiling): The tiling.
+            form (CanonicalForm): The canonical form of the tiling.
+            strategy (str): The name of the strategy.
+            verified (bool): Whether the strategy verified the tiling.
+        """
+        with self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO verification VALUES (?, ?, ?, ?, ?)",
+                (
+                    VerificationCache.key(tiling, strategy, form),
+                    strategy,
+                    self._version,
+                    int(verified),
+                    time.time(),
+                ),
+            )
+        if self._used_bytes() > self._budget:
+            self._evict()
+
+    def _used_bytes(self) -> int:
+        """The bytes taken up by the cache's pages that are in use.
+
+        Returns:
+            int: The number of bytes.
+        """
+        (page_size,) = self._conn.execute("PRAGMA page_size").fetchone()
+        (pages,) = self._conn.execute("PRAGMA page_count").fetchone()
+        (free,) = self._conn.execute("PRAGMA freelist_count").fetchone()
+        return int(page_size * (pages - free))
+
+    def _evict(self) -> None:
+        """Remove the least recently used fraction of the results. The file is
+        not shrunk, which would rewrite all of it, as the freed pages are reused by
+        later results and are not counted as used.
+        """
+        with self._conn:
+            (entries,) = self._conn.execute(
+                "SELECT COUNT(*) FROM verification"
+            ).fetchone()
+            self._conn.execute(
+                "DELETE FROM verification WHERE used <= "
+                "(SELECT used FROM verification ORDER BY used LIMIT 1 OFFSET ?)",
+                (max(0, int(entries * VerificationCache._EVICT_FRACTION) - 1),),
+            )
+
+    def stats(self) -> CacheStats:
+        """Summarise the contents of the cache.
+
+        Returns:
+            CacheStats: The summary.
+        """
+        by_version = dict(
+            self._conn.execute(
+                "SELECT version, COUNT(*) FROM verification GROUP BY version"
+            ).fetchall()
+        )
+        by_strategy: Dict[str, Dict[bool, int]] = {}
+        for strategy, verified, count in self._conn.execute(
+            "SELECT strategy, verified, COUNT(*) FROM verification "
+            "GROUP BY strategy, verified ORDER BY strategy"
+        ):
+            by_strategy.setdefault(strategy, {})[bool(verified)] = count
+        ((tiling_count,),) = self._conn.execute(
+            "SELECT COUNT(DISTINCT tiling) FROM verification"
+        ).fetchall()
+        return CacheStats(
+            self._path,
+            sum(by_version.values()),
+            tiling_count,
+            self._used_bytes(),
+            self._path.stat().st_size,
+            self._budget,
+            by_version,
+            by_strategy,
+        )
+
+    def clear(self) -> None:
+        """Remove all results and shrink the file."""
+        with self._conn:
+            self._conn.execute("DELETE FROM verification")
+        self._conn.execute("VACUUM")
+
+    def close(self) -> None:
+        """Close the cache file."""
+        self._conn.close()
 
 
 class Images:
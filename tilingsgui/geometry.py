@@ -1,6 +1,9 @@
 """Mathematical geometric objects."""
 
-from typing import Iterator
+from array import array
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence, Tuple, overload
+
+Key = Tuple[int, ...]
 
 
 class Point:
@@ -41,6 +44,185 @@ class Point:
         yield from self.coords()
 
 
+class PointView(Point):
+    """A point whose coordinates live in a point store. Reading and assigning its
+    coordinates reads and writes the store.
+    """
+
+    def __init__(  # pylint: disable=super-init-not-called
+        self, store: "PointStore", index: int
+    ) -> None:
+        """Instansiate a view of a single point within a store.
+
+        Args:
+            store (PointStore): The store holding the coordinates.
+            index (int): The index of the point within the store's arrays.
+        """
+        self._store: PointStore = store
+        self._index: int = index
+
+    @property  # type: ignore[override]
+    def x(self) -> float:
+        """The horizontal coordinate."""
+        return self._store.xs[self._index]
+
+    @x.setter
+    def x(self, value: float) -> None:
+        self._store.xs[self._index] = value
+
+    @property  # type: ignore[override]
+    def y(self) -> float:
+        """The vertical coordinate."""
+        return self._store.ys[self._index]
+
+    @y.setter
+    def y(self, value: float) -> None:
+        self._store.ys[self._index] = value
+
+
+class PathView(Sequence[Point]):
+    """A view of a single point path within a point store. Indexing it gives
+    point views and assigning a point to an index writes its coordinates.
+    """
+
+    def __init__(self, store: "PointStore", start: int, stop: int) -> None:
+        """Instansiate a view of the points in [start, stop) of a store.
+
+        Args:
+            store (PointStore): The store holding the coordinates.
+            start (int): The index of the first point.
+            stop (int): One past the index of the last point.
+        """
+        self._store: PointStore = store
+        self._start: int = start
+        self._stop: int = stop
+
+    @overload
+    def __getitem__(self, index: int) -> Point: ...
+
+    @overload
+    def __getitem__(self, index: slice) -> List[Point]: ...
+
+    def __getitem__(self, index):
+        """Get a view of a point or a list of views for a slice."""
+        if isinstance(index, slice):
+            return [
+                PointView(self._store, self._start + k)
+                for k in range(*index.indices(len(self)))
+            ]
+        return PointView(self._store, self._position(index))
+
+    def __setitem__(self, index: int, point: Point) -> None:
+        """Set the coordinates of a point within the path.
+
+        Args:
+            index (int): The index of the point within the path.
+            point (Point): A point with the new coordinates.
+        """
+        position = self._position(index)
+        self._store.xs[position] = point.x
+        self._store.ys[position] = point.y
+
+    def __len__(self) -> int:
+        """The number of points in the path."""
+        return self._stop - self._start
+
+    def coordinates(self) -> Tuple[array, array]:
+        """Copy out the coordinates of the path's points.
+
+        Returns:
+            Tuple[array, array]: The x and y coordinates.
+        """
+        return (
+            self._store.xs[self._start : self._stop],
+            self._store.ys[self._start : self._stop],
+        )
+
+    def _position(self, index: int) -> int:
+        """Map an index within the path to an index within the store's arrays.
+
+        Args:
+            index (int): An index within the path, negative values count from
+            the end.
+
+        Returns:
+            int: The index in the store.
+        """
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("point index out of range")
+        return self._start + index
+
+
+class PointStore(Sequence[PathView]):
+    """The points of many point paths kept in two flat arrays of coordinates along
+    with a table of offsets where each path starts. Indexing it gives path views.
+    """
+
+    def __init__(self, paths: Iterable[Iterable[Point]]) -> None:
+        """Instansiate a store by copying the coordinates of the given paths.
+
+        Args:
+            paths (Iterable[Iterable[Point]]): The point paths to store.
+        """
+        self.xs: array = array("d")
+        self.ys: array = array("d")
+        self._offsets: array = array("q", [0])
+        for path in paths:
+            for pnt in path:
+                self.xs.append(pnt.x)
+                self.ys.append(pnt.y)
+            self._offsets.append(len(self.xs))
+
+    @classmethod
+    def from_arrays(cls, xs: array, ys: array, offsets: array) -> "PointStore":
+        """Instansiate a store that takes ownership of already filled arrays.
+
+        Args:
+            xs (array): The horizontal coordinates of all points.
+            ys (array): The vertical coordinates of all points.
+            offsets (array): The index where each path starts, followed by the
+            total number of points.
+
+        Returns:
+            PointStore: A store backed by the given arrays.
+        """
+        store = cls(())
+        store.xs, store.ys, store._offsets = xs, ys, offsets
+        return store
+
+    @overload
+    def __getitem__(self, index: int) -> PathView: ...
+
+    @overload
+    def __getitem__(self, index: slice) -> List[PathView]: ...
+
+    def __getitem__(self, index):
+        """Get a view of a path or a list of views for a slice."""
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("path index out of range")
+        return PathView(self, self._offsets[index], self._offsets[index + 1])
+
+    def __len__(self) -> int:
+        """The number of paths in the store."""
+        return len(self._offsets) - 1
+
+    def scale(self, x_factor: float, y_factor: float) -> None:
+        """Scale all coordinates in place, one pass over each array.
+
+        Args:
+            x_factor (float): The factor for horizontal coordinates.
+            y_factor (float): The factor for vertical coordinates.
+        """
+        self.xs[:] = array("d", map(float(x_factor).__mul__, self.xs))
+        self.ys[:] = array("d", map(float(y_factor).__mul__, self.ys))
+
+
 class Rectangle:
     """A rectangle object."""
 
@@ -65,3 +247,94 @@ class Rectangle:
             Point: The center of the rectangle.
         """
         return Point(self.x + self.w / 2, self.y + self.h / 2)
+
+
+class SpatialHash:
+    """A uniform grid of buckets over keyed points that answers proximity queries
+    by only looking at the buckets around the query point.
+    """
+
+    def __init__(self, bucket_size: float) -> None:
+        """Create an empty spatial hash.
+
+        Args:
+            bucket_size (float): The side length of each bucket. Queries within a
+            radius of at most this size only look at neighbouring buckets.
+        """
+        self._bucket_size: float = bucket_size
+        self._buckets: Dict[Tuple[int, int], List[Key]] = {}
+        self._points: Dict[Key, Tuple[float, float]] = {}
+
+    def insert(self, key: Key, x: float, y: float) -> None:
+        """Add a point.
+
+        Args:
+            key (Tuple[int, ...]): The key of the point, must not already be present.
+            x (float): The horizontal coordinate.
+            y (float): The vertical coordinate.
+        """
+        self._points[key] = (x, y)
+        self._buckets.setdefault(self._bucket(x, y), []).append(key)
+
+    def remove(self, key: Key) -> None:
+        """Remove a point.
+
+        Args:
+            key (Tuple[int, ...]): The key of the point to remove.
+        """
+        x, y = self._points.pop(key)
+        bucket = self._bucket(x, y)
+        keys = self._buckets[bucket]
+        keys.remove(key)
+        if not keys:
+            del self._buckets[bucket]
+
+    def move(self, key: Key, x: float, y: float) -> None:
+        """Move a point, only changing buckets if needed.
+
+        Args:
+            key (Tuple[int, ...]): The key of the point to move.
+            x (float): The new horizontal coordinate.
+            y (float): The new vertical coordinate.
+        """
+        old_x, old_y = self._points[key]
+        if self._bucket(old_x, old_y) == self._bucket(x, y):
+            self._points[key] = (x, y)
+        else:
+            self.remove(key)
+            self.insert(key, x, y)
+
+    def find(self, point: Point, radius_squared: float) -> Optional[Key]:
+        """Find the smallest key of a point within a distance of a point.
+
+        Args:
+            point (Point): The query point.
+            radius_squared (float): The squared search radius. Its root must not
+            exceed the bucket size.
+
+        Returns:
+            Optional[Tuple[int, ...]]: The smallest key found, None if none is close.
+        """
+        b_x, b_y = self._bucket(point.x, point.y)
+        found: Optional[Key] = None
+        for n_x in range(b_x - 1, b_x + 2):
+            for n_y in range(b_y - 1, b_y + 2):
+                for key in self._buckets.get((n_x, n_y), ()):
+                    x, y = self._points[key]
+                    if (found is None or key < found) and (point.x - x) ** 2 + (
+                        point.y - y
+                    ) ** 2 <= radius_squared:
+                        found = key
+        return found
+
+    def _bucket(self, x: float, y: float) -> Tuple[int, int]:
+        """Get the bucket that a coordinate lands in.
+
+        Args:
+            x (float): The horizontal coordinate.
+            y (float): The vertical coordinate.
+
+        Returns:
+            Tuple[int, int]: The bucket's column and row.
+        """
+        return int(x // self._bucket_size), int(y // self._bucket_size)
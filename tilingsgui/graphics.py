@@ -1,10 +1,17 @@
 """Drawable objects"""
 
-from typing import ClassVar, List, Tuple
+import hashlib
+import json
+import os
+import pathlib
+import struct
+import zlib
+from typing import ClassVar, Dict, List, Optional, Sequence, Tuple
 
 import pyglet
 import pyglet.shapes
 
+from .files import PathManager
 from .geometry import Point
 
 C3F = Tuple[float, float, float]
@@ -76,11 +83,13 @@ class GeoDrawer:
         rectangle.draw()
 
     @staticmethod
-    def draw_point_path(pnt_path: List[Point], color: C3F, point_size: float) -> None:
+    def draw_point_path(
+        pnt_path: Sequence[Point], color: C3F, point_size: float
+    ) -> None:
         """Draw a list of point and a line segment between to adjacent points.
 
         Args:
-            pnt_path (List[Point]): The list of points to draw in order.
+            pnt_path (Sequence[Point]): The list of points to draw in order.
             color (Tuple[float, float, float]): Color of line segments and point fills.
             point_size (float): Radius of the circle representing the points.
         """
@@ -98,6 +107,441 @@ class GeoDrawer:
                 GeoDrawer.draw_point(pnt, point_size, color)
 
 
+Box = Tuple[int, int, int, int]
+Packed = Tuple[int, int, bytes, Dict[str, Box]]
+
+
+class IconAtlas:
+    """All the icons packed into a single texture, so that they are uploaded at
+    once and the buttons of a menu can be drawn in one batch. Decoding the icons
+    is slow, so the packed pixels are kept in the exports directory and only
+    packed again when an icon changes.
+    """
+
+    _CACHE_FILE: ClassVar[str] = "icons.atlas"
+    _MAGIC: ClassVar[bytes] = b"TGICONS1"
+    _HEADER: ClassVar[struct.Struct] = struct.Struct("=8s32sIII")
+    _COLUMNS: ClassVar[int] = 8
+    _GAP: ClassVar[int] = 2
+    _shared: ClassVar[Optional["IconAtlas"]] = None
+
+    @staticmethod
+    def image(name: str) -> pyglet.image.TextureRegion:
+        """Get an icon from the shared atlas of the png resources, which is created
+        the first time an icon is asked for.
+
+        Args:
+            name (str): The icon's file name.
+
+        Returns:
+            pyglet.image.TextureRegion: The icon's part of the atlas texture.
+        """
+        if IconAtlas._shared is None:
+            IconAtlas._shared = IconAtlas(
+                PathManager.get_png_abs_path(),
+                PathManager.get_exports_abs_path().joinpath(IconAtlas._CACHE_FILE),
+            )
+        return IconAtlas._shared.regions[name]
+
+    def __init__(self, directory: pathlib.Path, cache: pathlib.Path) -> None:
+        """Pack the png files of a directory into a texture, or use the cached
+        packing if the files are unchanged.
+
+        Args:
+            directory (pathlib.Path): The directory of the icons.
+            cache (pathlib.Path): The file to keep the packed pixels in.
+        """
+        paths = sorted(directory.glob("*.png"))
+        stamp = IconAtlas._stamp(paths)
+        packed = IconAtlas._load(cache, stamp)
+        if packed is None:
+            packed = IconAtlas._pack(paths)
+            IconAtlas._save(cache, stamp, packed)
+        width, height, pixels, boxes = packed
+        texture = pyglet.image.ImageData(
+            width, height, "RGBA", pixels, pitch=width * 4
+        ).get_texture()
+        self.regions: Dict[str, pyglet.image.TextureRegion] = {
+            name: texture.get_region(*box) for name, box in boxes.items()
+        }
+
+    @staticmethod
+    def _stamp(paths: Sequence[pathlib.Path]) -> bytes:
+        """Identify a version of the icons by their names, sizes and modification
+        times.
+
+        Args:
+            paths (Sequence[pathlib.Path]): The icon files.
+
+        Returns:
+            bytes: A sha256 digest.
+        """
+        digest = hashlib.sha256()
+        for path in paths:
+            stat = path.stat()
+            digest.update(f"{path.name}:{stat.st_size}:{stat.st_mtime_ns};".encode())
+        return digest.digest()
+
+    @staticmethod
+    def _pack(paths: Sequence[pathlib.Path]) -> Packed:
+        """Decode the icons and place them in a grid, with a gap between them so
+        that scaled icons do not bleed into each other.
+
+        Args:
+            paths (Sequence[pathlib.Path]): The icon files.
+
+        Returns:
+            Packed: The atlas' width, height, RGBA pixels from the bottom row up
+            and the box of each icon by file name.
+        """
+        images = [pyglet.image.load(path.as_posix()).get_image_data() for path in paths]
+        cell_w = max((image.width for image in images), default=0) + IconAtlas._GAP
+        cell_h = max((image.height for image in images), default=0) + IconAtlas._GAP
+        columns = max(1, min(IconAtlas._COLUMNS, len(images)))
+        width = columns * cell_w
+        height = -(-len(images) // columns) * cell_h
+        pixels = bytearray(width * height * 4)
+        boxes: Dict[str, Box] = {}
+        for i, (path, image) in enumerate(zip(paths, images)):
+            x, y = (i % columns) * cell_w, (i // columns) * cell_h
+            box = (x, y, image.width, image.height)
+            IconAtlas._blit(pixels, width, box, image.get_bytes("RGBA", box[2] * 4))
+            boxes[path.name] = box
+        return width, height, bytes(pixels), boxes
+
+    @staticmethod
+    def _blit(pixels: bytearray, width: int, box: Box, data: bytes) -> None:
+        """Copy the RGBA pixels of an icon into the atlas.
+
+        Args:
+            pixels (bytearray): The atlas' pixels.
+            width (int): The atlas' width.
+            box (Box): Where the icon goes.
+            data (bytes): The icon's pixels.
+        """
+        x, y, icon_w, icon_h = box
+        row_bytes = icon_w * 4
+        for row in range(icon_h):
+            start = ((y + row) * width + x) * 4
+            pixels[start : start + row_bytes] = data[
+                row * row_bytes : (row + 1) * row_bytes
+            ]
+
+    @staticmethod
+    def _load(cache: pathlib.Path, stamp: bytes) -> Optional[Packed]:
+        """Read a cached packing if it was made from the same icons.
+
+        Args:
+            cache (pathlib.Path): The cache file.
+            stamp (bytes): The stamp of the icons.
+
+        Returns:
+            Optional[Packed]: The packing, None if it is missing, stale or
+            unreadable.
+        """
+        try:
+            data = cache.read_bytes()
+            magic, cached_stamp, width, height, layout_size = (
+                IconAtlas._HEADER.unpack_from(data)
+            )
+            if magic != IconAtlas._MAGIC or cached_stamp != stamp:
+                return None
+            start = IconAtlas._HEADER.size
+            boxes = json.loads(data[start : start + layout_size])
+            pixels = zlib.decompress(data[start + layout_size :])
+        except (OSError, struct.error, ValueError, zlib.error):
+            return None
+        if len(pixels) != width * height * 4:
+            return None
+        return width, height, pixels, {name: tuple(box) for name, box in boxes.items()}
+
+    @staticmethod
+    def _save(cache: pathlib.Path, stamp: bytes, packed: Packed) -> None:
+        """Write a packing to the cache. The file is replaced at once, so that a
+        partial file is never read.
+
+        Args:
+            cache (pathlib.Path): The cache file.
+            stamp (bytes): The stamp of the icons.
+            packed (Packed): The packing.
+        """
+        width, height, pixels, boxes = packed
+        layout = json.dumps(boxes).encode()
+        cache.parent.mkdir(parents=True, exist_ok=True)
+        tmp = cache.with_name(f"{cache.name}.{os.getpid()}.tmp")
+        with open(tmp, "wb") as cache_file:
+            cache_file.write(
+                IconAtlas._HEADER.pack(
+                    IconAtlas._MAGIC, stamp, width, height, len(layout)
+                )
+            )
+            cache_file.write(layout)
+            cache_file.write(zlib.compress(pixels, 1))
+        os.replace(tmp, cache)
+
+
+class Redrawable:
+    """A component that only needs to be redrawn when it has changed. A component
+    marks itself dirty when something it draws changes and clean once drawn.
+    """
+
+    def __init__(self) -> None:
+        """Create a component that starts out dirty so it is drawn at least once."""
+        self._dirty: bool = True
+
+    def mark_dirty(self) -> None:
+        """Request that the component is redrawn."""
+        self._dirty = True
+
+    def mark_clean(self) -> None:
+        """Acknowledge that the component has been drawn."""
+        self._dirty = False
+
+    def is_dirty(self) -> bool:
+        """Does the component need to be redrawn?
+
+        Returns:
+            bool: True iff it has changed since it was last drawn.
+        """
+        return self._dirty
+
+
+class PointPathShapes:
+    """The retained shapes of a point path. A line segment between each pair of
+    adjacent points and a circle for each point.
+    """
+
+    _SPLITS: ClassVar[int] = 30
+
+    def __init__(
+        self,
+        pnt_path: Sequence[Point],
+        color: C3F,
+        point_size: float,
+        batch: pyglet.graphics.Batch,
+        line_group: pyglet.graphics.Group,
+        point_group: pyglet.graphics.Group,
+    ) -> None:
+        """Create the shapes of a point path within a batch.
+
+        Args:
+            pnt_path (Sequence[Point]): The list of points in order.
+            color (Tuple[float, float, float]): Color of line segments and point fills.
+            point_size (float): Radius of the circle representing the points.
+            batch (pyglet.graphics.Batch): The batch the shapes are added to.
+            line_group (pyglet.graphics.Group): The group of the line segments.
+            point_group (pyglet.graphics.Group): The group of the points.
+        """
+        color_255 = Color.scale_to_255(color)
+        self._lines: List[pyglet.shapes.Line] = [
+            pyglet.shapes.Line(
+                p1.x, p1.y, p2.x, p2.y, color=color_255, batch=batch, group=line_group
+            )
+            for p1, p2 in zip(pnt_path, pnt_path[1:])
+        ]
+        self._circles: List[pyglet.shapes.Circle] = [
+            pyglet.shapes.Circle(
+                pnt.x,
+                pnt.y,
+                point_size,
+                segments=PointPathShapes._SPLITS,
+                color=color_255,
+                batch=batch,
+                group=point_group,
+            )
+            for pnt in pnt_path
+        ]
+
+    def set_color(self, color: C3F) -> None:
+        """Recolor all shapes of the path.
+
+        Args:
+            color (Tuple[float, float, float]): The new RGB color.
+        """
+        color_255 = Color.scale_to_255(color)
+        for line in self._lines:
+            line.color = color_255
+        for circle in self._circles:
+            circle.color = color_255
+
+    def set_points(self, pnt_path: Sequence[Point]) -> None:
+        """Move the shapes to new point locations.
+
+        Args:
+            pnt_path (Sequence[Point]): The new locations, same length as the original.
+        """
+        for line, p1, p2 in zip(self._lines, pnt_path, pnt_path[1:]):
+            line.position = (p1.x, p1.y)
+            line.x2, line.y2 = p2.x, p2.y
+        for circle, pnt in zip(self._circles, pnt_path):
+            circle.position = (pnt.x, pnt.y)
+
+    def delete(self) -> None:
+        """Remove the shapes from their batch."""
+        for line in self._lines:
+            line.delete()
+        for circle in self._circles:
+            circle.delete()
+        self._lines.clear()
+        self._circles.clear()
+
+
+class ShapeBatch:
+    """A retained collection of shapes that are drawn with a single batch. Shapes
+    are placed in layers, and a higher layer is drawn on top of a lower one.
+    """
+
+    def __init__(self, layers: int = 1) -> None:
+        """Create an empty shape batch.
+
+        Args:
+            layers (int, optional): The number of layers. Defaults to 1.
+        """
+        self._batch: pyglet.graphics.Batch = pyglet.graphics.Batch()
+        self._groups: List[pyglet.graphics.Group] = [
+            pyglet.graphics.Group(order=i) for i in range(layers)
+        ]
+        self._shapes: List[pyglet.shapes.ShapeBase] = []
+        self._paths: List[PointPathShapes] = []
+
+    def add_line_segment(
+        self, x1: float, y1: float, x2: float, y2: float, color: C3F, layer: int = 0
+    ) -> pyglet.shapes.Line:
+        """Add a line segment.
+
+        Args:
+            x1 (float): Start x coordinate.
+            y1 (float): Start y coordinate.
+            x2 (float): End x coordinate.
+            y2 (float): End y coordinate.
+            color (Tuple[float, float, float]): RGB valued color.
+            layer (int, optional): The layer to draw in. Defaults to 0.
+
+        Returns:
+            pyglet.shapes.Line: The retained line.
+        """
+        line = pyglet.shapes.Line(
+            x1,
+            y1,
+            x2,
+            y2,
+            color=Color.scale_to_255(color),
+            batch=self._batch,
+            group=self._groups[layer],
+        )
+        self._shapes.append(line)
+        return line
+
+    def add_circle(
+        self, x: float, y: float, r: float, color: C3F, layer: int = 0, splits: int = 30
+    ) -> pyglet.shapes.Circle:
+        """Add a circle.
+
+        Args:
+            x (float): The circle center's x coordinate.
+            y (float): The circle center's y coordinate.
+            r (float): The circle's radius.
+            color (Tuple[float, float, float]): The fill color of the circle.
+            layer (int, optional): The layer to draw in. Defaults to 0.
+            splits (int, optional): How detailed the polygon emulating a circle should
+            be. Higher values increase detail.
+
+        Returns:
+            pyglet.shapes.Circle: The retained circle.
+        """
+        circle = pyglet.shapes.Circle(
+            x,
+            y,
+            r,
+            segments=splits,
+            color=Color.scale_to_255(color),
+            batch=self._batch,
+            group=self._groups[layer],
+        )
+        self._shapes.append(circle)
+        return circle
+
+    def add_rectangle(
+        self, x: float, y: float, w: float, h: float, color: C3F, layer: int = 0
+    ) -> pyglet.shapes.Rectangle:
+        """Add a rectangle.
+
+        Args:
+            x (float): South west corner's x coordinate.
+            y (float): South west corner's y coordinate.
+            w (float): Horizontal length.
+            h (float): Vertical length.
+            color (Tuple[float, float, float]): Fill color.
+            layer (int, optional): The layer to draw in. Defaults to 0.
+
+        Returns:
+            pyglet.shapes.Rectangle: The retained rectangle.
+        """
+        rectangle = pyglet.shapes.Rectangle(
+            x,
+            y,
+            w,
+            h,
+            color=Color.scale_to_255(color),
+            batch=self._batch,
+            group=self._groups[layer],
+        )
+        self._shapes.append(rectangle)
+        return rectangle
+
+    def layer(self, layer: int) -> Tuple[pyglet.graphics.Batch, pyglet.graphics.Group]:
+        """Get the batch and the group of a layer, for objects that are not shapes
+        of the batch, such as sprites and text layouts.
+
+        Args:
+            layer (int): The layer.
+
+        Returns:
+            Tuple[pyglet.graphics.Batch, pyglet.graphics.Group]: The batch and the
+            group that is drawn as the layer.
+        """
+        return self._batch, self._groups[layer]
+
+    def add_point_path(
+        self, pnt_path: Sequence[Point], color: C3F, point_size: float, layer: int = 0
+    ) -> PointPathShapes:
+        """Add a point path. Its line segments are drawn in the given layer and
+        its points in the one above it.
+
+        Args:
+            pnt_path (Sequence[Point]): The list of points in order.
+            color (Tuple[float, float, float]): Color of line segments and point fills.
+            point_size (float): Radius of the circle representing the points.
+            layer (int, optional): The layer of the line segments. Defaults to 0.
+
+        Returns:
+            PointPathShapes: The retained shapes of the path.
+        """
+        path = PointPathShapes(
+            pnt_path,
+            color,
+            point_size,
+            self._batch,
+            self._groups[layer],
+            self._groups[layer + 1],
+        )
+        self._paths.append(path)
+        return path
+
+    def clear(self) -> None:
+        """Remove all shapes from the batch."""
+        for shape in self._shapes:
+            shape.delete()
+        for path in self._paths:
+            path.delete()
+        self._shapes.clear()
+        self._paths.clear()
+
+    def draw(self) -> None:
+        """Draw all shapes."""
+        self._batch.draw()
+
+
 class Color:
     """A collection of color constants."""
 
@@ -1,22 +1,556 @@
-"""Entrypoint."""
+"""Entrypoint. The GUI is only imported when it is started, as worker processes
+import the module that started the app and must not load pyglet.
+"""
 
 import argparse
+import contextlib
+import json
+import multiprocessing
+import pathlib
+import sys
+from functools import partial
+from typing import TYPE_CHECKING, Dict, Iterable, Iterator, List, Optional, Tuple
 
-from .app import TilingGui
+from . import operations, script
+from .raster import render_png, render_tex
+from .utils import StartupReport
+from .workers import Limits
 
+if TYPE_CHECKING:
+    from .files import HistoryStore
 
-def get_args() -> str:
-    """Get json argument if any."""
+_DEFAULT_HISTORY_PAGE_SIZE = 20
+_DEFAULT_RENDER_SIZE = (400, 400)
+_CHUNKS_PER_PROCESS = 4
+_RENDERERS = {"png": render_png, "tex": render_tex}
+# The budget options in MiB and the arguments of the app they set.
+_BUDGETS = {
+    "history_mb": "history_budget",
+    "verification_cache_mb": "verification_cache_budget",
+    "memo_mb": "memo_budget",
+}
+
+
+def get_args() -> argparse.Namespace:
+    """Get json argument if any, the size of the undo history and of the operation
+    memo, limits, the size of the verification cache, the OEIS dump if any and the
+    subcommand and its options if any. The steps of a batch command's script are
+    parsed.
+    """
     parser = argparse.ArgumentParser()
     parser.add_argument(
         "-j", "--json", type=str, default="", help="start GUI with provided tiling"
     )
-    return parser.parse_args().json
+    parser.add_argument(
+        "--history-mb",
+        type=float,
+        help="memory in MiB to keep for undo and redo (default: "
+        "TPlotManager.DEFAULT_HISTORY_BUDGET)",
+    )
+    parser.add_argument(
+        "--memo-mb",
+        type=float,
+        help="memory in MiB to keep for results of operations, so that repeating "
+        "an operation does not compute it again (default: "
+        "OperationMemo.DEFAULT_BUDGET)",
+    )
+    parser.add_argument(
+        "--time-limit",
+        action="append",
+        default=[],
+        metavar="[OPERATION=]SECONDS",
+        help="stop operations that run longer, for all or a named operation, "
+        "e.g. --time-limit 60 --time-limit obstruction_inferral=600",
+    )
+    parser.add_argument(
+        "--memory-limit",
+        action="append",
+        default=[],
+        metavar="[OPERATION=]MIB",
+        help="stop operations whose worker uses more memory, for all or a named "
+        "operation (default: half of the machine's memory)",
+    )
+    parser.add_argument(
+        "--oeis",
+        type=pathlib.Path,
+        metavar="STRIPPED",
+        help="look printed sequences up in a local copy of the OEIS stripped file, "
+        "plain or gzipped",
+    )
+    parser.add_argument(
+        "--verification-cache-mb",
+        type=float,
+        help="disk space in MiB for verification results kept between sessions, "
+        "0 turns caching off (default: VerificationCache.DEFAULT_BUDGET)",
+    )
+    parser.add_argument(
+        "--startup-report",
+        action="store_true",
+        help="print how long it takes to import the app, create the window, draw "
+        "the first frame and load tilings",
+    )
+    subparsers = parser.add_subparsers(dest="command")
+    cache_parser = subparsers.add_parser(
+        "cache", help="show what the verification cache holds instead of starting"
+    )
+    cache_parser.add_argument(
+        "--clear", action="store_true", help="remove all cached results"
+    )
+    history_parser = subparsers.add_parser(
+        "history", help="page through exported tilings instead of starting"
+    )
+    history_parser.add_argument(
+        "--page", type=int, default=1, help="the page to show (default: %(default)s)"
+    )
+    history_parser.add_argument(
+        "--page-size",
+        type=int,
+        default=_DEFAULT_HISTORY_PAGE_SIZE,
+        help="exports per page (default: %(default)s)",
+    )
+    history_parser.add_argument(
+        "--dimensions",
+        type=_parse_dimensions,
+        metavar="WIDTHxHEIGHT",
+        help="only show tilings of these dimensions, e.g. 2x3",
+    )
+    history_parser.add_argument(
+        "--max-obstructions",
+        type=int,
+        metavar="N",
+        help="only show tilings with at most N obstructions",
+    )
+    history_parser.add_argument(
+        "--json",
+        action="store_true",
+        dest="show_json",
+        help="print the json of each tiling, which -j accepts",
+    )
+    render_parser = subparsers.add_parser(
+        "render",
+        help="draw tilings to png or tikz files without a window instead of "
+        "starting",
+    )
+    render_parser.add_argument(
+        "--format",
+        choices=sorted(_RENDERERS),
+        default="png",
+        help="png images, or tex files with a tikz drawing each "
+        "(default: %(default)s)",
+    )
+    render_parser.add_argument(
+        "--input",
+        type=pathlib.Path,
+        metavar="JSONL",
+        help="a file with a tiling's json, or an exported tiling, on each line, "
+        "- for stdin (default: the distinct exported tilings)",
+    )
+    render_parser.add_argument(
+        "--output",
+        type=pathlib.Path,
+        default=pathlib.Path("thumbnails"),
+        help="the directory to write the files to (default: %(default)s)",
+    )
+    render_parser.add_argument(
+        "--size",
+        type=_parse_dimensions,
+        default=_DEFAULT_RENDER_SIZE,
+        metavar="WIDTHxHEIGHT",
+        help="the size of the images in pixels, where 100 pixels are a unit in "
+        "tikz (default: 400x400)",
+    )
+    render_parser.add_argument(
+        "--processes",
+        type=int,
+        help="the number of processes to render with (default: one per cpu)",
+    )
+    batch_parser = subparsers.add_parser(
+        "batch",
+        help="apply a script of operations to tilings without a window instead of "
+        "starting",
+    )
+    script_group = batch_parser.add_mutually_exclusive_group(required=True)
+    script_group.add_argument(
+        "--script",
+        help="the steps, separated by semicolons, e.g. "
+        "'row_and_column_separation; obstruction_inferral 3; fusion row 0'",
+    )
+    script_group.add_argument(
+        "--script-file",
+        type=pathlib.Path,
+        help="a file with the steps, one per line",
+    )
+    batch_parser.add_argument(
+        "--input",
+        type=pathlib.Path,
+        default=pathlib.Path("-"),
+        metavar="JSONL",
+        help="a file with a tiling's json, or an exported tiling, on each line, "
+        "- for stdin (default: %(default)s)",
+    )
+    batch_parser.add_argument(
+        "--output",
+        type=pathlib.Path,
+        default=pathlib.Path("-"),
+        metavar="JSONL",
+        help="the file to write the outcome for each tiling to, - for stdout "
+        "(default: %(default)s)",
+    )
+    batch_parser.add_argument(
+        "--processes",
+        type=int,
+        help="the number of processes to apply the script with (default: one per "
+        "cpu)",
+    )
+    batch_parser.add_argument(
+        "--chunk-size",
+        type=int,
+        help="the number of tilings sent to a process at a time, which lets the "
+        "input be read as it is processed (default: enough for each process to "
+        f"get {_CHUNKS_PER_PROCESS} chunks, after reading all of the input)",
+    )
+    args = parser.parse_args()
+    if args.command == "batch":
+        try:
+            args.steps = script.parse(
+                args.script
+                if args.script_file is None
+                else args.script_file.read_text(encoding="utf-8")
+            )
+        except (OSError, script.ScriptError) as exc:
+            parser.error(str(exc))
+    try:
+        args.limits = _parse_limits(args.time_limit, args.memory_limit)
+    except ValueError as exc:
+        parser.error(str(exc))
+    if args.oeis is not None and not args.oeis.is_file():
+        parser.error(f"no such file: {args.oeis}")
+    return args
+
+
+def _parse_dimensions(value: str) -> Tuple[int, int]:
+    """Parse dimensions of the form WIDTHxHEIGHT.
+
+    Args:
+        value (str): The dimensions.
+
+    Raises:
+        argparse.ArgumentTypeError: If the value is malformed.
+
+    Returns:
+        Tuple[int, int]: The width and height.
+    """
+    width, _, height = value.lower().partition("x")
+    try:
+        return int(width), int(height)
+    except ValueError as exc:
+        raise argparse.ArgumentTypeError(f"invalid dimensions: {value}") from exc
+
+
+def _parse_limit(
+    values: List[str], scale: float
+) -> Tuple[Optional[float], Dict[str, float]]:
+    """Parse the values of a limit option.
+
+    Args:
+        values (List[str]): Values of the form [OPERATION=]NUMBER.
+        scale (float): What to multiply the numbers with.
+
+    Raises:
+        ValueError: If a value is malformed or names an unknown operation.
+
+    Returns:
+        Tuple[Optional[float], Dict[str, float]]: The limit for all operations,
+        if given, and the limits for named operations.
+    """
+    default: Optional[float] = None
+    named: Dict[str, float] = {}
+    for value in values:
+        name, _, number = value.rpartition("=")
+        if name and not callable(getattr(operations, name, None)):
+            raise ValueError(f"unknown operation: {name}")
+        try:
+            limit = float(number) * scale
+        except ValueError as exc:
+            raise ValueError(f"invalid limit: {value}") from exc
+        if name:
+            named[name] = limit
+        else:
+            default = limit
+    return default, named
+
+
+def _parse_limits(
+    time_limits: List[str], memory_limits: List[str]
+) -> Tuple[Limits, Dict[str, Limits]]:
+    """Combine the time and memory limit options. Anything not given falls back
+    to Limits.default().
+
+    Args:
+        time_limits (List[str]): The values of --time-limit.
+        memory_limits (List[str]): The values of --memory-limit.
+
+    Returns:
+        Tuple[Limits, Dict[str, Limits]]: The limits for all operations and for
+        specific operations.
+    """
+    default_time, named_time = _parse_limit(time_limits, 1)
+    default_memory, named_memory = _parse_limit(memory_limits, 2**20)
+    default = Limits.default()
+    default = Limits(
+        default.seconds if default_time is None else default_time,
+        default.rss if default_memory is None else int(default_memory),
+    )
+    named = {
+        name: Limits(
+            named_time.get(name, default.seconds),
+            int(named_memory[name]) if name in named_memory else default.rss,
+        )
+        for name in {*named_time, *named_memory}
+    }
+    return default, named
+
+
+def _inspect_cache(budget: Optional[int], clear: bool) -> None:
+    """Print a summary of the verification cache, after clearing it if asked to.
+
+    Args:
+        budget (Optional[int]): The cache's budget in bytes, None for the cache's
+        default.
+        clear (bool): Remove all results first?
+    """
+    from .files import VerificationCache  # pylint: disable=import-outside-toplevel
+
+    cache = VerificationCache() if budget is None else VerificationCache(budget=budget)
+    if clear:
+        cache.clear()
+    stats = cache.stats()
+    cache.close()
+    print(f"path    : {stats.path}")
+    print(f"results : {stats.entries} for {stats.tilings} tilings")
+    print(
+        f"size    : {stats.used_bytes / 2**20:.2f}MiB used, "
+        f"{stats.file_bytes / 2**20:.2f}MiB on disk, "
+        f"{stats.budget / 2**20:g}MiB budget"
+    )
+    for version, count in stats.by_version.items():
+        print(f"tilings {version} : {count} results")
+    if stats.by_strategy:
+        pad = max(len(strategy) for strategy in stats.by_strategy)
+        for strategy, counts in stats.by_strategy.items():
+            print(
+                f"{strategy}{' '*(pad-len(strategy))} : "
+                f"{counts.get(True, 0)} True, {counts.get(False, 0)} False"
+            )
+
+
+def _history_store() -> "HistoryStore":
+    """Open the history store. Segments that have not been moved into it yet are
+    added to it first.
+
+    Returns:
+        HistoryStore: The store.
+    """
+    from .files import History, HistoryStore  # pylint: disable=import-outside-toplevel
+
+    store = HistoryStore()
+    for path in History.segments():
+        store.add_session(path.name, *History.read_segment(path))
+    return store
+
+
+def _browse_history(args: argparse.Namespace) -> None:
+    """Print a page of exported tilings, most recent first.
+
+    Args:
+        args (argparse.Namespace): The options of the history command.
+    """
+    store = _history_store()
+    filters = (args.dimensions, args.max_obstructions)
+    total = store.count(*filters)
+    pages = max(1, -(-total // args.page_size))
+    offset = (args.page - 1) * args.page_size
+    entries = store.page(offset, args.page_size, *filters)
+    store.close()
+    print(f"page {args.page} of {pages}, {total} exports")
+    for i, entry in enumerate(entries, start=offset + 1):
+        width, height = entry.dimensions
+        print(
+            f"{i:>5}. {entry.tiling_time}  {width}x{height}  "
+            f"obstructions: {entry.obstructions}"
+        )
+        if args.show_json:
+            print(json.dumps(entry.tiling))
+
+
+def _read_tilings(path: pathlib.Path) -> Iterator[str]:
+    """Read tilings from a file of json lines. A line is either a tiling's json, an
+    exported tiling or an outcome of the batch command. The lines that describe
+    export sessions and the outcomes of failed steps are skipped. Lines that are
+    not json objects are passed on as they are, so that the batch command reports
+    them as failed in their place.
+
+    Args:
+        path (pathlib.Path): The file, - for stdin.
+
+    Yields:
+        Iterator[str]: The json of each tiling.
+    """
+    with (
+        contextlib.nullcontext(sys.stdin)
+        if str(path) == "-"
+        else open(path, encoding="utf-8")
+    ) as lines:
+        for line in lines:
+            if not line.strip():
+                continue
+            try:
+                value = json.loads(line)
+            except json.JSONDecodeError:
+                value = None
+            if not isinstance(value, dict):
+                yield line
+            elif "tiling" in value:
+                yield json.dumps(value["tiling"])
+            elif "session_time" not in value and "error" not in value:
+                yield line
+
+
+def _chunk_size(jobs: int, processes: int) -> int:
+    """Split jobs into chunks, enough for each process to get a few, so that the
+    processes finish at about the same time.
+
+    Args:
+        jobs (int): The number of jobs.
+        processes (int): The number of processes.
+
+    Returns:
+        int: The number of jobs in each chunk.
+    """
+    return max(1, jobs // (processes * _CHUNKS_PER_PROCESS))
+
+
+def _render_job(job: Tuple[str, str, str, int, int]) -> str:
+    """Render a tiling to a file, in a worker process.
+
+    Args:
+        job (Tuple[str, str, str, int, int]): The file format, the tiling's json,
+        the file's path and the image's width and height.
+
+    Returns:
+        str: The file's path.
+    """
+    file_format, tiling_json, path, width, height = job
+    return _RENDERERS[file_format](tiling_json, path, width, height)
+
+
+def _render(args: argparse.Namespace) -> None:
+    """Render tilings to png or tex files, one per tiling, numbered in the order
+    they are read. The path of each file is printed once it is written.
+
+    Args:
+        args (argparse.Namespace): The options of the render command.
+    """
+    if args.input is None:
+        store = _history_store()
+        tilings = list(store.tilings())
+        store.close()
+    else:
+        tilings = list(_read_tilings(args.input))
+    args.output.mkdir(parents=True, exist_ok=True)
+    jobs = [
+        (
+            args.format,
+            tiling,
+            str(args.output.joinpath(f"{i:05d}.{args.format}")),
+            *args.size,
+        )
+        for i, tiling in enumerate(tilings, start=1)
+    ]
+    processes = args.processes or multiprocessing.cpu_count()
+    chunk_size = _chunk_size(len(jobs), processes)
+    with multiprocessing.get_context("spawn").Pool(processes) as pool:
+        for path in pool.imap(_render_job, jobs, chunk_size):
+            print(path, flush=True)
+
+
+def _batch(args: argparse.Namespace) -> None:
+    """Apply a script to tilings and write the outcome for each as a json line, in
+    the order the tilings are read, as soon as it is known. How many tilings were
+    read and how many failed is printed to stderr at the end.
+
+    Args:
+        args (argparse.Namespace): The options of the batch command.
+    """
+    jobs: Iterable[Tuple[int, str]] = enumerate(_read_tilings(args.input), start=1)
+    processes = args.processes or multiprocessing.cpu_count()
+    chunk_size = args.chunk_size
+    if chunk_size is None:
+        jobs = list(jobs)
+        chunk_size = _chunk_size(len(jobs), processes)
+    failed = total = 0
+    with (
+        contextlib.nullcontext(sys.stdout)
+        if str(args.output) == "-"
+        else open(args.output, "w", encoding="utf-8")
+    ) as out, multiprocessing.get_context("spawn").Pool(processes) as pool:
+        for total, outcome in enumerate(
+            pool.imap(partial(script.run_json, args.steps), jobs, chunk_size), start=1
+        ):
+            failed += '"error": ' in outcome
+            out.write(outcome + "\n")
+            out.flush()
+    print(f"{total} tilings, {failed} failed", file=sys.stderr)
+
+
+def _budgets(args: argparse.Namespace) -> Dict[str, int]:
+    """Convert the budgets given on the command line to bytes. Budgets that are
+    not given are left out, so that the app's own defaults apply.
+
+    Args:
+        args (argparse.Namespace): The options.
+
+    Returns:
+        Dict[str, int]: The app's budget arguments by name.
+    """
+    return {
+        name: int(getattr(args, option) * 2**20)
+        for option, name in _BUDGETS.items()
+        if getattr(args, option) is not None
+    }
 
 
 def main() -> None:
     """The application's starting point."""
-    app = TilingGui(get_args(), resizable=True)  # type: ignore
+    args = get_args()
+    if args.command == "cache":
+        _inspect_cache(_budgets(args).get("verification_cache_budget"), args.clear)
+        return
+    if args.command == "history":
+        _browse_history(args)
+        return
+    if args.command == "render":
+        _render(args)
+        return
+    if args.command == "batch":
+        _batch(args)
+        return
+    report = StartupReport() if args.startup_report else None
+    from .app import TilingGui  # pylint: disable=import-outside-toplevel
+
+    if report is not None:
+        report.mark("app imported")
+    app = TilingGui(  # type: ignore
+        args.json,
+        resizable=True,
+        default_limits=args.limits[0],
+        action_limits=args.limits[1],
+        oeis_dump=None if args.oeis is None else args.oeis.absolute(),
+        startup_report=report,
+        **_budgets(args),
+    )
+    if report is not None:
+        report.mark("window created")
     app.start()
 
 
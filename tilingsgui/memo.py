@@ -0,0 +1,259 @@
+"""Remembering the results of tiling operations, so that repeating an action on a
+tiling that has been seen before, or on one of its symmetries, does not compute it
+again. The window only hashes the bytes of tilings, the symmetries are applied by
+run and restore in the worker processes, which is why this module must not
+import pyglet.
+"""
+
+from __future__ import annotations
+
+import sys
+from collections import OrderedDict
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    Callable,
+    ClassVar,
+    Hashable,
+    NamedTuple,
+    Optional,
+    Tuple,
+)
+
+from . import operations
+from .operations import SYMMETRIC_OPERATIONS
+from .symmetry import CanonicalForm, Symmetry
+
+if TYPE_CHECKING:
+    from tilings import Tiling
+
+
+class MemoStats(NamedTuple):
+    """Counters and usage of an operation memo."""
+
+    hits: int
+    misses: int
+    entries: int
+    nbytes: int
+    budget: int
+
+    def __str__(self) -> str:
+        return (
+            f"{self.hits} hits, {self.misses} misses, {self.entries} results in "
+            f"{self.nbytes / 2**20:.2f}MiB of {self.budget / 2**20:g}MiB"
+        )
+
+
+class MemoResult(NamedTuple):
+    """The value an operation returned in a worker process, along with the bytes
+    of the tiling it produced and of that tiling's symmetry, for the memo. Either
+    is None if there is no such tiling.
+    """
+
+    value: Any
+    data: Optional[bytes]
+    symmetric_data: Optional[bytes]
+
+
+def run(
+    func: Callable[..., Any],
+    tiling: Tiling,
+    args: Tuple[Any, ...],
+    sym: Optional[Symmetry],
+) -> MemoResult:
+    """Run an operation and get the bytes of its result for the memo.
+
+    Args:
+        func (Callable[..., Any]): A function from the operations module.
+        tiling (Tiling): The tiling to apply it to.
+        args (Tuple[Any, ...]): Its other arguments.
+        sym (Optional[Symmetry]): The symmetry that maps the tiling to its
+        canonical form, which the result is mapped by as well. None for the
+        operations that do not commute with symmetries.
+
+    Returns:
+        MemoResult: The value the operation returned and the bytes of the tiling
+        it produced, as is and mapped by the symmetry.
+    """
+    value = func(tiling, *args)
+    result = value[0] if func.__name__ == operations.factor.__name__ else value
+    if result is None:
+        return MemoResult(value, None, None)
+    return MemoResult(
+        value,
+        result.to_bytes(),
+        None if sym is None else sym.tiling(result).to_bytes(),
+    )
+
+
+def restore(data: bytes, sym: Symmetry) -> MemoResult:
+    """Map a result remembered for the canonical form of a tiling back to the
+    tiling.
+
+    Args:
+        data (bytes): The bytes of the remembered result.
+        sym (Symmetry): The symmetry that maps the tiling to its canonical form.
+
+    Returns:
+        MemoResult: The result for the tiling and its bytes.
+    """
+    from tilings import Tiling  # pylint: disable=import-outside-toplevel
+
+    tiling = sym.inverse().tiling(Tiling.from_bytes(data))
+    return MemoResult(tiling, tiling.to_bytes(), None)
+
+
+class OperationMemo:
+    """A least recently used memo of the tilings that operations produce. Keys
+    combine a hash of the tiling operated on, the operation's name and its other
+    arguments. For operations that commute with the symmetries of tilings, the
+    result is also kept under a key that describes the canonical form of the
+    tiling, with the arguments mapped to match, so that it is shared with the
+    tiling's symmetries. Results are kept as bytes and the oldest are dropped when
+    they take up more than the budget. The canonical forms of recent tilings are
+    remembered as well, by the hash of the tiling.
+    """
+
+    DEFAULT_BUDGET: ClassVar[int] = 32 * 2**20
+    _FORMS_SIZE: ClassVar[int] = 1024
+
+    @staticmethod
+    def key(name: str, tiling_digest: bytes, args: Tuple[Any, ...]) -> Hashable:
+        """Create the key of an operation.
+
+        Args:
+            name (str): The name of the operation.
+            tiling_digest (bytes): The hash of the bytes of the tiling it is
+            applied to.
+            args (Tuple[Any, ...]): Its other arguments, which must be hashable.
+
+        Returns:
+            Hashable: The key.
+        """
+        return tiling_digest, name, args
+
+    @staticmethod
+    def symmetric_key(
+        name: str, tiling: Tiling, args: Tuple[Any, ...], form: CanonicalForm
+    ) -> Optional[Hashable]:
+        """Create the key of an operation on the canonical form of the tiling it
+        is applied to.
+
+        Args:
+            name (str): The name of the operation.
+            tiling (Tiling): The tiling it is applied to.
+            args (Tuple[Any, ...]): Its other arguments, which must be hashable.
+            form (CanonicalForm): The canonical form of the tiling.
+
+        Returns:
+            Optional[Hashable]: The key, None if the operation does not commute
+            with the symmetries of tilings.
+        """
+        map_args = SYMMETRIC_OPERATIONS.get(name)
+        if map_args is None:
+            return None
+        return form.digest, name, map_args(form.symmetry, tiling, args)
+
+    def __init__(self, budget: int = DEFAULT_BUDGET) -> None:
+        """Create an empty memo.
+
+        Args:
+            budget (int): The most bytes the results may take up. Defaults to
+            OperationMemo.DEFAULT_BUDGET.
+        """
+        self._budget: int = budget
+        self._results: "OrderedDict[Hashable, bytes]" = OrderedDict()
+        self._forms: "OrderedDict[bytes, CanonicalForm]" = OrderedDict()
+        self._nbytes: int = 0
+        self._hits: int = 0
+        self._misses: int = 0
+
+    @staticmethod
+    def _size(key: Hashable, value: bytes) -> int:
+        """Estimate the memory an entry takes up.
+
+        Args:
+            key (Hashable): The key.
+            value (bytes): The result.
+
+        Returns:
+            int: The size in bytes.
+        """
+        return sys.getsizeof(key) + sys.getsizeof(value)
+
+    def get(self, key: Hashable, last: bool = True) -> Optional[bytes]:
+        """Look up the result of an operation.
+
+        Args:
+            key (Hashable): The operation's key.
+            last (bool): Is this the last lookup for the operation? Only then is a
+            miss counted. Defaults to True.
+
+        Returns:
+            Optional[bytes]: The bytes of the result, None if it is not known.
+        """
+        value = self._results.get(key)
+        if value is None:
+            self._misses += last
+            return None
+        self._hits += 1
+        self._results.move_to_end(key)
+        return value
+
+    def put(self, key: Hashable, value: bytes) -> None:
+        """Remember the result of an operation, dropping the oldest results if the
+        memo is over budget. Results larger than the budget are not kept.
+
+        Args:
+            key (Hashable): The operation's key.
+            value (bytes): The bytes of the result.
+        """
+        size = OperationMemo._size(key, value)
+        if size > self._budget:
+            return
+        old = self._results.pop(key, None)
+        if old is not None:
+            self._nbytes -= OperationMemo._size(key, old)
+        self._results[key] = value
+        self._nbytes += size
+        while self._nbytes > self._budget:
+            old_key, old = self._results.popitem(last=False)
+            self._nbytes -= OperationMemo._size(old_key, old)
+
+    def form(self, tiling_digest: bytes) -> Optional[CanonicalForm]:
+        """Look up the canonical form of a tiling.
+
+        Args:
+            tiling_digest (bytes): The hash of the tiling's bytes.
+
+        Returns:
+            Optional[CanonicalForm]: The canonical form, None if it is not known.
+        """
+        form = self._forms.get(tiling_digest)
+        if form is not None:
+            self._forms.move_to_end(tiling_digest)
+        return form
+
+    def put_form(self, tiling_digest: bytes, form: CanonicalForm) -> None:
+        """Remember the canonical form of a tiling, forgetting the least recently
+        used one if too many are remembered.
+
+        Args:
+            tiling_digest (bytes): The hash of the tiling's bytes.
+            form (CanonicalForm): Its canonical form.
+        """
+        self._forms[tiling_digest] = form
+        self._forms.move_to_end(tiling_digest)
+        if len(self._forms) > OperationMemo._FORMS_SIZE:
+            self._forms.popitem(last=False)
+
+    def stats(self) -> MemoStats:
+        """Get the memo's counters and usage.
+
+        Returns:
+            MemoStats: The hits, misses, number of results, their size and the
+            budget.
+        """
+        return MemoStats(
+            self._hits, self._misses, len(self._results), self._nbytes, self._budget
+        )
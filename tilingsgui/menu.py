@@ -4,19 +4,19 @@ from typing import Iterable
 
 import pyglet
 
-from tilings import Tiling
-
 from .events import CustomEvents, Observer
 from .files import Images
 from .geometry import Rectangle
-from .graphics import Color, GeoDrawer
+from .graphics import Color, Redrawable, ShapeBatch
 from .state import GuiState
 from .utils import paste
 from .widgets import Button, ButtonGrid, SelectionButton, TextBox, ToggleButton
 
 
-class TopMenu(pyglet.event.EventDispatcher, Observer):
-    """A menu that sits above the tiling plot."""
+class TopMenu(pyglet.event.EventDispatcher, Observer, Redrawable):
+    """A menu that sits above the tiling plot. It is drawn from a batch that is
+    only changed when the menu is moved.
+    """
 
     _PADDING = 1
     _INITIAL_MESSAGE = " -- Basis here -- e.g. 1234_1324"
@@ -46,12 +46,19 @@ class TopMenu(pyglet.event.EventDispatcher, Observer):
             should listen to. Defaults to an empty tuple.
         """
         Observer.__init__(self, dispatchers)
+        Redrawable.__init__(self)
         self._rect: Rectangle = Rectangle(x, y, w, h)
+        self._shapes: ShapeBatch = ShapeBatch(3)
+        self._background: pyglet.shapes.Rectangle = self._shapes.add_rectangle(
+            x, y, w, h, TopMenu._BACKGROUND_COLOR
+        )
         self._text_box: TextBox = TextBox(
             TopMenu._INITIAL_MESSAGE,
             TopMenu._FONT_SIZE,
             TopMenu._TEXT_COLOR,
             TopMenu._TEXT_BOX_COLOR,
+            self._shapes,
+            1,
         )
         self.position(w, h)
 
@@ -64,12 +71,24 @@ class TopMenu(pyglet.event.EventDispatcher, Observer):
         """
         self._rect.w = width
         self._rect.y = y
+        self._background.position = (self._rect.x, self._rect.y)
+        self._background.width = self._rect.w
         self._text_box.position(
             self._rect.x + TopMenu._PADDING,
             self._rect.y + TopMenu._PADDING,
             self._rect.w - 2 * TopMenu._PADDING,
             self._rect.h - 2 * TopMenu._PADDING,
         )
+        self.mark_dirty()
+
+    def is_dirty(self) -> bool:
+        """Does the menu need to be redrawn? It does while the text box has focus
+        as the caret blinks.
+
+        Returns:
+            bool: True iff it has changed since it was last drawn.
+        """
+        return self._dirty or self._text_box.has_focus()
 
     ##################
     # Event Handlers #
@@ -77,14 +96,8 @@ class TopMenu(pyglet.event.EventDispatcher, Observer):
 
     def on_draw(self):
         """Draw event handler."""
-        GeoDrawer.draw_rectangle(
-            self._rect.x,
-            self._rect.y,
-            self._rect.w,
-            self._rect.h,
-            TopMenu._BACKGROUND_COLOR,
-        )
-        self._text_box.draw()
+        self._shapes.draw()
+        self.mark_clean()
 
     def on_key_press(self, symbol: int, modifiers: int) -> bool:
         """Key pressed event handler.
@@ -102,6 +115,7 @@ class TopMenu(pyglet.event.EventDispatcher, Observer):
                 return True
             if symbol == pyglet.window.key.ESCAPE:
                 self._text_box.release_focus()
+                self.mark_dirty()
             elif symbol == pyglet.window.key.ENTER:
                 self._dispatch_input_if_not_empty()
             return True
@@ -171,10 +185,13 @@ class TopMenu(pyglet.event.EventDispatcher, Observer):
         Otherwise, use string to construct one with from_string.
         """
         self._text_box.release_focus()
+        self.mark_dirty()
         input_string = self._text_box.get_current_text()
         if not input_string:
             return
         if input_string[0] == "{" and input_string[-1] == "}":
+            from tilings import Tiling  # pylint: disable=import-outside-toplevel
+
             try:
                 tiling = Tiling.from_json(input_string)
                 self.dispatch_event(CustomEvents.ON_TILING_JSON_INPUT, tiling)
@@ -188,8 +205,10 @@ TopMenu.register_event_type(CustomEvents.ON_BASIS_INPUT)
 TopMenu.register_event_type(CustomEvents.ON_TILING_JSON_INPUT)
 
 
-class RightMenu(pyglet.event.EventDispatcher, Observer):
-    """A menu that sits to the right of the tiling plot."""
+class RightMenu(pyglet.event.EventDispatcher, Observer, Redrawable):
+    """A menu that sits to the right of the tiling plot. It is drawn from a batch
+    that is only changed when the menu is moved or a button is toggled.
+    """
 
     _PADDING = 1
     _INITIAL_MESSAGE = "Req: 12"
@@ -220,16 +239,23 @@ class RightMenu(pyglet.event.EventDispatcher, Observer):
             should listen to. Defaults to an empty tuple.
         """
         Observer.__init__(self, dispatchers)
+        Redrawable.__init__(self)
         self._rect: Rectangle = Rectangle(x, y, w, h)
         self._top: int = top
         self._state: GuiState = state
+        self._shapes: ShapeBatch = ShapeBatch(3)
+        self._background: pyglet.shapes.Rectangle = self._shapes.add_rectangle(
+            x, y, w, h, RightMenu._BACKGROUND_COLOR
+        )
         self._text_box: TextBox = TextBox(
             RightMenu._INITIAL_MESSAGE,
             RightMenu._FONT_SIZE,
             RightMenu._TEXT_COLOR,
             RightMenu._TEXT_BOX_COLOR,
+            self._shapes,
+            1,
         )
-        self._keyboard: ButtonGrid = ButtonGrid(8, 4)
+        self._keyboard: ButtonGrid = ButtonGrid(8, 4, self._shapes, 1)
         self._populate_keyboard()
         self.position(w, h)
 
@@ -242,6 +268,8 @@ class RightMenu(pyglet.event.EventDispatcher, Observer):
         """
         self._rect.x = x
         self._rect.h = height
+        self._background.position = (self._rect.x, self._rect.y)
+        self._background.height = self._rect.h
         self._text_box.position(
             self._rect.x + RightMenu._PADDING,
             self._rect.h - self._top + RightMenu._PADDING,
@@ -251,6 +279,16 @@ class RightMenu(pyglet.event.EventDispatcher, Observer):
         self._keyboard.position(
             self._rect.x, self._rect.y, self._rect.w, self._rect.h - self._top
         )
+        self.mark_dirty()
+
+    def is_dirty(self) -> bool:
+        """Does the menu need to be redrawn? It does while the text box has focus
+        as the caret blinks.
+
+        Returns:
+            bool: True iff it has changed since it was last drawn.
+        """
+        return self._dirty or self._text_box.has_focus()
 
     ##################
     # Event Handlers #
@@ -258,15 +296,8 @@ class RightMenu(pyglet.event.EventDispatcher, Observer):
 
     def on_draw(self) -> None:
         """Draw event handler."""
-        GeoDrawer.draw_rectangle(
-            self._rect.x,
-            self._rect.y,
-            self._rect.w,
-            self._rect.h,
-            RightMenu._BACKGROUND_COLOR,
-        )
-        self._text_box.draw()
-        self._keyboard.draw()
+        self._shapes.draw()
+        self.mark_clean()
 
     def on_key_press(self, symbol, _modifiers) -> bool:
         """Key pressed event handler.
@@ -281,6 +312,7 @@ class RightMenu(pyglet.event.EventDispatcher, Observer):
         if self._text_box.has_focus():
             if symbol == pyglet.window.key.ESCAPE:
                 self._text_box.release_focus()
+                self.mark_dirty()
             if symbol == pyglet.window.key.ENTER:
                 self._dispatch_input_if_not_empty()
             return True
@@ -311,6 +343,7 @@ class RightMenu(pyglet.event.EventDispatcher, Observer):
             return False
 
         self._keyboard.click_check(x, y)
+        self.mark_dirty()
         return False
 
     def on_text(self, text):
@@ -352,6 +385,7 @@ class RightMenu(pyglet.event.EventDispatcher, Observer):
         if it is non-empty.
         """
         self._text_box.release_focus()
+        self.mark_dirty()
         input_string = self._text_box.get_current_text()
         if input_string:
             self.dispatch_event(CustomEvents.ON_PLACEMENT_INPUT, input_string)
@@ -0,0 +1,246 @@
+"""Looking up sequences in a local copy of the OEIS. The copy is a dump in the
+format of the OEIS' stripped file, plain or gzipped, where each line is an
+A-number followed by a comma separated list of terms. The first time a dump is
+used, a compact index is built from it and saved. Later runs memory-map the
+index. This module must not import pyglet as the worker processes import it.
+"""
+
+import gzip
+import hashlib
+import mmap
+import os
+import pathlib
+import struct
+from array import array
+from bisect import bisect_left
+from typing import ClassVar, Dict, Iterator, List, Sequence, Set, Tuple
+
+
+class OeisIndex:
+    """A memory-mapped index of an OEIS dump. For the first few positions of each
+    sequence, a hash of the terms in a window starting there is kept in a sorted
+    array. Each hash refers to a record holding the sequence's A-number and its
+    first terms, which candidates are checked against.
+    """
+
+    WINDOW: ClassVar[int] = 5
+    _MAX_SHIFT: ClassVar[int] = 3
+    _STORED_TERMS: ClassVar[int] = 24
+    _MAGIC: ClassVar[bytes] = b"TGOEIS01"
+    _HEADER: ClassVar[struct.Struct] = struct.Struct("=8sQQQQ")
+
+    @staticmethod
+    def _key(terms: Sequence[bytes]) -> int:
+        """Hash a window of terms.
+
+        Args:
+            terms (Sequence[bytes]): The terms as decimal strings.
+
+        Returns:
+            int: A 64 bit hash.
+        """
+        digest = hashlib.blake2b(b",".join(terms), digest_size=8).digest()
+        return int.from_bytes(digest, "little")
+
+    @staticmethod
+    def _read(dump: pathlib.Path) -> Iterator[Tuple[bytes, List[bytes]]]:
+        """Read the sequences of a dump, decompressing it if it is gzipped.
+        Sequences with fewer terms than a window are skipped.
+
+        Args:
+            dump (pathlib.Path): The dump.
+
+        Yields:
+            Iterator[Tuple[bytes, List[bytes]]]: The A-number and first terms of
+            each sequence.
+        """
+        opener = gzip.open if dump.suffix == ".gz" else open
+        with opener(dump, "rb") as dump_file:
+            for line in dump_file:
+                if line.startswith(b"#"):
+                    continue
+                anum, _, data = line.partition(b" ")
+                terms = data.strip().strip(b",").split(b",")
+                if len(terms) >= OeisIndex.WINDOW:
+                    yield anum, terms[: OeisIndex._STORED_TERMS]
+
+    @staticmethod
+    def _stamp(dump: pathlib.Path) -> Tuple[int, int]:
+        """Identify the version of a dump that an index was built from.
+
+        Args:
+            dump (pathlib.Path): The dump.
+
+        Returns:
+            Tuple[int, int]: The dump's size and modification time.
+        """
+        stat = dump.stat()
+        return stat.st_size, stat.st_mtime_ns
+
+    @staticmethod
+    def build(dump: pathlib.Path, index: pathlib.Path) -> None:
+        """Build an index of a dump and save it. The file is replaced at once, so
+        that other processes never see a partial index.
+
+        Args:
+            dump (pathlib.Path): The dump.
+            index (pathlib.Path): Where to save the index.
+        """
+        entries: List[Tuple[int, int]] = []
+        blob = bytearray()
+        for anum, terms in OeisIndex._read(dump):
+            ref = len(blob)
+            blob += anum + b" " + b",".join(terms) + b"\n"
+            last = min(OeisIndex._MAX_SHIFT, len(terms) - OeisIndex.WINDOW)
+            for shift in range(last + 1):
+                window = terms[shift : shift + OeisIndex.WINDOW]
+                entries.append((OeisIndex._key(window), ref))
+        entries.sort()
+        keys = array("Q", (key for key, _ in entries))
+        refs = array("Q", (ref for _, ref in entries))
+        index.parent.mkdir(parents=True, exist_ok=True)
+        tmp = index.with_name(f"{index.name}.{os.getpid()}.tmp")
+        with open(tmp, "wb") as index_file:
+            index_file.write(
+                OeisIndex._HEADER.pack(
+                    OeisIndex._MAGIC, *OeisIndex._stamp(dump), len(entries), len(blob)
+                )
+            )
+            keys.tofile(index_file)
+            refs.tofile(index_file)
+            index_file.write(blob)
+        os.replace(tmp, index)
+
+    def __init__(self, dump: pathlib.Path, index: pathlib.Path) -> None:
+        """Memory-map the index of a dump, building it first if it is missing or
+        was built from another version of the dump.
+
+        Args:
+            dump (pathlib.Path): The dump.
+            index (pathlib.Path): The index.
+        """
+        self._dump: pathlib.Path = dump
+        if not self._load(index):
+            OeisIndex.build(dump, index)
+            self._load(index)
+
+    def _load(self, index: pathlib.Path) -> bool:
+        """Memory-map an index if it is valid for the dump.
+
+        Args:
+            index (pathlib.Path): The index.
+
+        Returns:
+            bool: True iff the index was loaded.
+        """
+        try:
+            with open(index, "rb") as index_file:
+                self._map = mmap.mmap(index_file.fileno(), 0, access=mmap.ACCESS_READ)
+        except (FileNotFoundError, ValueError):
+            return False
+        header = OeisIndex._HEADER
+        if len(self._map) < header.size or not self.is_current():
+            self._map.close()
+            return False
+        count = header.unpack_from(self._map)[3]
+        view = memoryview(self._map)
+        refs_start = header.size + 8 * count
+        self._keys: memoryview = view[header.size : refs_start].cast("Q")
+        self._refs: memoryview = view[refs_start : refs_start + 8 * count].cast("Q")
+        self._blob: int = refs_start + 8 * count
+        return True
+
+    def is_current(self) -> bool:
+        """Check if the dump is unchanged since the index was built.
+
+        Returns:
+            bool: True iff the index is valid for the dump.
+        """
+        magic, size, mtime, _, _ = OeisIndex._HEADER.unpack_from(self._map)
+        try:
+            return magic == OeisIndex._MAGIC and (size, mtime) == OeisIndex._stamp(
+                self._dump
+            )
+        except FileNotFoundError:
+            return False
+
+    def _record(self, ref: int) -> Tuple[str, List[bytes]]:
+        """Read a record.
+
+        Args:
+            ref (int): The record's position in the blob.
+
+        Returns:
+            Tuple[str, List[bytes]]: The A-number and the stored terms.
+        """
+        start = self._blob + ref
+        line = self._map[start : self._map.find(b"\n", start)]
+        anum, _, terms = line.partition(b" ")
+        return anum.decode(), terms.split(b",")
+
+    @staticmethod
+    def _contains(terms: Sequence[bytes], query: Sequence[bytes]) -> bool:
+        """Check if a query matches a sequence from one of its first positions.
+        The query may run past the terms that are stored.
+
+        Args:
+            terms (Sequence[bytes]): The stored terms of the sequence.
+            query (Sequence[bytes]): The terms to look for.
+
+        Returns:
+            bool: True iff the query matches.
+        """
+        for shift in range(OeisIndex._MAX_SHIFT + 1):
+            window = terms[shift : shift + len(query)]
+            if len(window) < OeisIndex.WINDOW:
+                return False
+            if list(window) == list(query[: len(window)]):
+                return True
+        return False
+
+    def search(self, terms: Sequence[int]) -> List[str]:
+        """Find the sequences that contain the terms. Up to a few of the first terms
+        may be skipped, and the sequence may start up to a few terms before the
+        match. The fewest terms are skipped that give a match.
+
+        Args:
+            terms (Sequence[int]): The terms to look for.
+
+        Returns:
+            List[str]: The A-numbers of the matching sequences, in order.
+        """
+        query = [str(term).encode() for term in terms]
+        found: Set[str] = set()
+        last = min(OeisIndex._MAX_SHIFT, len(query) - OeisIndex.WINDOW)
+        for skip in range(last + 1):
+            key = OeisIndex._key(query[skip : skip + OeisIndex.WINDOW])
+            i = bisect_left(self._keys, key)
+            while i < len(self._keys) and self._keys[i] == key:
+                anum, stored = self._record(self._refs[i])
+                if anum not in found and OeisIndex._contains(stored, query[skip:]):
+                    found.add(anum)
+                i += 1
+            if found:
+                break
+        return sorted(found)
+
+
+_INDEXES: Dict[Tuple[str, str], OeisIndex] = {}
+
+
+def search(dump: str, index: str, terms: Sequence[int]) -> List[str]:
+    """Find the sequences of a dump that contain the terms. The index is kept open
+    for later searches in the same process.
+
+    Args:
+        dump (str): The path of the dump.
+        index (str): The path of its index, which is built if needed.
+        terms (Sequence[int]): The terms to look for.
+
+    Returns:
+        List[str]: The A-numbers of the matching sequences, in order.
+    """
+    paths = (dump, index)
+    if paths not in _INDEXES or not _INDEXES[paths].is_current():
+        _INDEXES[paths] = OeisIndex(pathlib.Path(dump), pathlib.Path(index))
+    return _INDEXES[paths].search(terms)
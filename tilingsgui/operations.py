@@ -0,0 +1,329 @@
+"""Tiling operations behind the actions of the GUI. They take a tiling and return
+the resulting one, or None if the operation does not apply, except for
+factor_components, count_gridded_perms and verify which report on the tiling, and
+factor which reports the components it found as well. They are module level
+functions so that they can be run in worker processes, which is also why this
+module must not import pyglet. Nor does it import tilings until an operation runs,
+as the window imports it and should not wait for tilings to load.
+"""
+
+from __future__ import annotations
+
+import importlib
+from typing import TYPE_CHECKING, Any, Callable, Dict, FrozenSet, Optional, Tuple
+
+from .symmetry import Symmetry
+
+if TYPE_CHECKING:
+    from permuta import Perm
+    from tilings import GriddedPerm, Tiling
+
+Component = FrozenSet[Tuple[int, int]]
+
+ArgsMap = Callable[[Symmetry, "Tiling", Tuple[Any, ...]], Tuple[Any, ...]]
+
+# The strategies in tilings.strategies by name, and the arguments to create them
+# with.
+VERIFICATION_STRATEGIES: Dict[str, Dict[str, Any]] = {
+    "BasicVerificationStrategy": {},
+    # "DatabaseVerificationStrategy": {},  # Removed in tilings 4.0.0
+    "ElementaryVerificationStrategy": {},
+    "InsertionEncodingVerificationStrategy": {},
+    "LocallyFactorableVerificationStrategy": {},
+    "LocalVerificationStrategy": {"no_factors": False},
+    "MonotoneTreeVerificationStrategy": {},
+    "OneByOneVerificationStrategy": {},
+}
+
+# The strategies whose verdict is the same for all symmetries of a tiling. The
+# insertion encoding is only checked from the right and the top.
+SYMMETRIC_STRATEGIES: FrozenSet[str] = frozenset(VERIFICATION_STRATEGIES) - {
+    "InsertionEncodingVerificationStrategy"
+}
+
+
+def add_single_cell_requirement(
+    tiling: Tiling, patt: Perm, cell: Tuple[int, int]
+) -> Tiling:
+    """Add a requirement of a pattern contained in a single cell.
+
+    Args:
+        tiling (Tiling): The tiling to add to.
+        patt (Perm): The pattern.
+        cell (Tuple[int, int]): The cell.
+
+    Returns:
+        Tiling: The tiling with the requirement.
+    """
+    return tiling.add_single_cell_requirement(patt, cell)
+
+
+def add_single_cell_obstruction(
+    tiling: Tiling, patt: Perm, cell: Tuple[int, int]
+) -> Tiling:
+    """Add an obstruction of a pattern contained in a single cell.
+
+    Args:
+        tiling (Tiling): The tiling to add to.
+        patt (Perm): The pattern.
+        cell (Tuple[int, int]): The cell.
+
+    Returns:
+        Tiling: The tiling with the obstruction.
+    """
+    return tiling.add_single_cell_obstruction(patt, cell)
+
+
+def place_point(
+    tiling: Tiling, g_perm: GriddedPerm, idx: int, direction: int
+) -> Tiling:
+    """Place a point of a requirement's gridded perm.
+
+    Args:
+        tiling (Tiling): The tiling to place into.
+        g_perm (GriddedPerm): The gridded perm.
+        idx (int): The index of the point to place.
+        direction (int): The placement direction.
+
+    Returns:
+        Tiling: The tiling with the point placed.
+    """
+    return tiling.place_point_of_gridded_permutation(g_perm, idx, direction)
+
+
+def partial_place_point(
+    tiling: Tiling, g_perm: GriddedPerm, idx: int, direction: int
+) -> Tiling:
+    """Partially place a point of a requirement's gridded perm.
+
+    Args:
+        tiling (Tiling): The tiling to place into.
+        g_perm (GriddedPerm): The gridded perm.
+        idx (int): The index of the point to place.
+        direction (int): The placement direction.
+
+    Returns:
+        Tiling: The tiling with the point partially placed.
+    """
+    return tiling.partial_place_point_of_gridded_permutation(g_perm, idx, direction)
+
+
+def factor_components(tiling: Tiling, interleaving: bool) -> Tuple[Component, ...]:
+    """Find the components of a tiling's factors.
+
+    Args:
+        tiling (Tiling): The tiling to factor.
+        interleaving (bool): Allow interleaving factors?
+
+    Returns:
+        Tuple[Component, ...]: The cells of each factor.
+    """
+    algorithms = importlib.import_module("tilings.algorithms")
+    fac_algo = (
+        algorithms.FactorWithInterleaving(tiling)
+        if interleaving
+        else algorithms.Factor(tiling)
+    )
+    return tuple(frozenset(component) for component in fac_algo.get_components())
+
+
+def factor_component(tiling: Tiling, component: Component) -> Tiling:
+    """Get the factor with the given cells, in the same way as Factor.factors does
+    for each of the factors. Like Factor.factors, an empty tiling has the empty
+    tiling as its only factor.
+
+    Args:
+        tiling (Tiling): The tiling to factor.
+        component (Component): The cells of the factor.
+
+    Returns:
+        Tiling: The factor.
+    """
+    if tiling.is_empty():
+        empty_perm = importlib.import_module("tilings").GriddedPerm((), ())
+        return tiling.__class__(obstructions=(empty_perm,), simplify=False)
+    assumptions = (
+        ass.__class__(gp for gp in ass.gps if gp.pos[0] in component)
+        for ass in tiling.assumptions
+    )
+    return tiling.__class__(
+        obstructions=(ob for ob in tiling.obstructions if ob.pos[0] in component),
+        requirements=(req for req in tiling.requirements if req[0].pos[0] in component),
+        assumptions=tuple(sorted(set(ass for ass in assumptions if ass.gps))),
+        simplify=False,
+    )
+
+
+def factor(
+    tiling: Tiling, cell: Tuple[int, int], interleaving: bool
+) -> Tuple[Optional[Tiling], Tuple[Component, ...]]:
+    """Get the factor that a cell belongs to. Only that factor is built.
+
+    Args:
+        tiling (Tiling): The tiling to factor.
+        cell (Tuple[int, int]): The cell.
+        interleaving (bool): Allow interleaving factors?
+
+    Returns:
+        Tuple[Optional[Tiling], Tuple[Component, ...]]: The factor, None if the
+        cell is in none of them, and the components of all the factors, so that
+        they need not be found again for the same tiling.
+    """
+    components = factor_components(tiling, interleaving)
+    for component in components:
+        if cell in component:
+            return factor_component(tiling, component), components
+    return None, components
+
+
+def fusion(tiling: Tiling, row: Optional[int], col: Optional[int]) -> Tiling:
+    """Fuse a row with the one above it or a column with the one to its right.
+
+    Args:
+        tiling (Tiling): The tiling to fuse.
+        row (Optional[int]): The row, if fusing rows.
+        col (Optional[int]): The column, if fusing columns.
+
+    Returns:
+        Tiling: The fused tiling.
+    """
+    return tiling.fusion(row=row, col=col)
+
+
+def component_fusion(tiling: Tiling, row: Optional[int], col: Optional[int]) -> Tiling:
+    """Component fuse a row with the one above it or a column with the one to its
+    right.
+
+    Args:
+        tiling (Tiling): The tiling to fuse.
+        row (Optional[int]): The row, if fusing rows.
+        col (Optional[int]): The column, if fusing columns.
+
+    Returns:
+        Tiling: The fused tiling.
+    """
+    return tiling.component_fusion(row=row, col=col)
+
+
+def row_and_column_separation(tiling: Tiling) -> Tiling:
+    """Separate the rows and columns of a tiling.
+
+    Args:
+        tiling (Tiling): The tiling to separate.
+
+    Returns:
+        Tiling: The separated tiling.
+    """
+    return tiling.row_and_column_separation()
+
+
+def obstruction_transitivity(tiling: Tiling) -> Tiling:
+    """Add obstructions implied by transitivity of length 2 obstructions.
+
+    Args:
+        tiling (Tiling): The tiling.
+
+    Returns:
+        Tiling: The tiling with the implied obstructions.
+    """
+    return tiling.obstruction_transitivity()
+
+
+def obstruction_inferral(tiling: Tiling, length: int) -> Tiling:
+    """Add all obstructions up to a length that can be inferred.
+
+    Args:
+        tiling (Tiling): The tiling.
+        length (int): The longest obstructions to look for.
+
+    Returns:
+        Tiling: The tiling with the inferred obstructions.
+    """
+    return tiling.all_obstruction_inferral(length)
+
+
+def count_gridded_perms(tiling: Tiling, length: int) -> int:
+    """Count the gridded perms of a given length on a tiling.
+
+    Args:
+        tiling (Tiling): The tiling.
+        length (int): The length of the gridded perms.
+
+    Returns:
+        int: The number of gridded perms.
+    """
+    return sum(1 for _ in tiling.gridded_perms_of_length(length))
+
+
+def verify(tiling: Tiling, strategy: str) -> bool:
+    """Apply a verification strategy to a tiling.
+
+    Args:
+        tiling (Tiling): The tiling to verify.
+        strategy (str): A key of VERIFICATION_STRATEGIES.
+
+    Returns:
+        bool: True iff the strategy verifies the tiling.
+    """
+    strategy_class = getattr(importlib.import_module("tilings.strategies"), strategy)
+    return bool(strategy_class(**VERIFICATION_STRATEGIES[strategy]).verified(tiling))
+
+
+def _same_args(_sym: Symmetry, _tiling: Tiling, args: Tuple[Any, ...]) -> Tuple:
+    """Map arguments that do not change with the symmetry."""
+    return args
+
+
+def _cell_insertion_args(sym: Symmetry, tiling: Tiling, args: Tuple[Any, ...]) -> Tuple:
+    """Map the pattern and cell of a cell insertion."""
+    patt, cell = args
+    return sym.perm(patt), sym.cell(cell, tiling.dimensions)
+
+
+def _placement_args(sym: Symmetry, tiling: Tiling, args: Tuple[Any, ...]) -> Tuple:
+    """Map the gridded perm, point and direction of a placement."""
+    g_perm, idx, direction = args
+    return (
+        sym.gridded_perm(g_perm, tiling.dimensions),
+        sym.point_index(g_perm.patt, idx),
+        sym.direction(direction),
+    )
+
+
+def _factor_args(sym: Symmetry, tiling: Tiling, args: Tuple[Any, ...]) -> Tuple:
+    """Map the cell of a factoring."""
+    cell, interleaving = args
+    return sym.cell(cell, tiling.dimensions), interleaving
+
+
+def _component_args(sym: Symmetry, tiling: Tiling, args: Tuple[Any, ...]) -> Tuple:
+    """Map the cells of a factor."""
+    (component,) = args
+    return (frozenset(sym.cell(cell, tiling.dimensions) for cell in component),)
+
+
+def _fusion_args(sym: Symmetry, tiling: Tiling, args: Tuple[Any, ...]) -> Tuple:
+    """Map the row or column of a fusion."""
+    row, col = args
+    is_row, index = sym.fusion(
+        row is not None, col if row is None else row, tiling.dimensions
+    )
+    return (index, None) if is_row else (None, index)
+
+
+# For the operations that commute with the symmetries of tilings, how to map
+# their arguments, other than the tiling, along with the tiling. Row and column
+# separation does not, as it can order the cells of a row differently from those
+# of its reverse.
+SYMMETRIC_OPERATIONS: Dict[str, ArgsMap] = {
+    add_single_cell_requirement.__name__: _cell_insertion_args,
+    add_single_cell_obstruction.__name__: _cell_insertion_args,
+    place_point.__name__: _placement_args,
+    partial_place_point.__name__: _placement_args,
+    factor.__name__: _factor_args,
+    factor_component.__name__: _component_args,
+    fusion.__name__: _fusion_args,
+    component_fusion.__name__: _fusion_args,
+    obstruction_transitivity.__name__: _same_args,
+    obstruction_inferral.__name__: _same_args,
+}
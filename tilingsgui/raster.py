@@ -0,0 +1,369 @@
+"""Drawing tilings to images without a window. A raster takes the same shapes as
+the batch a tiling plot is drawn with and paints them in pure Python, so that
+tilings can be rendered to PNG files on machines with neither a display nor a
+GPU. Tikz drawings of tilings can be written to files in the same way. This module
+must not import pyglet as the worker processes import it. The tiling plot, and
+with it pyglet, is imported when the first tiling is rendered, with pyglet made
+headless unless a window has been opened.
+"""
+
+from __future__ import annotations
+
+import math
+import struct
+import sys
+import zlib
+from functools import partial
+from typing import (
+    TYPE_CHECKING,
+    Callable,
+    ClassVar,
+    Dict,
+    List,
+    Optional,
+    Sequence,
+    Tuple,
+)
+
+from .geometry import Point
+from .state import GuiState
+
+if TYPE_CHECKING:
+    from tilings import Tiling
+
+RGB = Tuple[float, float, float]
+
+
+class Raster:
+    """An RGB image that shapes are painted on. Shapes are placed in layers, like
+    in a shape batch, and a higher layer is painted over a lower one. Coordinates
+    start at the bottom left corner and each pixel is a unit square.
+    """
+
+    _PNG_SIGNATURE: ClassVar[bytes] = b"\x89PNG\r\n\x1a\n"
+    _COMPRESSION: ClassVar[int] = 6
+
+    def __init__(self, width: int, height: int, background: RGB = (1, 1, 1)) -> None:
+        """Create an empty raster.
+
+        Args:
+            width (int): The width in pixels.
+            height (int): The height in pixels.
+            background (Tuple[float, float, float], optional): The color of pixels
+            no shape covers. Defaults to white.
+        """
+        self.width: int = width
+        self.height: int = height
+        self._background: bytes = Raster._rgb(background)
+        self._layers: Dict[int, List[Callable[[bytearray], None]]] = {}
+
+    @staticmethod
+    def _rgb(color: RGB) -> bytes:
+        """Convert a color to the bytes of a pixel.
+
+        Args:
+            color (Tuple[float, float, float]): An RGB color with values in [0, 1].
+
+        Returns:
+            bytes: The red, green and blue bytes.
+        """
+        return bytes(round(255 * min(max(value, 0.0), 1.0)) for value in color)
+
+    def _add(self, layer: int, paint: Callable[[bytearray], None]) -> None:
+        """Add a shape to a layer.
+
+        Args:
+            layer (int): The layer.
+            paint (Callable[[bytearray], None]): Paints the shape on the pixels.
+        """
+        self._layers.setdefault(layer, []).append(paint)
+
+    def add_line_segment(
+        self, x1: float, y1: float, x2: float, y2: float, color: RGB, layer: int = 0
+    ) -> None:
+        """Add a line segment.
+
+        Args:
+            x1 (float): Start x coordinate.
+            y1 (float): Start y coordinate.
+            x2 (float): End x coordinate.
+            y2 (float): End y coordinate.
+            color (Tuple[float, float, float]): RGB valued color.
+            layer (int, optional): The layer to paint in. Defaults to 0.
+        """
+        self._add(layer, partial(self._paint_line, x1, y1, x2, y2, Raster._rgb(color)))
+
+    def add_circle(
+        self, x: float, y: float, r: float, color: RGB, layer: int = 0, splits: int = 30
+    ) -> None:
+        """Add a circle. Unlike in a batch, it is painted as a true circle so the
+        number of splits is ignored.
+
+        Args:
+            x (float): The circle center's x coordinate.
+            y (float): The circle center's y coordinate.
+            r (float): The circle's radius.
+            color (Tuple[float, float, float]): The fill color of the circle.
+            layer (int, optional): The layer to paint in. Defaults to 0.
+            splits (int, optional): Ignored. Defaults to 30.
+        """
+        del splits
+        self._add(layer, partial(self._paint_circle, x, y, r, Raster._rgb(color)))
+
+    def add_rectangle(
+        self, x: float, y: float, w: float, h: float, color: RGB, layer: int = 0
+    ) -> None:
+        """Add a rectangle.
+
+        Args:
+            x (float): South west corner's x coordinate.
+            y (float): South west corner's y coordinate.
+            w (float): Horizontal length.
+            h (float): Vertical length.
+            color (Tuple[float, float, float]): Fill color.
+            layer (int, optional): The layer to paint in. Defaults to 0.
+        """
+        self._add(layer, partial(self._paint_rectangle, x, y, w, h, Raster._rgb(color)))
+
+    def add_point_path(
+        self, pnt_path: Sequence[Point], color: RGB, point_size: float, layer: int = 0
+    ) -> None:
+        """Add a point path. Its line segments are painted in the given layer and
+        its points in the one above it.
+
+        Args:
+            pnt_path (Sequence[Point]): The list of points in order.
+            color (Tuple[float, float, float]): Color of line segments and point fills.
+            point_size (float): Radius of the circle representing the points.
+            layer (int, optional): The layer of the line segments. Defaults to 0.
+        """
+        for p1, p2 in zip(pnt_path, pnt_path[1:]):
+            self.add_line_segment(p1.x, p1.y, p2.x, p2.y, color, layer)
+        for pnt in pnt_path:
+            self.add_circle(pnt.x, pnt.y, point_size, color, layer + 1)
+
+    def clear(self) -> None:
+        """Remove all shapes."""
+        self._layers.clear()
+
+    def pixels(self) -> bytes:
+        """Paint all shapes.
+
+        Returns:
+            bytes: The RGB pixels, from the bottom row up.
+        """
+        pixels = bytearray(self._background * (self.width * self.height))
+        for layer in sorted(self._layers):
+            for paint in self._layers[layer]:
+                paint(pixels)
+        return bytes(pixels)
+
+    def to_png(self) -> bytes:
+        """Paint all shapes and encode the image as a PNG.
+
+        Returns:
+            bytes: The PNG file's contents.
+        """
+        pixels, stride = self.pixels(), 3 * self.width
+        rows = b"".join(
+            b"\x00" + pixels[y * stride : (y + 1) * stride]
+            for y in reversed(range(self.height))
+        )
+        header = struct.pack(">IIBBBBB", self.width, self.height, 8, 2, 0, 0, 0)
+        return b"".join(
+            (
+                Raster._PNG_SIGNATURE,
+                Raster._chunk(b"IHDR", header),
+                Raster._chunk(b"IDAT", zlib.compress(rows, Raster._COMPRESSION)),
+                Raster._chunk(b"IEND", b""),
+            )
+        )
+
+    def save(self, path: str) -> None:
+        """Paint all shapes and write the image to a PNG file.
+
+        Args:
+            path (str): The file's path.
+        """
+        with open(path, "wb") as png_file:
+            png_file.write(self.to_png())
+
+    @staticmethod
+    def _chunk(kind: bytes, data: bytes) -> bytes:
+        """Create a PNG chunk.
+
+        Args:
+            kind (bytes): The chunk's four letter type.
+            data (bytes): Its data.
+
+        Returns:
+            bytes: The chunk with its length and checksum.
+        """
+        return (
+            struct.pack(">I", len(data))
+            + kind
+            + data
+            + struct.pack(">I", zlib.crc32(kind + data))
+        )
+
+    def _fill_row(
+        self, pixels: bytearray, y: int, x1: int, x2: int, rgb: bytes
+    ) -> None:
+        """Paint the pixels of a row from x1 up to but not including x2. Pixels
+        outside the raster are skipped.
+
+        Args:
+            pixels (bytearray): The pixels.
+            y (int): The row.
+            x1 (int): The first column.
+            x2 (int): The column after the last.
+            rgb (bytes): The color.
+        """
+        x1, x2 = max(x1, 0), min(x2, self.width)
+        if 0 <= y < self.height and x1 < x2:
+            start = 3 * (y * self.width + x1)
+            pixels[start : start + 3 * (x2 - x1)] = rgb * (x2 - x1)
+
+    def _paint_rectangle(
+        self, x: float, y: float, w: float, h: float, rgb: bytes, pixels: bytearray
+    ) -> None:
+        """Paint the pixels whose centers are in a rectangle.
+
+        Args:
+            x (float): South west corner's x coordinate.
+            y (float): South west corner's y coordinate.
+            w (float): Horizontal length.
+            h (float): Vertical length.
+            rgb (bytes): The color.
+            pixels (bytearray): The pixels.
+        """
+        x1, x2 = math.ceil(x - 0.5), math.ceil(x + w - 0.5)
+        for row in range(math.ceil(y - 0.5), math.ceil(y + h - 0.5)):
+            self._fill_row(pixels, row, x1, x2, rgb)
+
+    def _paint_circle(
+        self, x: float, y: float, r: float, rgb: bytes, pixels: bytearray
+    ) -> None:
+        """Paint the pixels whose centers are in a circle.
+
+        Args:
+            x (float): The circle center's x coordinate.
+            y (float): The circle center's y coordinate.
+            r (float): The circle's radius.
+            rgb (bytes): The color.
+            pixels (bytearray): The pixels.
+        """
+        for row in range(math.floor(y - r), math.ceil(y + r) + 1):
+            d_y = row + 0.5 - y
+            if abs(d_y) <= r:
+                half = math.sqrt(r * r - d_y * d_y)
+                self._fill_row(
+                    pixels,
+                    row,
+                    math.ceil(x - half - 0.5),
+                    math.floor(x + half + 0.5),
+                    rgb,
+                )
+
+    def _paint_line(
+        self,
+        x1: float,
+        y1: float,
+        x2: float,
+        y2: float,
+        rgb: bytes,
+        pixels: bytearray,
+    ) -> None:
+        """Paint a line segment one pixel wide. Like in the window, a line on a
+        pixel boundary covers the pixel below or to the left of it.
+
+        Args:
+            x1 (float): Start x coordinate.
+            y1 (float): Start y coordinate.
+            x2 (float): End x coordinate.
+            y2 (float): End y coordinate.
+            rgb (bytes): The color.
+            pixels (bytearray): The pixels.
+        """
+        steps = max(math.ceil(max(abs(x2 - x1), abs(y2 - y1))), 1)
+        for i in range(steps + 1):
+            col = math.ceil(x1 + (x2 - x1) * i / steps - 1)
+            row = math.ceil(y1 + (y2 - y1) * i / steps - 1)
+            self._fill_row(pixels, row, col, col + 1, rgb)
+
+
+def _headless() -> None:
+    """Make pyglet headless before the tiling plot imports it, unless a window has
+    been opened in this process.
+    """
+    if "pyglet.window" not in sys.modules:
+        import pyglet  # pylint: disable=import-outside-toplevel
+
+        pyglet.options["headless"] = True
+
+
+def render(
+    tiling: Tiling, width: int, height: int, state: Optional[GuiState] = None
+) -> Raster:
+    """Draw a tiling as the window would, with the points placed afresh.
+
+    Args:
+        tiling (Tiling): The tiling.
+        width (int): The width of the image in pixels.
+        height (int): The height of the image in pixels.
+        state (Optional[GuiState]): The display settings. Defaults to those the
+        window starts with.
+
+    Returns:
+        Raster: The drawing.
+    """
+    _headless()
+    from .tplot import TPlot  # pylint: disable=import-outside-toplevel
+
+    raster = Raster(width, height)
+    TPlot(tiling, width, height).render(raster, state or GuiState())
+    return raster
+
+
+def render_png(tiling_json: str, path: str, width: int, height: int) -> str:
+    """Draw a tiling to a PNG file with the default display settings. Takes and
+    returns plain values, so that it can be run in a process pool.
+
+    Args:
+        tiling_json (str): The tiling's json.
+        path (str): Where to write the PNG file.
+        width (int): The width of the image in pixels.
+        height (int): The height of the image in pixels.
+
+    Returns:
+        str: The path of the PNG file.
+    """
+    from tilings import Tiling  # pylint: disable=import-outside-toplevel
+
+    render(Tiling.from_json(tiling_json), width, height).save(path)
+    return path
+
+
+def render_tex(tiling_json: str, path: str, width: int, height: int) -> str:
+    """Write a tikz drawing of a tiling to a file, as the tikz button would print
+    it, with the points placed afresh. Takes and returns plain values, so that it
+    can be run in a process pool.
+
+    Args:
+        tiling_json (str): The tiling's json.
+        path (str): Where to write the tex file.
+        width (int): The width of the drawing in pixels, a hundredth of a unit.
+        height (int): The height of the drawing in pixels, a hundredth of a unit.
+
+    Returns:
+        str: The path of the tex file.
+    """
+    _headless()
+    from tilings import Tiling  # pylint: disable=import-outside-toplevel
+
+    from .tplot import TPlot  # pylint: disable=import-outside-toplevel
+
+    with open(path, "w", encoding="utf-8") as tex_file:
+        tex_file.write(TPlot(Tiling.from_json(tiling_json), width, height).to_tikz())
+        tex_file.write("\n")
+    return path
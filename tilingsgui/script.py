@@ -0,0 +1,254 @@
+"""Scripts of operations, which apply the actions of the GUI to tilings without a
+window. A script is a sequence of steps separated by semicolons or new lines. Each
+step is the name of a function in the operations module followed by its arguments,
+and text after a # is a comment, e.g.
+
+    row_and_column_separation; obstruction_transitivity
+    obstruction_inferral 3
+    fusion row 0
+    place_point 1,0 north
+
+This module must not import pyglet as the worker processes import it, nor tilings
+until a script runs.
+"""
+
+from __future__ import annotations
+
+import json
+from typing import TYPE_CHECKING, Any, Callable, Dict, List, NamedTuple, Tuple
+
+from permuta import Perm
+from permuta.misc import DIR_EAST, DIR_NORTH, DIR_SOUTH, DIR_WEST
+
+from . import operations
+
+if TYPE_CHECKING:
+    from tilings import Tiling
+
+_DIRECTIONS: Dict[str, int] = {
+    "north": DIR_NORTH,
+    "south": DIR_SOUTH,
+    "east": DIR_EAST,
+    "west": DIR_WEST,
+}
+
+
+class ScriptError(ValueError):
+    """Raised when a script is malformed."""
+
+
+class Step(NamedTuple):
+    """A step of a script: an operation and the arguments that follow the tiling.
+    Placements are given the cell, pattern and index of the point instead of the
+    gridded perm, which is created when the step is applied.
+    """
+
+    text: str
+    name: str
+    args: Tuple[Any, ...]
+
+    def apply(self, tiling: Tiling) -> Tiling:
+        """Apply the step to a tiling.
+
+        Args:
+            tiling (Tiling): The tiling.
+
+        Raises:
+            ScriptError: If the operation does not apply to the tiling.
+
+        Returns:
+            Tiling: The resulting tiling.
+        """
+        args = self.args
+        if self.name in (
+            operations.place_point.__name__,
+            operations.partial_place_point.__name__,
+        ):
+            from tilings import GriddedPerm  # pylint: disable=import-outside-toplevel
+
+            cell, patt, idx, direction = args
+            args = (GriddedPerm.single_cell(patt, cell), idx, direction)
+        result = getattr(operations, self.name)(tiling, *args)
+        if self.name == operations.factor.__name__:
+            result = result[0]
+        if result is None:
+            raise ScriptError("the operation does not apply")
+        return result
+
+
+def _cell(value: str) -> Tuple[int, int]:
+    """Parse a cell of the form X,Y.
+
+    Args:
+        value (str): The cell.
+
+    Raises:
+        ValueError: If the value is malformed.
+
+    Returns:
+        Tuple[int, int]: The cell.
+    """
+    x, y = value.split(",")
+    return int(x), int(y)
+
+
+def _pattern(value: str) -> Perm:
+    """Parse a pattern, in the form the GUI's text box takes, e.g. 021.
+
+    Args:
+        value (str): The pattern.
+
+    Returns:
+        Perm: The pattern.
+    """
+    return Perm.to_standard(value)
+
+
+def _no_args(values: List[str]) -> Tuple[Any, ...]:
+    """Parse the arguments of an operation that takes none."""
+    if values:
+        raise ValueError
+    return ()
+
+
+def _inferral_args(values: List[str]) -> Tuple[Any, ...]:
+    """Parse [LENGTH], which defaults to 3 as in the GUI."""
+    (length,) = values or ["3"]
+    return (int(length),)
+
+
+def _cell_insertion_args(values: List[str]) -> Tuple[Any, ...]:
+    """Parse PATTERN X,Y."""
+    patt, cell = values
+    return _pattern(patt), _cell(cell)
+
+
+def _placement_args(values: List[str]) -> Tuple[Any, ...]:
+    """Parse X,Y DIRECTION [PATTERN INDEX], where the pattern defaults to a point."""
+    cell, direction, *point = values
+    patt, idx = point or ["0", "0"]
+    return _cell(cell), _pattern(patt), int(idx), _DIRECTIONS[direction.lower()]
+
+
+def _factor_args(values: List[str]) -> Tuple[Any, ...]:
+    """Parse X,Y [interleaving]."""
+    cell, *interleaving = values
+    if interleaving not in ([], ["interleaving"]):
+        raise ValueError
+    return _cell(cell), bool(interleaving)
+
+
+def _fusion_args(values: List[str]) -> Tuple[Any, ...]:
+    """Parse row|col INDEX."""
+    axis, index = values
+    if axis not in ("row", "col"):
+        raise ValueError
+    return (int(index), None) if axis == "row" else (None, int(index))
+
+
+# The operations that can be scripted, how to parse their arguments and what the
+# arguments are, for error messages.
+_OPERATIONS: Dict[str, Tuple[Callable[[List[str]], Tuple[Any, ...]], str]] = {
+    operations.row_and_column_separation.__name__: (_no_args, ""),
+    operations.obstruction_transitivity.__name__: (_no_args, ""),
+    operations.obstruction_inferral.__name__: (_inferral_args, "[LENGTH]"),
+    operations.add_single_cell_requirement.__name__: (
+        _cell_insertion_args,
+        "PATTERN X,Y",
+    ),
+    operations.add_single_cell_obstruction.__name__: (
+        _cell_insertion_args,
+        "PATTERN X,Y",
+    ),
+    operations.place_point.__name__: (
+        _placement_args,
+        "X,Y north|south|east|west [PATTERN INDEX]",
+    ),
+    operations.partial_place_point.__name__: (
+        _placement_args,
+        "X,Y north|south|east|west [PATTERN INDEX]",
+    ),
+    operations.factor.__name__: (_factor_args, "X,Y [interleaving]"),
+    operations.fusion.__name__: (_fusion_args, "row|col INDEX"),
+    operations.component_fusion.__name__: (_fusion_args, "row|col INDEX"),
+}
+
+
+def parse(script: str) -> List[Step]:
+    """Parse a script.
+
+    Args:
+        script (str): The script.
+
+    Raises:
+        ScriptError: If a step names an unknown operation or has the wrong
+        arguments.
+
+    Returns:
+        List[Step]: Its steps, in order.
+    """
+    steps: List[Step] = []
+    for line in script.splitlines():
+        for text in line.partition("#")[0].split(";"):
+            words = text.split()
+            if not words:
+                continue
+            name, *values = words
+            if name not in _OPERATIONS:
+                raise ScriptError(f"unknown operation: {name}")
+            parse_args, usage = _OPERATIONS[name]
+            try:
+                args = parse_args(values)
+            except (KeyError, ValueError) as exc:
+                raise ScriptError(
+                    f"invalid step: {' '.join(words)}, expected: {name} {usage}"
+                ) from exc
+            steps.append(Step(" ".join(words), name, args))
+    if not steps:
+        raise ScriptError("the script has no steps")
+    return steps
+
+
+def run(tiling: Tiling, steps: List[Step]) -> Tiling:
+    """Apply the steps of a script to a tiling, in order.
+
+    Args:
+        tiling (Tiling): The tiling.
+        steps (List[Step]): The steps.
+
+    Returns:
+        Tiling: The resulting tiling.
+    """
+    for step in steps:
+        tiling = step.apply(tiling)
+    return tiling
+
+
+def run_json(steps: List[Step], job: Tuple[int, str]) -> str:
+    """Apply the steps of a script to a tiling's json. Takes and returns plain
+    values, so that it can be run in a process pool. The outcome is a line of json
+    with the tiling's number and either the resulting tiling or the step that
+    failed and why.
+
+    Args:
+        steps (List[Step]): The steps.
+        job (Tuple[int, str]): The tiling's number and json.
+
+    Returns:
+        str: The outcome.
+    """
+    from tilings import Tiling  # pylint: disable=import-outside-toplevel
+
+    number, tiling_json = job
+    outcome: Dict[str, Any] = {"input": number}
+    try:
+        tiling = Tiling.from_json(tiling_json)
+        for step in steps:
+            outcome["step"] = step.text
+            tiling = step.apply(tiling)
+    except Exception as exc:  # pylint: disable=broad-except
+        outcome["error"] = str(exc) or type(exc).__name__
+    else:
+        outcome.pop("step", None)
+        outcome["tiling"] = tiling.to_jsonable()
+    return json.dumps(outcome)
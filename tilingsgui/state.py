@@ -51,6 +51,21 @@ class GuiState:
         self.action_selected: int = 0
         self.move_state = MoveState()
 
+    def drawing_settings(self) -> Tuple[bool, bool, bool, bool, bool]:
+        """The settings that change how the tiling plot is drawn.
+
+        Returns:
+            Tuple[bool, bool, bool, bool, bool]: The shading, pretty points, show
+            crossing, show localized and highlight touching cell settings.
+        """
+        return (
+            self.shading,
+            self.pretty_points,
+            self.show_crossing,
+            self.show_localized,
+            self.highlight_touching_cell,
+        )
+
     def toggle_shading(self) -> None:
         """If shading is on, turn if off and vice versa."""
         self.shading = not self.shading
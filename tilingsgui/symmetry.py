@@ -0,0 +1,257 @@
+"""The eight symmetries of a tiling, used to share remembered results between a
+tiling and its reverses, complements and inverses. Each tiling has a canonical
+representative among its symmetries, the one with the smallest bytes. Finding it
+applies all eight symmetries, so it is done in the worker processes. This module
+must not import pyglet as the worker processes import it, nor tilings, as the
+window imports it before tilings is needed.
+"""
+
+from __future__ import annotations
+
+import hashlib
+from functools import lru_cache
+from typing import TYPE_CHECKING, NamedTuple, Tuple
+
+from permuta.misc import DIR_EAST, DIR_NONE, DIR_NORTH, DIR_SOUTH, DIR_WEST
+
+if TYPE_CHECKING:
+    from permuta import Perm
+    from tilings import GriddedPerm, Tiling
+
+Cell = Tuple[int, int]
+
+
+_CANONICAL_CACHE_SIZE = 256
+
+
+class Symmetry(NamedTuple):
+    """A symmetry of the square. It is applied by first transposing, if at all,
+    then reversing and then complementing, which are the tiling's inverse, reverse
+    and complement respectively.
+    """
+
+    transpose: bool
+    reverse: bool
+    complement: bool
+
+    def inverse(self) -> "Symmetry":
+        """Get the symmetry that undoes this one.
+
+        Returns:
+            Symmetry: The inverse.
+        """
+        if self.transpose:
+            return Symmetry(True, self.complement, self.reverse)
+        return self
+
+    def tiling(self, tiling: Tiling) -> Tiling:
+        """Apply the symmetry to a tiling.
+
+        Args:
+            tiling (Tiling): The tiling.
+
+        Returns:
+            Tiling: The symmetric tiling.
+        """
+        if self.transpose:
+            tiling = tiling.inverse()
+        if self.reverse:
+            tiling = tiling.reverse()
+        if self.complement:
+            tiling = tiling.complement()
+        return tiling
+
+    def cell(self, cell: Cell, dimensions: Cell) -> Cell:
+        """Apply the symmetry to a cell.
+
+        Args:
+            cell (Cell): The cell.
+            dimensions (Cell): The dimensions of the tiling it is in.
+
+        Returns:
+            Cell: The symmetric cell.
+        """
+        (x, y), (width, height) = cell, dimensions
+        if self.transpose:
+            x, y, width, height = y, x, height, width
+        if self.reverse:
+            x = width - x - 1
+        if self.complement:
+            y = height - y - 1
+        return x, y
+
+    def fusion(self, row: bool, index: int, dimensions: Cell) -> Tuple[bool, int]:
+        """Apply the symmetry to the fusion of a row with the one above it, or a
+        column with the one to its right.
+
+        Args:
+            row (bool): Are rows fused?
+            index (int): The index of the lower row or left column.
+            dimensions (Cell): The dimensions of the tiling.
+
+        Returns:
+            Tuple[bool, int]: Whether rows are fused and the lower or left index
+            in the symmetric tiling.
+        """
+        width, height = dimensions
+        if self.transpose:
+            row, width, height = not row, height, width
+        if self.complement if row else self.reverse:
+            index = (height if row else width) - index - 2
+        return row, index
+
+    def perm(self, perm: Perm) -> Perm:
+        """Apply the symmetry to a permutation.
+
+        Args:
+            perm (Perm): The permutation.
+
+        Returns:
+            Perm: The symmetric permutation.
+        """
+        if self.transpose:
+            perm = perm.inverse()
+        if self.reverse:
+            perm = perm.reverse()
+        if self.complement:
+            perm = perm.complement()
+        return perm
+
+    def gridded_perm(self, g_perm: GriddedPerm, dimensions: Cell) -> GriddedPerm:
+        """Apply the symmetry to a gridded permutation.
+
+        Args:
+            g_perm (GriddedPerm): The gridded permutation.
+            dimensions (Cell): The dimensions of the tiling it is on.
+
+        Returns:
+            GriddedPerm: The symmetric gridded permutation.
+        """
+        width, height = dimensions
+        if self.transpose:
+            g_perm = g_perm.inverse(lambda c: (c[1], c[0]))
+            width, height = height, width
+        if self.reverse:
+            g_perm = g_perm.reverse(lambda c: (width - c[0] - 1, c[1]))
+        if self.complement:
+            g_perm = g_perm.complement(lambda c: (c[0], height - c[1] - 1))
+        return g_perm
+
+    def point_index(self, perm: Perm, idx: int) -> int:
+        """Find where a point of a permutation ends up.
+
+        Args:
+            perm (Perm): The permutation.
+            idx (int): The index of the point.
+
+        Returns:
+            int: The index of the point in the symmetric permutation.
+        """
+        if self.transpose:
+            idx = perm[idx]
+        return len(perm) - idx - 1 if self.reverse else idx
+
+    def direction(self, direction: int) -> int:
+        """Apply the symmetry to a placement direction.
+
+        Args:
+            direction (int): One of the directions in permuta.misc.
+
+        Returns:
+            int: The symmetric direction.
+        """
+        if direction == DIR_NONE:
+            return direction
+        if self.transpose:
+            direction = {
+                DIR_EAST: DIR_NORTH,
+                DIR_NORTH: DIR_EAST,
+                DIR_WEST: DIR_SOUTH,
+                DIR_SOUTH: DIR_WEST,
+            }[direction]
+        if self.reverse:
+            direction = {DIR_EAST: DIR_WEST, DIR_WEST: DIR_EAST}.get(
+                direction, direction
+            )
+        if self.complement:
+            direction = {DIR_NORTH: DIR_SOUTH, DIR_SOUTH: DIR_NORTH}.get(
+                direction, direction
+            )
+        return direction
+
+
+IDENTITY = Symmetry(False, False, False)
+
+SYMMETRIES: Tuple[Symmetry, ...] = tuple(
+    Symmetry(transpose, reverse, complement)
+    for transpose in (False, True)
+    for reverse in (False, True)
+    for complement in (False, True)
+)
+
+
+class CanonicalForm(NamedTuple):
+    """A hash of the canonical representative of a tiling's symmetries and a
+    symmetry that maps the tiling to it.
+    """
+
+    digest: bytes
+    symmetry: Symmetry
+
+
+def hash_bytes(data: bytes) -> bytes:
+    """Hash the bytes of a tiling.
+
+    Args:
+        data (bytes): The bytes.
+
+    Returns:
+        bytes: Their 16 byte blake2b digest.
+    """
+    return hashlib.blake2b(data, digest_size=16).digest()
+
+
+def canonical(tiling: Tiling) -> Tuple[bytes, Symmetry]:
+    """Find the canonical representative of a tiling's symmetries. Recent
+    results are cached by the tiling's bytes, so the cache keeps no tilings alive.
+
+    Args:
+        tiling (Tiling): The tiling.
+
+    Returns:
+        Tuple[bytes, Symmetry]: The bytes of the representative and a symmetry
+        that maps the tiling to it.
+    """
+    return _canonical(tiling.to_bytes())
+
+
+@lru_cache(maxsize=_CANONICAL_CACHE_SIZE)
+def _canonical(data: bytes) -> Tuple[bytes, Symmetry]:
+    """Find the canonical representative of the symmetries of a tiling's bytes.
+
+    Args:
+        data (bytes): The bytes of the tiling.
+
+    Returns:
+        Tuple[bytes, Symmetry]: The bytes of the representative and a symmetry
+        that maps the tiling to it.
+    """
+    from tilings import Tiling  # pylint: disable=import-outside-toplevel
+
+    tiling = Tiling.from_bytes(data)
+    return min((sym.tiling(tiling).to_bytes(), sym) for sym in SYMMETRIES)
+
+
+def canonical_form(tiling: Tiling) -> CanonicalForm:
+    """Find the canonical form of a tiling. This is the step that is run in a
+    worker process, so that the window never applies the symmetries itself.
+
+    Args:
+        tiling (Tiling): The tiling.
+
+    Returns:
+        CanonicalForm: The hash of its canonical representative and the symmetry
+        that maps it there.
+    """
+    data, sym = canonical(tiling)
+    return CanonicalForm(hash_bytes(data), sym)
@@ -1,35 +1,188 @@
-"""The tiling drawing tools."""
+"""The tiling drawing tools. Tilings is only imported once the first tiling is
+drawn, so that the window appears without waiting for it to load.
+"""
+
+from __future__ import annotations
 
 import json
-from collections import Counter, deque
-from random import uniform
-from typing import Callable, ClassVar, Deque, Iterable, List, Tuple
+import pathlib
+import sys
+import time
+from array import array
+from collections import OrderedDict, deque
+from enum import IntFlag
+from functools import partial
+from itertools import chain
+from random import randbytes
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    Callable,
+    ClassVar,
+    Deque,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    NamedTuple,
+    Optional,
+    Sequence,
+    Tuple,
+    Union,
+)
 
 import pyglet
 
 from permuta import Perm
 from permuta.misc import DIR_EAST, DIR_NONE, DIR_NORTH, DIR_SOUTH, DIR_WEST
-from tilings import GriddedPerm, Tiling
-from tilings.algorithms import Factor, FactorWithInterleaving
-from tilings.exception import InvalidOperationError
-from tilings.strategies import (  # DatabaseVerificationStrategy removed v4.0.0
-    BasicVerificationStrategy,
-    ElementaryVerificationStrategy,
-    InsertionEncodingVerificationStrategy,
-    LocallyFactorableVerificationStrategy,
-    LocalVerificationStrategy,
-    MonotoneTreeVerificationStrategy,
-    OneByOneVerificationStrategy,
-)
 
+from . import memo, oeis, operations, symmetry
 from .events import CustomEvents, Observer
-from .geometry import Point
-from .graphics import Color, GeoDrawer
+from .files import PathManager, VerificationCache
+from .geometry import Point, PointStore, SpatialHash
+from .graphics import Color, PointPathShapes, Redrawable, ShapeBatch
+from .memo import OperationMemo
 from .state import GuiState
+from .symmetry import CanonicalForm, hash_bytes
 from .utils import clamp
+from .workers import (
+    JobResult,
+    LimitExceededError,
+    Limits,
+    TimeLimitExceededError,
+    WorkerPool,
+)
+
+if TYPE_CHECKING:
+    from tilings import GriddedPerm, Tiling
+
+    from .raster import Raster
+
+
+class DrawFlag(IntFlag):
+    """Facts about a gridded perm that decide if and how it is drawn."""
+
+    LOCALIZED = 1
+    POINT_PERM = 2
+    PRETTY = 4  # Obstruction covered by, or requirement list drawn as, a big point.
+    SHADED = 8  # Replaced by a filled cell when shading is on.
+
+
+class TilingDrawInfo:
+    """A table of draw flags for every gridded perm of a tiling. None of them change
+    while a tiling is displayed so they are computed once per tiling.
+    """
+
+    def __init__(self, tiling: Tiling) -> None:
+        """Compute the draw flags of a tiling.
+
+        Args:
+            tiling (Tiling): The tiling to compute flags for.
+        """
+        point_cells = tiling.point_cells
+        pretty_cells = point_cells.intersection(
+            req.pos[0]
+            for reqlist in tiling.requirements
+            for req in reqlist
+            if req.is_point_perm()
+        )
+        self.is_empty: bool = any(len(obs) == 0 for obs in tiling.obstructions)
+        self.obstructions: array = array(
+            "B",
+            (
+                TilingDrawInfo._flags(obs)
+                | (DrawFlag.PRETTY if all(p in pretty_cells for p in obs.pos) else 0)
+                | (DrawFlag.SHADED if obs.is_point_perm() else 0)
+                for obs in tiling.obstructions
+            ),
+        )
+        self.requirements: List[array] = [
+            array("B", (TilingDrawInfo._flags(req) for req in reqlist))
+            for reqlist in tiling.requirements
+        ]
+        self.requirement_lists: array = array(
+            "B",
+            (
+                (
+                    DrawFlag.PRETTY
+                    if len(reqlist[0]) == 1
+                    and any(p in point_cells for req in reqlist for p in req.pos)
+                    else 0
+                )
+                for reqlist in tiling.requirements
+            ),
+        )
+        self.obstructions_by_cell: Dict[Tuple[int, int], List[int]] = {}
+        for i, obs in enumerate(tiling.obstructions):
+            for pos in set(obs.pos):
+                self.obstructions_by_cell.setdefault(pos, []).append(i)
+
+    @staticmethod
+    def _flags(g_perm: GriddedPerm) -> int:
+        """The flags that only depend on the gridded perm itself.
+
+        Args:
+            g_perm (GriddedPerm): A gridded perm.
+
+        Returns:
+            int: The localized and point perm flags.
+        """
+        return (DrawFlag.LOCALIZED if g_perm.is_localized() else 0) | (
+            DrawFlag.POINT_PERM if g_perm.is_point_perm() else 0
+        )
 
+    @staticmethod
+    def shown(flags: int, state: GuiState) -> bool:
+        """Is a gridded perm shown given the localized and crossing settings?
+
+        Args:
+            flags (int): The gridded perm's flags.
+            state (GuiState): A collection of settings.
+
+        Returns:
+            bool: True iff it should be drawn.
+        """
+        if flags & DrawFlag.LOCALIZED:
+            return state.show_localized
+        return state.show_crossing
+
+    def obstruction_shown(self, index: int, state: GuiState) -> bool:
+        """Is an obstruction drawn with the current settings?
+
+        Args:
+            index (int): The index of the obstruction.
+            state (GuiState): A collection of settings.
+
+        Returns:
+            bool: True iff it should be drawn.
+        """
+        flags = self.obstructions[index]
+        if (state.shading and flags & DrawFlag.SHADED) or (
+            state.pretty_points and flags & DrawFlag.PRETTY
+        ):
+            return False
+        return TilingDrawInfo.shown(flags, state)
 
-class TPlot:
+    def requirement_list_pretty(self, index: int, state: GuiState) -> bool:
+        """Is a requirement list drawn as a single big point?
+
+        Args:
+            index (int): The index of the requirement list.
+            state (GuiState): A collection of settings.
+
+        Returns:
+            bool: True iff drawn as a pretty point.
+        """
+        return state.pretty_points and bool(
+            self.requirement_lists[index] & DrawFlag.PRETTY
+        )
+
+
+Layout = Dict["GriddedPerm", Tuple[array, array]]
+Canvas = Union[ShapeBatch, "Raster"]
+
+
+class TPlot:  # pylint: disable=too-many-instance-attributes
     """A single tiling image."""
 
     REQ_NOT_FOUND: ClassVar[Tuple[int, int, int]] = (-1, -1, -1)
@@ -50,37 +203,133 @@ class TPlot:
     )
     _FUZZYNESS = 0.25  # Should be in [0,0.5)
     _CLICK_PRECISION_SQUARED: int = 100
+    _HIT_BUCKET_SIZE: ClassVar[float] = _CLICK_PRECISION_SQUARED**0.5
     _POINT_SIZE = 5
     _PRETTY_POINT_SIZE = 10
+    _LAYERS: ClassVar[int] = 6
+    _BACKGROUND_LAYER: ClassVar[int] = 0
+    _GRID_LAYER: ClassVar[int] = 1
+    _OBSTRUCTION_LAYER: ClassVar[int] = 2
+    _REQUIREMENT_LAYER: ClassVar[int] = 4
+    _NO_HOVER: ClassVar[Tuple[int, int, Optional[Tuple[int, int]]]] = (-1, -1, None)
 
     @staticmethod
-    def _col_row_and_count(
+    def _ranks(
         g_perm: GriddedPerm, grid_size: Tuple[int, int]
-    ) -> Tuple[List[int], List[int], List[List[int]], List[List[int]]]:
-        """Computes data used to positions gridded permutations correctly.
+    ) -> Tuple[List[int], List[int], List[int], List[int]]:
+        """Computes data used to positions gridded permutations correctly, with one
+        pass over the points by index and one by value.
 
         Args:
             g_perm (GriddedPerm): The gridded permutations that needs to be positioned.
             grid_size (Tuple[int, int]): The tiling's dimension.
 
         Returns:
-            Tuple[List[int], List[int], List[List[int]], List[List[int]]]: The first
-            element counts how many points land in each column, the second does the
-            same but for rows. The last two contain info about which column has which
-            index of element and which row has which element.
-        """
-        colcount = [0] * grid_size[0]
-        rowcount = [0] * grid_size[1]
-        col: List[List[int]] = [[] for i in range(grid_size[0])]
-        row: List[List[int]] = [[] for i in range(grid_size[1])]
-        for ind, ((c_x, c_y), val) in enumerate(zip(g_perm.pos, g_perm.patt)):
-            colcount[c_x] += 1
-            rowcount[c_y] += 1
-            col[c_x].append(ind)
-            row[c_y].append(val)
-        for r in row:
-            r.sort()
-        return colcount, rowcount, col, row
+            Tuple[List[int], List[int], List[int], List[int]]: The first element
+            gives, for each point, its 1-based rank by index within its column and
+            the second, for each column, one more than the number of points in it.
+            The last two contain the same info for rows, ranking by value.
+        """
+        pos = g_perm.pos
+        col_slots = [1] * grid_size[0]
+        row_slots = [1] * grid_size[1]
+        col_rank = []
+        for c_x, _ in pos:
+            col_rank.append(col_slots[c_x])
+            col_slots[c_x] += 1
+        row_rank = [0] * len(pos)
+        for ind in g_perm.patt.inverse():
+            c_y = pos[ind][1]
+            row_rank[ind] = row_slots[c_y]
+            row_slots[c_y] += 1
+        return col_rank, col_slots, row_rank, row_slots
+
+    @staticmethod
+    def _jitter(count: int) -> array:
+        """Draw random offsets in [0, 2 * fuzzyness) with a single call to the
+        random number generator.
+
+        Args:
+            count (int): The number of offsets.
+
+        Returns:
+            array: The offsets.
+        """
+        return array(
+            "d",
+            map(
+                (2 * TPlot._FUZZYNESS / 2**64).__mul__,
+                array("Q", randbytes(8 * count)),
+            ),
+        )
+
+    @staticmethod
+    def _locate(
+        g_perm: GriddedPerm,
+        grid_size: Tuple[int, int],
+        cell_size: Tuple[float, float],
+        jitter: Iterator[float],
+    ) -> Tuple[List[float], List[float]]:
+        """Calculate coordinates for all points in a gridded permutation.
+
+        Args:
+            g_perm (GriddedPerm): The gridded permutation to convert to positions.
+            grid_size (Tuple[int, int]): The tiling's dimension.
+            cell_size (Tuple[float, float]): The size (w,h) of each cell.
+            jitter (Iterator[float]): Random offsets, two are consumed per point.
+
+        Returns:
+            Tuple[List[float], List[float]]: The x and y coordinates.
+        """
+        col_rank, col_slots, row_rank, row_slots = TPlot._ranks(g_perm, grid_size)
+        xs, ys = [], []
+        for (c_x, c_y), c_r, r_r in zip(g_perm.pos, col_rank, row_rank):
+            xs.append(
+                cell_size[0]
+                * (c_x + (c_r - TPlot._FUZZYNESS + next(jitter)) / col_slots[c_x])
+            )
+            ys.append(
+                cell_size[1]
+                * (c_y + (r_r - TPlot._FUZZYNESS + next(jitter)) / row_slots[c_y])
+            )
+        return xs, ys
+
+    @staticmethod
+    def gridded_perms_initial_locations(
+        g_perms: Sequence[GriddedPerm],
+        grid_size: Tuple[int, int],
+        cell_size: Tuple[float, float],
+        layout: Optional[Layout] = None,
+    ) -> PointStore:
+        """Calculate coordinates for all points in a collection of gridded
+        permutations at once.
+
+        Args:
+            g_perms (Sequence[GriddedPerm]): The gridded permutations to convert to
+            positions.
+            grid_size (Tuple[int, int]): The tiling's dimension.
+            cell_size (Tuple[float, float]): The size (w,h) of each cell.
+            layout (Optional[Layout]): Known positions, in units of cells, of some
+            gridded permutations. These are reused rather than laid out again.
+
+        Returns:
+            PointStore: The positions, one path per gridded permutation.
+        """
+        layout = layout or {}
+        jitter = iter(
+            TPlot._jitter(2 * sum(len(gp) for gp in g_perms if gp not in layout))
+        )
+        xs, ys, offsets = array("d"), array("d"), array("q", [0])
+        for g_perm in g_perms:
+            if g_perm in layout:
+                xs.extend(map(float(cell_size[0]).__mul__, layout[g_perm][0]))
+                ys.extend(map(float(cell_size[1]).__mul__, layout[g_perm][1]))
+            else:
+                g_xs, g_ys = TPlot._locate(g_perm, grid_size, cell_size, jitter)
+                xs.extend(g_xs)
+                ys.extend(g_ys)
+            offsets.append(len(xs))
+        return PointStore.from_arrays(xs, ys, offsets)
 
     @staticmethod
     def gridded_perm_initial_locations(
@@ -96,61 +345,97 @@ class TPlot:
         Returns:
             List[Point]: A list of positions.
         """
-        colcount, rowcount, col, row = TPlot._col_row_and_count(g_perm, grid_size)
         return [
-            Point(
-                cell_size[0]
-                * (
-                    c_x
-                    + (
-                        col[c_x].index(ind)
-                        + 1
-                        + uniform(-TPlot._FUZZYNESS, TPlot._FUZZYNESS)
-                    )
-                    / (colcount[c_x] + 1)
-                ),
-                cell_size[1]
-                * (
-                    c_y
-                    + (
-                        row[c_y].index(val)
-                        + 1
-                        + uniform(-TPlot._FUZZYNESS, TPlot._FUZZYNESS)
-                    )
-                    / (rowcount[c_y] + 1)
-                ),
-            )
-            for ind, ((c_x, c_y), val) in enumerate(zip(g_perm.pos, g_perm.patt))
+            Point(pnt.x, pnt.y)
+            for pnt in TPlot.gridded_perms_initial_locations(
+                (g_perm,), grid_size, cell_size
+            )[0]
         ]
 
-    def __init__(self, tiling: Tiling, w: float, h: float) -> None:
+    def __init__(
+        self, tiling: Tiling, w: float, h: float, layout: Optional[Layout] = None
+    ) -> None:
         """Create an instance of a tiling plot.
 
         Args:
             tiling (Tiling): The tiling to draw.
             w (float): The width of the drawing.
             h (float): The height of the drawing.
+            layout (Optional[Layout]): Positions of gridded perms from a previous
+            plot, see layout(). Gridded perms found there keep their position.
         """
         t_w, t_h = tiling.dimensions
 
         self.tiling: Tiling = tiling
         self._w: float = w
         self._h: float = h
-        self._obstruction_locs: List[List[Point]] = [
-            TPlot.gridded_perm_initial_locations(gp, (t_w, t_h), (w / t_w, h / t_h))
-            for gp in self.tiling.obstructions
-        ]
-        self._requirement_locs: List[List[List[Point]]] = [
-            [
-                TPlot.gridded_perm_initial_locations(gp, (t_w, t_h), (w / t_w, h / t_h))
-                for gp in reqlist
-            ]
+        self._obstruction_locs: PointStore = TPlot.gridded_perms_initial_locations(
+            self.tiling.obstructions, (t_w, t_h), (w / t_w, h / t_h), layout
+        )
+        self._requirement_locs: List[PointStore] = [
+            TPlot.gridded_perms_initial_locations(
+                reqlist, (t_w, t_h), (w / t_w, h / t_h), layout
+            )
             for reqlist in self.tiling.requirements
         ]
+        self._shapes: Optional[ShapeBatch] = None
+        self._stale: bool = True
+        self._display: Tuple[bool, ...] = ()
+        self._hover: Tuple[int, int, Optional[Tuple[int, int]]] = TPlot._NO_HOVER
+        self._obs_shapes: List[Optional[PointPathShapes]] = []
+        self._req_shapes: List[List[Optional[PointPathShapes]]] = []
+        self._pretty_shapes: Dict[int, Optional[pyglet.shapes.Circle]] = {}
+        self._info: Optional[TilingDrawInfo] = None
+        self._obs_index: Optional[SpatialHash] = None
+        self._req_index: Optional[SpatialHash] = None
+
+    def _grid_paths(self) -> Iterator[Tuple[GriddedPerm, array, array]]:
+        """Iterate over the obstructions and then requirements with the positions
+        of their points in units of cells.
+
+        Yields:
+            Tuple[GriddedPerm, array, array]: A gridded perm with the x and y
+            coordinates of its points.
+        """
+        t_w, t_h = self.tiling.dimensions
+        x_factor, y_factor = t_w / self._w, t_h / self._h
+        for g_perms, locs in zip(
+            (self.tiling.obstructions, *self.tiling.requirements),
+            (self._obstruction_locs, *self._requirement_locs),
+        ):
+            for g_perm, loc in zip(g_perms, locs):
+                xs, ys = loc.coordinates()
+                yield (
+                    g_perm,
+                    array("d", map(x_factor.__mul__, xs)),
+                    array("d", map(y_factor.__mul__, ys)),
+                )
+
+    def layout(self) -> Layout:
+        """Get the positions of all gridded perms in units of cells, so that a plot
+        of a following tiling can place the gridded perms it shares with this one
+        at the same spot.
+
+        Returns:
+            Layout: The positions of each gridded perm's points.
+        """
+        return {g_perm: (xs, ys) for g_perm, xs, ys in self._grid_paths()}
+
+    def snapshot(self) -> "PlotSnapshot":
+        """Get a compact copy of the plot that can be restored later.
+
+        Returns:
+            PlotSnapshot: The tiling as bytes along with the packed positions.
+        """
+        coordinates = array(PlotSnapshot.TYPECODE)
+        for _, xs, ys in self._grid_paths():
+            coordinates.fromlist(xs.tolist())
+            coordinates.fromlist(ys.tolist())
+        return PlotSnapshot(self.tiling.to_bytes(), coordinates.tobytes())
 
     def get_requirement_gridded_perm_locations(
         self, requirement_list_index: int, gridded_perm_index: int
-    ) -> List[Point]:
+    ) -> Sequence[Point]:
         """Get a gridded perm as locations of points from requirements.
 
         Args:
@@ -159,38 +444,43 @@ class TPlot:
             the requirement list.
 
         Returns:
-            List[Point]: A gridded perm as a list of points.
+            Sequence[Point]: A gridded perm as a view of its points, assigning to
+            them moves the points.
         """
         return self._requirement_locs[requirement_list_index][gridded_perm_index]
 
     def get_obstruction_gridded_perm_location(
         self, gridded_perm_index: int
-    ) -> List[Point]:
+    ) -> Sequence[Point]:
         """Get a gridded perm as locations of points from obstructions.
 
         Args:
             gridded_perm_index (int): The index of the gridded perm.
 
         Returns:
-            List[Point]: A gridded perm as a list of points.
+            Sequence[Point]: A gridded perm as a view of its points, assigning to
+            them moves the points.
         """
         return self._obstruction_locs[gridded_perm_index]
 
     def draw(self, state: GuiState, mpos: Point) -> None:
-        """Draw the tiling.
+        """Draw the tiling. The shapes are only rebuilt if the layout or the
+        display settings changed since the last draw, otherwise only the colors
+        affected by hovering are updated.
 
         Args:
             state (GuiState): A collection of settings.
             mpos (Point): The current mouse position.
         """
-        if any(len(obs) == 0 for obs in self.tiling.obstructions):
-            GeoDrawer.draw_rectangle(0, 0, self._w, self._h, TPlot._EMPTY_COLOR)
-        else:
-            if state.shading:
-                self._draw_shaded_cells()
-            self._draw_grid()
-            self._draw_obstructions(state, mpos)
-            self._draw_requirements(state, mpos)
+        if (
+            self._shapes is None
+            or self._stale
+            or self._display != state.drawing_settings()
+        ):
+            self._build_shapes(state)
+        self._update_hover(state, mpos)
+        assert self._shapes is not None
+        self._shapes.draw()
 
     def resize(self, width: int, height: int) -> None:
         """Resize the image.
@@ -199,17 +489,100 @@ class TPlot:
             width (int): The new width.
             height (int): The new height.
         """
-        for obs in self._obstruction_locs:
-            for pnt in obs:
-                pnt.x = pnt.x / self._w * width
-                pnt.y = pnt.y / self._h * height
+        x_factor, y_factor = width / self._w, height / self._h
+        self._obstruction_locs.scale(x_factor, y_factor)
         for reqlist in self._requirement_locs:
-            for req in reqlist:
-                for pnt in req:
-                    pnt.x = pnt.x / self._w * width
-                    pnt.y = pnt.y / self._h * height
+            reqlist.scale(x_factor, y_factor)
         self._w = width
         self._h = height
+        self._stale = True
+        self._obs_index = None
+        self._req_index = None
+
+    def move_obstruction_point(
+        self, gridded_perm_index: int, point_index: int, x: float, y: float
+    ) -> None:
+        """Move a single point of an obstruction.
+
+        Args:
+            gridded_perm_index (int): The index of the gridded perm.
+            point_index (int): The index of the point within the gridded perm.
+            x (float): The new x coordinate.
+            y (float): The new y coordinate.
+        """
+        pnt = self._obstruction_locs[gridded_perm_index][point_index]
+        pnt.x, pnt.y = x, y
+        if self._obs_index is not None:
+            self._obs_index.move((gridded_perm_index, point_index), x, y)
+        self._refresh_obstruction(gridded_perm_index)
+
+    def translate_obstruction(self, gridded_perm_index: int, dx: float, dy: float):
+        """Move all points of an obstruction.
+
+        Args:
+            gridded_perm_index (int): The index of the gridded perm.
+            dx (float): The horizontal distance to move.
+            dy (float): The vertical distance to move.
+        """
+        for k, pnt in enumerate(self._obstruction_locs[gridded_perm_index]):
+            pnt.x += dx
+            pnt.y += dy
+            if self._obs_index is not None:
+                self._obs_index.move((gridded_perm_index, k), pnt.x, pnt.y)
+        self._refresh_obstruction(gridded_perm_index)
+
+    def move_requirement_point(
+        self,
+        requirement_list_index: int,
+        gridded_perm_index: int,
+        point_index: int,
+        x: float,
+        y: float,
+    ) -> None:
+        """Move a single point of a requirement.
+
+        Args:
+            requirement_list_index (int): The requirement list it belongs to.
+            gridded_perm_index (int): The index of the gridded perm within
+            the requirement list.
+            point_index (int): The index of the point within the gridded perm.
+            x (float): The new x coordinate.
+            y (float): The new y coordinate.
+        """
+        loc = self._requirement_locs[requirement_list_index][gridded_perm_index]
+        loc[point_index].x, loc[point_index].y = x, y
+        if self._req_index is not None:
+            self._req_index.move(
+                (requirement_list_index, gridded_perm_index, point_index), x, y
+            )
+        if self._stale:
+            return
+        path = self._req_shapes[requirement_list_index][gridded_perm_index]
+        if path is not None:
+            path.set_points(loc)
+        pretty = self._pretty_shapes.get(requirement_list_index)
+        if pretty is not None and gridded_perm_index == 0:
+            pretty.position = (loc[0].x, loc[0].y)
+
+    def hover_target(
+        self, state: GuiState, mpos: Point
+    ) -> Tuple[int, int, Optional[Tuple[int, int]]]:
+        """Find what is highlighted when the mouse is at a given position.
+
+        Args:
+            state (GuiState): A collection of settings.
+            mpos (Point): The current mouse position.
+
+        Returns:
+            Tuple[int, int, Optional[Tuple[int, int]]]: The index of the hovered
+            obstruction, the index of the hovered requirement list (-1 if none) and
+            the hovered cell if touching cells are highlighted, None otherwise.
+        """
+        return (
+            self.get_point_obs_index(mpos)[0],
+            self.get_point_req_index(mpos)[0],
+            self.get_cell(mpos) if state.highlight_touching_cell else None,
+        )
 
     def get_cell(self, mpos: Point) -> Tuple[int, int]:
         """Get the 2d index of the cell that was clicked.
@@ -238,11 +611,11 @@ class TPlot:
             containing point and the index of point within gridded permutation, if
             one is found, (-1,-1) pair otherwise.
         """
-        for j, loc in enumerate(self._obstruction_locs):
-            for k, pnt in enumerate(loc):
-                if mpos.dist_squared_to(pnt) <= TPlot._CLICK_PRECISION_SQUARED:
-                    return j, k
-        return TPlot.OBS_NOT_FOUND
+        key = self._obstruction_index().find(mpos, TPlot._CLICK_PRECISION_SQUARED)
+        if key is None:
+            return TPlot.OBS_NOT_FOUND
+        j, k = key
+        return j, k
 
     def get_point_req_index(self, mpos: Point) -> Tuple[int, int, int]:
         """Look for an requirement point that collides with the mouse click.
@@ -259,12 +632,43 @@ class TPlot:
             and the index of point within gridded permutation, that collides with
             the click, if one is found, (-1,-1,-1) otherwise.
         """
-        for i, reqlist in enumerate(self._requirement_locs):
-            for j, loc in enumerate(reqlist):
+        key = self._requirement_index().find(mpos, TPlot._CLICK_PRECISION_SQUARED)
+        if key is None:
+            return TPlot.REQ_NOT_FOUND
+        i, j, k = key
+        return i, j, k
+
+    def _obstruction_index(self) -> SpatialHash:
+        """Get the spatial index over all obstruction points, keyed by (j, k) where
+        j is the index of the gridded perm and k the index of the point within it.
+        It is built on first use after construction or a resize.
+
+        Returns:
+            SpatialHash: The obstruction point index.
+        """
+        if self._obs_index is None:
+            self._obs_index = SpatialHash(TPlot._HIT_BUCKET_SIZE)
+            for j, loc in enumerate(self._obstruction_locs):
                 for k, pnt in enumerate(loc):
-                    if mpos.dist_squared_to(pnt) <= TPlot._CLICK_PRECISION_SQUARED:
-                        return i, j, k
-        return TPlot.REQ_NOT_FOUND
+                    self._obs_index.insert((j, k), pnt.x, pnt.y)
+        return self._obs_index
+
+    def _requirement_index(self) -> SpatialHash:
+        """Get the spatial index over all requirement points, keyed by (i, j, k)
+        where i is the index of the requirement list, j the index of the gridded perm
+        within it and k the index of the point within the gridded perm. It is built
+        on first use after construction or a resize.
+
+        Returns:
+            SpatialHash: The requirement point index.
+        """
+        if self._req_index is None:
+            self._req_index = SpatialHash(TPlot._HIT_BUCKET_SIZE)
+            for i, reqlist in enumerate(self._requirement_locs):
+                for j, loc in enumerate(reqlist):
+                    for k, pnt in enumerate(loc):
+                        self._req_index.insert((i, j, k), pnt.x, pnt.y)
+        return self._req_index
 
     def cell_to_rect(self, c_x: int, c_y: int) -> Tuple[float, float, float, float]:
         """Get the rectangle for a cell.
@@ -282,239 +686,480 @@ class TPlot:
         c_w, c_h = self._w / t_w, self._h / t_h
         return c_x * c_w, c_y * c_h, c_w, c_h
 
-    def _draw_shaded_cells(self) -> None:
-        """Draw all cells with a single point obstruction as a filled rectangle."""
+    def _build_shapes(self, state: GuiState) -> None:
+        """(Re)create the batch of shapes that make up the drawing.
+
+        Args:
+            state (GuiState): A collection of settings.
+        """
+        if self._shapes is None:
+            self._shapes = ShapeBatch(TPlot._LAYERS)
+        else:
+            self._shapes.clear()
+        self._stale = False
+        self._display = state.drawing_settings()
+        self._hover = TPlot._NO_HOVER
+        self._build(self._shapes, state)
+
+    def render(self, raster: Raster, state: GuiState) -> None:
+        """Draw the tiling into an image rather than the window. The shapes drawn
+        in the window are rebuilt on its next draw.
+
+        Args:
+            raster (Raster): The image to draw in.
+            state (GuiState): A collection of settings.
+        """
+        self._build(raster, state)
+        self._stale = True
+
+    def _build(self, shapes: Canvas, state: GuiState) -> None:
+        """Add all shapes that make up the drawing.
+
+        Args:
+            shapes (Canvas): The batch or image to add to.
+            state (GuiState): A collection of settings.
+        """
+        self._obs_shapes = [None] * len(self._obstruction_locs)
+        self._req_shapes = [[None] * len(reqlist) for reqlist in self._requirement_locs]
+        self._pretty_shapes = {}
+        if self.draw_info().is_empty:
+            shapes.add_rectangle(
+                0, 0, self._w, self._h, TPlot._EMPTY_COLOR, TPlot._BACKGROUND_LAYER
+            )
+            return
+        if state.shading:
+            self._build_shaded_cells(shapes)
+        self._build_grid(shapes)
+        self._build_obstructions(shapes, state)
+        self._build_requirements(shapes, state)
+
+    def _build_shaded_cells(self, shapes: Canvas) -> None:
+        """Add all cells with a single point obstruction as a filled rectangle.
+
+        Args:
+            shapes (Canvas): The batch or image to add to.
+        """
         for c_x, c_y in self.tiling.empty_cells:
-            GeoDrawer.draw_rectangle(
-                *self.cell_to_rect(c_x, c_y), TPlot._SHADED_CELL_COLOR
+            shapes.add_rectangle(
+                *self.cell_to_rect(c_x, c_y),
+                TPlot._SHADED_CELL_COLOR,
+                TPlot._BACKGROUND_LAYER,
             )
 
-    def _draw_obstructions(self, state: GuiState, mpos: Point) -> None:
-        """Draw all obstructions.
+    def _build_obstructions(self, shapes: Canvas, state: GuiState) -> None:
+        """Add all obstructions.
 
         Args:
+            shapes (Canvas): The batch or image to add to.
             state (GuiState): A collection of settings.
-            mpos (Point): The current mouse position.
         """
-        point_cells_with_point_perm_req = self.tiling.point_cells.intersection(
-            {
-                req.pos[0]
-                for req_lis in self.tiling.requirements
-                for req in req_lis
-                if req.is_point_perm()
-            }
-        )
-        hover_index, _ = self.get_point_obs_index(mpos)
-        hover_cell = self.get_cell(mpos)
-        for i, (obs, loc) in enumerate(
-            zip(self.tiling.obstructions, self._obstruction_locs)
-        ):
-            if (state.shading and obs.is_point_perm()) or (
-                state.pretty_points
-                and all(p in point_cells_with_point_perm_req for p in obs.pos)
-            ):
-                continue
-            col = (
-                TPlot._HIGHLIGHT_COLOR
-                if state.highlight_touching_cell
-                and any(p == hover_cell for p in obs.pos)
-                else TPlot._OBSTRUCTION_COLOR
-            )
-            if hover_index == i:
-                col = TPlot._HIGHLIGHT_COLOR
-            localized = obs.is_localized()
-            if (localized and state.show_localized) or (
-                not localized and state.show_crossing
-            ):
-                GeoDrawer.draw_point_path(loc, col, TPlot._POINT_SIZE)
+        info = self.draw_info()
+        for i, loc in enumerate(self._obstruction_locs):
+            if info.obstruction_shown(i, state):
+                self._obs_shapes[i] = shapes.add_point_path(
+                    loc,
+                    TPlot._OBSTRUCTION_COLOR,
+                    TPlot._POINT_SIZE,
+                    TPlot._OBSTRUCTION_LAYER,
+                )
 
-    def _draw_requirements(self, state: GuiState, mpos: Point) -> None:
-        """Draw all requirements.
+    def _build_requirements(self, shapes: Canvas, state: GuiState) -> None:
+        """Add all requirements.
 
         Args:
+            shapes (Canvas): The batch or image to add to.
             state (GuiState): A collection of settings.
-            mpos (Point): The current mouse position.
         """
-        hover_index = self.get_point_req_index(mpos)
+        info = self.draw_info()
         for i, reqlist in enumerate(self._requirement_locs):
-            if (
-                len(reqlist[0]) == 1
-                and state.pretty_points
-                and any(
-                    p in self.tiling.point_cells
-                    for req in self.tiling.requirements[i]
-                    for p in req.pos
-                )
-            ):
+            if info.requirement_list_pretty(i, state):
                 pnt = reqlist[0][0]
-                GeoDrawer.draw_circle(
-                    pnt.x, pnt.y, TPlot._PRETTY_POINT_SIZE, TPlot._BLACK_COLOR
+                self._pretty_shapes[i] = shapes.add_circle(
+                    pnt.x,
+                    pnt.y,
+                    TPlot._PRETTY_POINT_SIZE,
+                    TPlot._BLACK_COLOR,
+                    TPlot._REQUIREMENT_LAYER + 1,
                 )
                 continue
-            col = (
-                TPlot._HIGHLIGHT_COLOR
-                if hover_index != TPlot.REQ_NOT_FOUND and i == hover_index[0]
-                else TPlot._REQUIREMENT_COLOR
-            )
             for j, loc in enumerate(reqlist):
-                localized = self.tiling.requirements[i][j].is_localized()
-                if (localized and state.show_localized) or (
-                    not localized and state.show_crossing
-                ):
-                    GeoDrawer.draw_point_path(loc, col, 5)
-
-    def _draw_grid(self) -> None:
-        """Draw the tiling's grid."""
+                if TilingDrawInfo.shown(info.requirements[i][j], state):
+                    self._req_shapes[i][j] = shapes.add_point_path(
+                        loc,
+                        TPlot._REQUIREMENT_COLOR,
+                        TPlot._POINT_SIZE,
+                        TPlot._REQUIREMENT_LAYER,
+                    )
+
+    def _build_grid(self, shapes: Canvas) -> None:
+        """Add the tiling's grid.
+
+        Args:
+            shapes (Canvas): The batch or image to add to.
+        """
         t_w, t_h = self.tiling.dimensions
         for i in range(t_w + 1):
             x = self._w * i / t_w
-            GeoDrawer.draw_line_segment(x, self._h, x, 0, TPlot._BLACK_COLOR)
+            shapes.add_line_segment(
+                x, self._h, x, 0, TPlot._BLACK_COLOR, TPlot._GRID_LAYER
+            )
         for i in range(t_h + 1):
             y = self._h * i / t_h
-            GeoDrawer.draw_line_segment(0, y, self._w, y, TPlot._BLACK_COLOR)
-
-    def to_tikz(self) -> None:
-        """Output tikz drawing."""
-        print("\\begin{tikzpicture}[scale=1, every node/.style={scale=1}]")
-        print("\t\\def\\xscale{1.0} % Horizontal scale factor")
-        print("\t\\def\\yscale{1.0} % Vertical scale factor")
-        print("\t\\def\\spnt{0.075} % Size of smaller points")
-        print("\t\\def\\lpnt{0.125} % Size of larger points")
-        self._tikz_shaded()
-        self._tikz_grid()
-        self._tikz_obstructions()
-        self._tikz_requirements()
-        print("\\end{tikzpicture}", flush=True)
-
-    def _tikz_shaded(self):
+            shapes.add_line_segment(
+                0, y, self._w, y, TPlot._BLACK_COLOR, TPlot._GRID_LAYER
+            )
+
+    def _update_hover(self, state: GuiState, mpos: Point) -> None:
+        """Recolor the gridded perms whose highlighting changed since the last draw.
+
+        Args:
+            state (GuiState): A collection of settings.
+            mpos (Point): The current mouse position.
+        """
+        hover = self.hover_target(state, mpos)
+        if hover == self._hover:
+            return
+        previous, self._hover = self._hover, hover
+        obs_indices = {previous[0], hover[0]}
+        for cell in (previous[2], hover[2]):
+            if cell is not None:
+                obs_indices.update(self.draw_info().obstructions_by_cell.get(cell, ()))
+        for i in obs_indices:
+            path = self._obs_shapes[i] if i >= 0 else None
+            if path is not None:
+                path.set_color(self._obstruction_color(i))
+        for i in (previous[1], hover[1]):
+            if i < 0:
+                continue
+            col = TPlot._HIGHLIGHT_COLOR if i == hover[1] else TPlot._REQUIREMENT_COLOR
+            for path in self._req_shapes[i]:
+                if path is not None:
+                    path.set_color(col)
+
+    def _obstruction_color(self, gridded_perm_index: int) -> Tuple[float, float, float]:
+        """The color of an obstruction given the current hover state.
+
+        Args:
+            gridded_perm_index (int): The index of the obstruction.
+
+        Returns:
+            Tuple[float, float, float]: The RGB color to draw it with.
+        """
+        hover_index, _, hover_cell = self._hover
+        if gridded_perm_index == hover_index or (
+            hover_cell is not None
+            and hover_cell in self.tiling.obstructions[gridded_perm_index].pos
+        ):
+            return TPlot._HIGHLIGHT_COLOR
+        return TPlot._OBSTRUCTION_COLOR
+
+    def draw_info(self) -> TilingDrawInfo:
+        """Get the draw flags of the tiling, computed on first use.
+
+        Returns:
+            TilingDrawInfo: The draw flags of the current tiling.
+        """
+        if self._info is None:
+            self._info = TilingDrawInfo(self.tiling)
+        return self._info
+
+    def _refresh_obstruction(self, gridded_perm_index: int) -> None:
+        """Move the shapes of an obstruction to its current locations. Nothing is
+        done if the shapes are to be rebuilt anyway.
+
+        Args:
+            gridded_perm_index (int): The index of the obstruction.
+        """
+        if self._stale:
+            return
+        path = self._obs_shapes[gridded_perm_index]
+        if path is not None:
+            path.set_points(self._obstruction_locs[gridded_perm_index])
+
+    def to_tikz(self) -> str:
+        """Create a tikz drawing of the plot. The lines are built into a single
+        string, which can be written to a file or stdout at once.
+
+        Returns:
+            str: The tikzpicture environment.
+        """
+        return "\n".join(
+            chain(
+                (
+                    "\\begin{tikzpicture}[scale=1, every node/.style={scale=1}]",
+                    "\t\\def\\xscale{1.0} % Horizontal scale factor",
+                    "\t\\def\\yscale{1.0} % Vertical scale factor",
+                    "\t\\def\\spnt{0.075} % Size of smaller points",
+                    "\t\\def\\lpnt{0.125} % Size of larger points",
+                ),
+                self._tikz_shaded(),
+                self._tikz_grid(),
+                self._tikz_obstructions(),
+                self._tikz_requirements(),
+                ("\\end{tikzpicture}",),
+            )
+        )
+
+    def _tikz_shaded(self) -> Iterator[str]:
         for c_x, c_y in self.tiling.empty_cells:
             x, y, w, h = self.cell_to_rect(c_x, c_y)
             x1, y1, x2, y2 = x / 100, y / 100, (x + w) / 100, (y + h) / 100
-            print(
+            yield (
                 f"\t\\fill[gray!80] ({x1}*\\xscale,{y1}*\\yscale)"
                 f" rectangle ({x2}*\\xscale,{y2}*\\yscale);"
             )
 
-    def _tikz_grid(self) -> None:
+    def _tikz_grid(self) -> Iterator[str]:
         t_w, t_h = self.tiling.dimensions
         for i in range(t_w + 1):
             x = self._w * i / t_w
-            print(
+            yield (
                 f"\t\\draw ({x / 100}*\\xscale, {self._h / 100}*\\yscale) -- "
                 f"({x / 100}*\\xscale, 0);"
             )
         for i in range(t_h + 1):
             y = self._h * i / t_h
-            print(
+            yield (
                 f"\t\\draw (0, {y / 100}*\\yscale) -- "
                 f"({self._w / 100}*\\xscale, {y / 100}*\\yscale);"
             )
 
-    def _tikz_obstructions(self) -> None:
-
-        point_cells_with_point_perm_req = self.tiling.point_cells.intersection(
-            {
-                req.pos[0]
-                for req_lis in self.tiling.requirements
-                for req in req_lis
-                if req.is_point_perm()
-            }
-        )
-        for obs, loc in zip(self.tiling.obstructions, self._obstruction_locs):
-            if obs.is_point_perm() or all(
-                p in point_cells_with_point_perm_req for p in obs.pos
-            ):
+    def _tikz_obstructions(self) -> Iterator[str]:
+        info = self.draw_info()
+        for flags, loc in zip(info.obstructions, self._obstruction_locs):
+            if flags & (DrawFlag.POINT_PERM | DrawFlag.PRETTY):
                 continue
-            TPlot._tikz_pnt_path(loc, "red")
+            yield from TPlot._tikz_pnt_path(loc, "red")
 
-    def _tikz_requirements(self) -> None:
-        for i, reqlist in enumerate(self._requirement_locs):
-            if len(reqlist[0]) == 1 and any(
-                p in self.tiling.point_cells
-                for req in self.tiling.requirements[i]
-                for p in req.pos
-            ):
+    def _tikz_requirements(self) -> Iterator[str]:
+        info = self.draw_info()
+        for flags, reqlist in zip(info.requirement_lists, self._requirement_locs):
+            if flags & DrawFlag.PRETTY:
                 pnt = reqlist[0][0]
-                print(
+                yield (
                     f"\t\\fill ({pnt.x/100}*\\xscale,"
                     f"{pnt.y/100}*\\yscale) circle (\\lpnt);"
                 )
                 continue
             for loc in reqlist:
-                TPlot._tikz_pnt_path(loc, "blue")
+                yield from TPlot._tikz_pnt_path(loc, "blue")
 
     @staticmethod
-    def _tikz_pnt_path(loc: List[Point], col: str) -> None:
+    def _tikz_pnt_path(loc: Sequence[Point], col: str) -> Iterator[str]:
         if not loc:
             return
-        print(
-            f"\t\\fill[{col}] ({loc[0].x/100}*\\xscale, "
-            f"{loc[0].y/100}*\\yscale) circle (\\spnt);"
-        )
-        if len(loc) == 1:
-            return
-        path = f"({loc[0].x/100}*\\xscale, {loc[0].y/100}*\\yscale)"
-        for pnt in loc[1:]:
-            x, y = pnt.x, pnt.y
-            path += f" -- ({x/100}*\\xscale,{y/100}*\\yscale)"
-            print(
-                f"\t\\fill[{col}] ({x/100}*\\xscale, {y/100}*\\yscale) circle (\\spnt);"
+        for pnt in loc:
+            yield (
+                f"\t\\fill[{col}] ({pnt.x/100}*\\xscale, {pnt.y/100}*\\yscale) "
+                "circle (\\spnt);"
+            )
+        if len(loc) > 1:
+            path = " -- ".join(
+                f"({pnt.x/100}*\\xscale,{pnt.y/100}*\\yscale)" for pnt in loc[1:]
+            )
+            yield (
+                f"\t\\draw[{col}] ({loc[0].x/100}*\\xscale, "
+                f"{loc[0].y/100}*\\yscale) -- {path};"
             )
-        print(f"\t\\draw[{col}] {path};")
 
 
 Action = Callable[[int, int, int, int], None]
 
 
-class TPlotManager(pyglet.event.EventDispatcher, Observer):
-    """A manager that handles drawing the tiling plot and observing
-    events that have to do with it. It halso handles dispatching some
-    events and memory for undo and redos.
+class PlotSnapshot:
+    """A tiling plot reduced to the tiling's serialized bytes and the positions of
+    all its points, in units of cells, packed into a single float array.
     """
 
-    _MAX_DEQUEUE_SIZE: ClassVar[int] = 100
-    _MAX_SEQUENCE_SIZE: ClassVar[int] = 7
-    _VERIFICATION_STRATS: ClassVar[List[str]] = [
-        "BasicVerificationStrategy",
-        # "DatabaseVerificationStrategy",  # Removed in tilings 4.0.0
-        "ElementaryVerificationStrategy",
-        "InsertionEncodingVerificationStrategy",
-        "LocallyFactorableVerificationStrategy",
-        "LocalVerificationStrategy",
-        "MonotoneTreeVerificationStrategy",
-        "OneByOneVerificationStrategy",
-    ]
-    _POINT_PERM: ClassVar[Perm] = Perm((0,))
-    _MIN_SPACE: ClassVar[int] = 10
+    TYPECODE: ClassVar[str] = "f"
 
-    @staticmethod
-    def _verify(tiling: Tiling) -> List[str]:
-        """Apply all verification strategies on a tiling.
+    def __init__(self, tiling: bytes, coordinates: bytes) -> None:
+        """Create a snapshot. Use TPlot.snapshot() to take one of a plot.
 
         Args:
-            tiling (Tiling): The tiling to apply strategies to.
+            tiling (bytes): The tiling as given by Tiling.to_bytes().
+            coordinates (bytes): For each obstruction and then each requirement,
+            the x coordinates of its points followed by the y coordinates.
+        """
+        self._tiling: bytes = tiling
+        self._coordinates: bytes = coordinates
+
+    @property
+    def nbytes(self) -> int:
+        """The memory taken up by the snapshot's data."""
+        return sys.getsizeof(self._tiling) + sys.getsizeof(self._coordinates)
+
+    def restore(self, w: float, h: float) -> TPlot:
+        """Rebuild the tiling plot the snapshot was taken of.
+
+        Args:
+            w (float): The width of the drawing.
+            h (float): The height of the drawing.
 
         Returns:
-            List[str]: A list of boolean results, converted to strings.
+            TPlot: A plot of the same tiling with the same point positions.
         """
-        return [
-            str(BasicVerificationStrategy().verified(tiling)),
-            # str(DatabaseVerificationStrategy().verified(tiling)),  # Removed
-            str(ElementaryVerificationStrategy().verified(tiling)),
-            str(InsertionEncodingVerificationStrategy().verified(tiling)),
-            str(LocallyFactorableVerificationStrategy().verified(tiling)),
-            str(LocalVerificationStrategy(no_factors=False).verified(tiling)),
-            str(MonotoneTreeVerificationStrategy().verified(tiling)),
-            str(OneByOneVerificationStrategy().verified(tiling)),
-        ]
+        from tilings import Tiling  # pylint: disable=import-outside-toplevel
+
+        tiling = Tiling.from_bytes(self._tiling)
+        coordinates = array(PlotSnapshot.TYPECODE, self._coordinates)
+        layout: Layout = {}
+        start = 0
+        for g_perm in chain(tiling.obstructions, *tiling.requirements):
+            mid, stop = start + len(g_perm), start + 2 * len(g_perm)
+            layout[g_perm] = (coordinates[start:mid], coordinates[mid:stop])
+            start = stop
+        return TPlot(tiling, w, h, layout)
+
+
+class PendingOperation(NamedTuple):
+    """An operation on a tiling that is being worked on in worker processes, and
+    the id its result is queued under.
+    """
+
+    func: Callable[..., Any]
+    tiling: Tiling
+    args: Tuple[Any, ...]
+    tiling_digest: bytes
+    unpack: Optional[Callable[[Any], Optional[Tiling]]]
+    queue_id: int
+    form: Optional[CanonicalForm]
+
+
+class SequencePrinter:
+    """Prints the terms of a sequence on one line, in order, as they become
+    known. Nothing is printed until the printer is started, so that the lines of
+    several printers do not mix. The line can end with the A-numbers of the OEIS
+    sequences that match the terms.
+    """
+
+    _MAX_MATCHES: ClassVar[int] = 10
 
     def __init__(
+        self,
+        max_length: int,
+        lookup: Optional[Callable[["SequencePrinter", List[int]], None]] = None,
+    ) -> None:
+        """Create a printer.
+
+        Args:
+            max_length (int): The length of the last term to print.
+            lookup (Optional[Callable[[SequencePrinter, List[int]], None]]): Called
+            with the printer and the terms once they are all printed, if there are
+            enough of them to look up. It should lead to a call of matched. Defaults
+            to None, for no lookup.
+        """
+        self._counts: Dict[int, int] = {}
+        self._max_length: int = max_length
+        self._lookup: Optional[Callable[["SequencePrinter", List[int]], None]] = lookup
+        self._next: int = 0
+        self._reason: Optional[str] = None
+        self.started: bool = False
+        self.done: bool = False
+
+    def start(self) -> None:
+        """Start the line and print the terms known so far."""
+        self.started = True
+        print("Sequence: ", end="", flush=True)
+        self._flush()
+        if self._reason is not None:
+            self.stop(self._reason)
+
+    def add(self, length: int, count: int) -> None:
+        """Add a term and print the ones that can be printed.
+
+        Args:
+            length (int): The length of the term.
+            count (int): The term.
+        """
+        self._counts[length] = count
+        if self.started:
+            self._flush()
+
+    def stop(self, reason: str) -> None:
+        """End the line early, or once started if it has not been.
+
+        Args:
+            reason (str): Why the remaining terms will not be printed.
+        """
+        if not self.started:
+            self._reason = reason
+        elif not self.done:
+            self.done = True
+            print(f" ({reason})")
+
+    def matched(self, anums: List[str]) -> None:
+        """End the line with the A-numbers of the matching sequences.
+
+        Args:
+            anums (List[str]): The A-numbers.
+        """
+        if not self.done:
+            self.done = True
+            shown = ", ".join(anums[: SequencePrinter._MAX_MATCHES])
+            more = len(anums) - SequencePrinter._MAX_MATCHES
+            if more > 0:
+                shown += f" and {more} more"
+            print(f"  OEIS: {shown or 'no match'}")
+
+    def _flush(self) -> None:
+        """Print the known terms that follow the ones printed so far. After the
+        last one, either end the line or look the terms up.
+        """
+        if self.done or self._next > self._max_length:
+            return
+        while self._next <= self._max_length and self._next in self._counts:
+            sep = ", " if self._next else ""
+            print(f"{sep}{self._counts[self._next]}", end="", flush=True)
+            self._next += 1
+        if self._next > self._max_length:
+            terms = [self._counts[i] for i in range(self._max_length + 1)]
+            if self._lookup is None or len(terms) < oeis.OeisIndex.WINDOW:
+                self.done = True
+                print()
+            else:
+                self._lookup(self, terms)
+
+
+class TPlotManager(  # pylint: disable=too-many-instance-attributes
+    pyglet.event.EventDispatcher, Observer, Redrawable
+):  # pylint: disable=too-many-public-methods
+    """A manager that handles drawing the tiling plot and observing
+    events that have to do with it. It halso handles dispatching some
+    events and memory for undo and redos.
+    """
+
+    DEFAULT_HISTORY_BUDGET: ClassVar[int] = 64 * 2**20
+    DEFAULT_LIMITS: ClassVar[Limits] = Limits.default()
+    _MAX_SEQUENCE_SIZE: ClassVar[int] = 7
+    _SEQUENCE_SIZE_LIMIT: ClassVar[int] = 10
+    _SEQUENCE_MEMO_SIZE: ClassVar[int] = 32
+    _FACTOR_MEMO_SIZE: ClassVar[int] = 32
+    _OEIS_INDEX_FILE: ClassVar[str] = "oeis.idx"
+    _POINT_PERM: ClassVar[Perm] = Perm((0,))
+    _MIN_SPACE: ClassVar[int] = 10
+    _VERIFICATION_TIMEOUT: ClassVar[float] = 30.0
+    _POLL_INTERVAL: ClassVar[float] = 1 / 30
+    _BUSY_TEXT: ClassVar[str] = "Working... (Esc to cancel)"
+    _BUSY_FONT_SIZE: ClassVar[int] = 14
+    _BUSY_MARGIN: ClassVar[int] = 10
+    _TIKZ_KEY: ClassVar[int] = pyglet.window.key.T
+    _TIKZ_MOD: ClassVar[int] = pyglet.window.key.MOD_ACCEL
+    _TIKZ_DIR: ClassVar[str] = "tikz"
+
+    def __init__(  # pylint: disable=too-many-arguments
         self,
         width: int,
         height: int,
         state: GuiState,
         dispatchers: Iterable[pyglet.event.EventDispatcher] = (),
         init_tiling: str = "",
+        history_budget: int = DEFAULT_HISTORY_BUDGET,
+        default_limits: Limits = DEFAULT_LIMITS,
+        action_limits: Optional[Dict[str, Limits]] = None,
+        verification_cache: Optional[VerificationCache] = None,
+        oeis_dump: Optional[pathlib.Path] = None,
+        memo_budget: int = OperationMemo.DEFAULT_BUDGET,
     ) -> None:
         """Create an instance of a tiling plot manager.
 
@@ -525,10 +1170,72 @@ class TPlotManager(pyglet.event.EventDispatcher, Observer):
             dispatchers (Iterable[pyglet.event.EventDispatcher], optional): A collection
             of dispatchers that this observer should listen ot. Defaults to ().
             init_tiling (str): Initial tiling to draw. Defaluts to "".
+            history_budget (int): The most bytes that snapshots kept for undo and
+            redo may take up, the oldest are dropped first. Defaults to 64MiB.
+            default_limits (Limits): The time and memory an operation may use before
+            it is stopped. Defaults to Limits.default().
+            action_limits (Optional[Dict[str, Limits]]): Limits for specific
+            operations, by their name in the operations module, that override the
+            default ones. Unless given, each verification strategy gets the default
+            limits with a 30 second time limit. Defaults to None.
+            verification_cache (Optional[VerificationCache]): Where verification
+            results are looked up and stored. The manager closes it when the window
+            closes. Defaults to None, for no caching.
+            oeis_dump (Optional[pathlib.Path]): An OEIS dump in the stripped format
+            to look printed sequences up in. Its index is kept in the exports
+            directory. Defaults to None, for no lookup.
+            memo_budget (int): The most bytes that remembered results of operations
+            may take up, the least recently used are dropped first. Defaults to
+            32MiB.
         """
         Observer.__init__(self, dispatchers)
-        self.deques: List[Deque[TPlot]] = [deque(), deque()]
+        Redrawable.__init__(self)
+        self.deques: List[Deque[PlotSnapshot]] = [deque(), deque()]
+        self._plot: Optional[TPlot] = None
+        self._history_budget: int = history_budget
+        self._history_bytes: int = 0
+        self._default_limits: Limits = default_limits
+        self._action_limits: Dict[str, Limits] = {
+            operations.verify.__name__: default_limits._replace(
+                seconds=TPlotManager._VERIFICATION_TIMEOUT
+            ),
+            **(action_limits or {}),
+        }
+        self._generation: int = 0
+        self._pool: WorkerPool = WorkerPool(
+            preload=(
+                memo.__name__,
+                operations.__name__,
+                oeis.__name__,
+                "tilings.algorithms",
+                "tilings.strategies",
+            )
+        )
+        self._pool.start()
+        self._job_generations: Dict[int, int] = {}
+        self._job_results: Dict[int, JobResult] = {}
+        self._job_operations: Dict[int, PendingOperation] = {}
+        self._memo: OperationMemo = OperationMemo(memo_budget)
+        self._queue_id: int = 0
+        self._job_reports: Dict[int, Callable[[JobResult], None]] = {}
+        self._verification_cache: Optional[VerificationCache] = verification_cache
+        self._sequences: "OrderedDict[bytes, Dict[int, int]]" = OrderedDict()
+        self._sequence_jobs: Dict[Tuple[bytes, int], List[SequencePrinter]] = {}
+        self._factor_components: (
+            "OrderedDict[Tuple[Tiling, bool], Tuple[operations.Component, ...]]"
+        ) = OrderedDict()
+        self._sequence_printers: Deque[SequencePrinter] = deque()
+        self._oeis_dump: Optional[pathlib.Path] = oeis_dump
+        self._busy_label: pyglet.text.Label = pyglet.text.Label(
+            TPlotManager._BUSY_TEXT,
+            font_size=TPlotManager._BUSY_FONT_SIZE,
+            x=TPlotManager._BUSY_MARGIN,
+            y=TPlotManager._BUSY_MARGIN,
+            color=Color.alpha_extend(Color.BLACK),
+        )
         self._mouse_pos: Point = Point(0, 0)
+        self._hover: Optional[Tuple[int, int, Optional[Tuple[int, int]]]] = None
+        self._drawn_settings: Tuple[bool, ...] = ()
         self._custom_data: str = "01"
         self._state: GuiState = state
         self._w: int = width
@@ -548,6 +1255,16 @@ class TPlotManager(pyglet.event.EventDispatcher, Observer):
         self._h = height
         if not self._empty():
             self._current().resize(width, height)
+        self.mark_dirty()
+
+    def is_dirty(self) -> bool:
+        """Does the tiling plot need to be redrawn? That is the case if it has
+        changed or if any of the settings it is drawn with have been toggled.
+
+        Returns:
+            bool: True iff it has changed since it was last drawn.
+        """
+        return self._dirty or self._drawn_settings != self._state.drawing_settings()
 
     ##################
     # Event Handlers #
@@ -561,6 +1278,45 @@ class TPlotManager(pyglet.event.EventDispatcher, Observer):
         """
         if not self._empty():
             self._current().draw(self._state, self._mouse_pos)
+        if self._busy():
+            self._busy_label.draw()
+        self._drawn_settings = self._state.drawing_settings()
+        self.mark_clean()
+        return False
+
+    def on_key_press(self, symbol: int, modifiers: int) -> bool:
+        """Key pressed event handler. Escape cancels pending operations and ctrl+t
+        writes tikz drawings of the tilings in the history.
+
+        Args:
+            symbol (int): The key pressed.
+            modifiers (int): If combinded with modifiers (e.g. ctrl).
+
+        Returns:
+            bool: True if the event is consumed by the handler, false otherwise.
+        """
+        if symbol == pyglet.window.key.ESCAPE and self._busy():
+            self._cancel_jobs()
+            return True
+        if symbol == TPlotManager._TIKZ_KEY and modifiers & TPlotManager._TIKZ_MOD:
+            self._write_history_tikz()
+            return True
+        return False
+
+    def on_close(self) -> bool:
+        """Event handler for the closing of the window. Stops the worker processes,
+        closes the verification cache and reports how useful remembering operation
+        results was.
+
+        Returns:
+            bool: False as we do not want to consume the event.
+        """
+        self._pool.close()
+        stats = self._memo.stats()
+        if stats.hits or stats.misses:
+            print(f"Operation memo: {stats}")
+        if self._verification_cache is not None:
+            self._verification_cache.close()
         return False
 
     def on_fetch_tiling_for_export(self) -> bool:
@@ -585,6 +1341,8 @@ class TPlotManager(pyglet.event.EventDispatcher, Observer):
         Returns:
             bool: True as we want to consume the event.
         """
+        from tilings import Tiling  # pylint: disable=import-outside-toplevel
+
         self._add_plot(TPlot(Tiling.from_string(basis), self._w, self._h))
         return True
 
@@ -620,11 +1378,7 @@ class TPlotManager(pyglet.event.EventDispatcher, Observer):
             bool: True as we want to consume the event.
         """
         if not self._empty():
-            n_plot = TPlot(
-                self._current().tiling.row_and_column_separation(), self._w, self._h
-            )
-            if n_plot is not None:
-                self._add_plot(n_plot)
+            self._submit(operations.row_and_column_separation)
         return True
 
     def on_obstruction_transivity(self) -> bool:
@@ -635,33 +1389,180 @@ class TPlotManager(pyglet.event.EventDispatcher, Observer):
             bool: True as we want to consume the event.
         """
         if not self._empty():
-            n_plot = TPlot(
-                self._current().tiling.obstruction_transitivity(), self._w, self._h
-            )
-            if n_plot is not None:
-                self._add_plot(n_plot)
+            self._submit(operations.obstruction_transitivity)
         return True
 
     def on_print_sequence(self) -> bool:
-        """Event handler for printing the sequence of number of griddable permutations
-        on the current tiling. It does so up to a max length.
+        """Event handler for printing the sequence of number of gridded perms on the
+        current tiling. It does so up to a max length, given by a number without a
+        leading zero in the upper right input field or 7 by default. As the field
+        also holds patterns, such as 102, the length is capped at 10. Each length is
+        counted in a worker process and the terms are printed as soon as they and
+        those before them are known. Counts are remembered for recent tilings and
+        shared with their symmetries, so only missing terms are counted.
 
         Returns:
             bool: True as we want to consume the event.
         """
         if not self._empty():
-            print("Sequence: ", end="")
-            c = Counter(
-                len(gp)
-                for gp in self._current().tiling.gridded_perms(
-                    TPlotManager._MAX_SEQUENCE_SIZE
+            tiling = self._current().tiling
+            max_length = TPlotManager._MAX_SEQUENCE_SIZE
+            if self._custom_data.isnumeric() and not self._custom_data.startswith("0"):
+                max_length = min(
+                    int(self._custom_data), TPlotManager._SEQUENCE_SIZE_LIMIT
                 )
+            printer = SequencePrinter(
+                max_length,
+                None if self._oeis_dump is None else self._oeis_lookup,
             )
-            print(
-                ", ".join(str(c[i]) for i in range(TPlotManager._MAX_SEQUENCE_SIZE + 1))
+            self._sequence_printers.append(printer)
+            self._with_form(
+                tiling,
+                hash_bytes(tiling.to_bytes()),
+                partial(self._count_sequence, printer, tiling, max_length),
+                partial(self._stop_sequence_printers, [printer]),
             )
+            self._advance_sequence_printers()
         return True
 
+    def _count_sequence(
+        self,
+        printer: SequencePrinter,
+        tiling: Tiling,
+        max_length: int,
+        form: CanonicalForm,
+    ) -> None:
+        """Pass the remembered counts of gridded perms on a tiling to a printer and
+        count the missing ones in worker processes, unless they are already being
+        counted.
+
+        Args:
+            printer (SequencePrinter): The printer.
+            tiling (Tiling): The tiling.
+            max_length (int): The length of the last term.
+            form (CanonicalForm): The canonical form of the tiling.
+        """
+        counts = self._sequence_counts(form.digest)
+        for length in range(max_length + 1):
+            if length in counts:
+                printer.add(length, counts[length])
+                continue
+            key = (form.digest, length)
+            if key not in self._sequence_jobs:
+                self._sequence_jobs[key] = []
+                self._submit_report(
+                    partial(self._sequence_term, form.digest, length),
+                    operations.count_gridded_perms,
+                    tiling,
+                    length,
+                )
+            self._sequence_jobs[key].append(printer)
+        self._advance_sequence_printers()
+
+    def _advance_sequence_printers(self) -> None:
+        """Drop finished sequence printers and start the next one in line."""
+        while self._sequence_printers:
+            printer = self._sequence_printers[0]
+            if not printer.started:
+                printer.start()
+            if not printer.done:
+                return
+            self._sequence_printers.popleft()
+
+    def _oeis_lookup(self, printer: SequencePrinter, terms: List[int]) -> None:
+        """Look a sequence up in the OEIS dump in a worker process and pass the
+        matches on to its printer.
+
+        Args:
+            printer (SequencePrinter): The printer of the sequence.
+            terms (List[int]): The terms of the sequence.
+        """
+        assert self._oeis_dump is not None
+        self._submit_report(
+            partial(self._oeis_matches, printer),
+            oeis.search,
+            str(self._oeis_dump),
+            str(
+                PathManager.get_exports_abs_path().joinpath(
+                    TPlotManager._OEIS_INDEX_FILE
+                )
+            ),
+            terms,
+        )
+
+    def _oeis_matches(self, printer: SequencePrinter, result: JobResult) -> None:
+        """Pass the result of an OEIS lookup on to the printer that asked for it.
+
+        Args:
+            printer (SequencePrinter): The printer.
+            result (JobResult): The result of the lookup.
+        """
+        if result.error is None:
+            printer.matched(result.value)
+        elif isinstance(result.error, LimitExceededError):
+            printer.stop(f"OEIS lookup stopped: {result.error}")
+        else:
+            printer.stop(f"OEIS lookup failed: {result.error!r}")
+        self._advance_sequence_printers()
+
+    def _sequence_counts(self, canonical_digest: bytes) -> Dict[int, int]:
+        """Get the remembered counts of gridded perms on a tiling, which are the
+        same for all its symmetries. The least recently used tiling is forgotten
+        when too many are remembered.
+
+        Args:
+            canonical_digest (bytes): The hash of the tiling's canonical form.
+
+        Returns:
+            Dict[int, int]: The number of gridded perms by length.
+        """
+        if canonical_digest in self._sequences:
+            self._sequences.move_to_end(canonical_digest)
+        else:
+            self._sequences[canonical_digest] = {}
+            if len(self._sequences) > TPlotManager._SEQUENCE_MEMO_SIZE:
+                self._sequences.popitem(last=False)
+        return self._sequences[canonical_digest]
+
+    def _sequence_term(
+        self, canonical_digest: bytes, length: int, result: JobResult
+    ) -> None:
+        """Remember a count of gridded perms and pass it on to the printers that
+        wait for it.
+
+        Args:
+            canonical_digest (bytes): The hash of the canonical form of the tiling
+            counted on.
+            length (int): The length counted.
+            result (JobResult): The result of the count.
+        """
+        printers = self._sequence_jobs.pop((canonical_digest, length))
+        if result.error is None:
+            self._sequence_counts(canonical_digest)[length] = result.value
+            for printer in printers:
+                printer.add(length, result.value)
+            self._advance_sequence_printers()
+        else:
+            self._stop_sequence_printers(printers, result)
+
+    def _stop_sequence_printers(
+        self, printers: List[SequencePrinter], result: JobResult
+    ) -> None:
+        """Stop sequence printers because a job they wait for failed.
+
+        Args:
+            printers (List[SequencePrinter]): The printers.
+            result (JobResult): The result of the job.
+        """
+        reason = (
+            f"stopped: {result.error}"
+            if isinstance(result.error, LimitExceededError)
+            else f"failed: {result.error!r}"
+        )
+        for printer in printers:
+            printer.stop(reason)
+        self._advance_sequence_printers()
+
     def on_print_tiling(self) -> bool:
         """Event handler for printing the current tiling if any. Prints both the str
         and repr format of the tiling.
@@ -682,9 +1583,32 @@ class TPlotManager(pyglet.event.EventDispatcher, Observer):
             bool: True as we want to consume the event.
         """
         if not self._empty():
-            self._current().to_tikz()
+            print(self._current().to_tikz(), flush=True)
         return True
 
+    def _write_history_tikz(self) -> None:
+        """Write a tikz drawing of each tiling in the undo and redo history, oldest
+        first, with the points where they were drawn. The files are numbered in that
+        order and written to a new directory in ./tikz/ named after the time.
+        """
+        if self._empty():
+            return
+        directory = pathlib.Path.cwd().joinpath(
+            TPlotManager._TIKZ_DIR, time.strftime("%Y%m%d-%H%M%S")
+        )
+        directory.mkdir(parents=True, exist_ok=True)
+        plots = chain(
+            (snap.restore(self._w, self._h) for snap in reversed(self._undo_deq())),
+            (self._current(),),
+            (snap.restore(self._w, self._h) for snap in reversed(self._redo_deq())),
+        )
+        count = 0
+        for count, plot in enumerate(plots, start=1):
+            directory.joinpath(f"{count:05d}.tex").write_text(
+                plot.to_tikz() + "\n", encoding="utf-8"
+            )
+        print(f"Tikz: {count} drawings written to {directory}", flush=True)
+
     def on_obstruction_inferral(self) -> bool:
         """Event handler for obstruction inferral.
 
@@ -695,39 +1619,82 @@ class TPlotManager(pyglet.event.EventDispatcher, Observer):
             length = 3
             if self._custom_data and self._custom_data.isnumeric():
                 length = max(min(6, int(self._custom_data)), 0)
-            tiling = self._current().tiling
-            self._add_tiling(tiling.all_obstruction_inferral(length))
+            self._submit(operations.obstruction_inferral, length)
         return True
 
     def on_verification(self) -> bool:
-        """Event handler for verification on the current tiling.
+        """Event handler for verification on the current tiling. Cached results
+        are printed right away, the other strategies run in worker processes.
 
         Returns:
             bool: True as we want to consume the event.
         """
         if not self._empty():
-            pad = max(len(s) for s in TPlotManager._VERIFICATION_STRATS)
-            print(
-                "\n".join(
-                    f"{strat}{' '*(pad-len(strat))} : {vert}"
-                    for strat, vert in zip(
-                        TPlotManager._VERIFICATION_STRATS,
-                        TPlotManager._verify(self._current().tiling),
-                    )
-                ),
-                end="\n\n",
-            )
+            tiling = self._current().tiling
+            if self._verification_cache is None:
+                self._verify(tiling, None)
+            else:
+                self._with_form(
+                    tiling,
+                    hash_bytes(tiling.to_bytes()),
+                    partial(self._verify, tiling),
+                    lambda _result: self._verify(tiling, None),
+                )
         return True
 
+    def _verify(self, tiling: Tiling, form: Optional[CanonicalForm]) -> None:
+        """Print the cached results of the verification strategies on a tiling and
+        run the other strategies in worker processes.
+
+        Args:
+            tiling (Tiling): The tiling.
+            form (Optional[CanonicalForm]): The canonical form of the tiling,
+            needed to use the cache. None to bypass it.
+        """
+        strategies = list(operations.VERIFICATION_STRATEGIES)
+        pad = max(len(strat) for strat in strategies)
+        cache = None if form is None else self._verification_cache
+        cached = {} if cache is None or form is None else cache.get(tiling, form)
+        remaining = set(strategies)
+
+        def show(strat: str, outcome: str) -> None:
+            print(f"{strat}{' '*(pad-len(strat))} : {outcome}")
+            remaining.discard(strat)
+            if not remaining:
+                print()
+
+        def report(strat: str, result: JobResult) -> None:
+            if result.error is None:
+                if cache is not None and form is not None:
+                    cache.put(tiling, form, strat, result.value)
+                show(strat, str(result.value))
+            elif isinstance(result.error, TimeLimitExceededError):
+                show(strat, "timeout")
+            else:
+                show(strat, f"failed ({result.error!r})")
+
+        for strat in strategies:
+            if strat in cached:
+                show(strat, str(cached[strat]))
+            else:
+                self._submit_report(
+                    partial(report, strat), operations.verify, tiling, strat
+                )
+
     def on_undo(self) -> bool:
         """Event handler for undo.
 
         Returns:
             bool: True as we want to consume event.
         """
-        if len(self._undo_deq()) > 1:
-            self._redo_deq().append(self._undo_deq().popleft())
-            self._current().resize(self._w, self._h)
+        if self._undo_deq():
+            snapshot, previous = self._current().snapshot(), self._undo_deq().popleft()
+            self._redo_deq().append(snapshot)
+            self._history_bytes += snapshot.nbytes - previous.nbytes
+            self._trim_history()
+            self._plot = previous.restore(self._w, self._h)
+            self._generation += 1
+            self.mark_dirty()
         return True
 
     def on_redo(self) -> bool:
@@ -737,8 +1704,13 @@ class TPlotManager(pyglet.event.EventDispatcher, Observer):
             bool: True as we want to consume event.
         """
         if self._redo_deq():
-            self._undo_deq().appendleft(self._redo_deq().pop())
-            self._current().resize(self._w, self._h)
+            snapshot, following = self._current().snapshot(), self._redo_deq().pop()
+            self._undo_deq().appendleft(snapshot)
+            self._history_bytes += snapshot.nbytes - following.nbytes
+            self._trim_history()
+            self._plot = following.restore(self._w, self._h)
+            self._generation += 1
+            self.mark_dirty()
         return True
 
     def on_mouse_motion(self, x: int, y: int, _dx: int, _dy: int) -> bool:
@@ -757,6 +1729,11 @@ class TPlotManager(pyglet.event.EventDispatcher, Observer):
         """
         self._mouse_pos.x = x
         self._mouse_pos.y = y
+        if not self._empty():
+            hover = self._current().hover_target(self._state, self._mouse_pos)
+            if hover != self._hover:
+                self._hover = hover
+                self.mark_dirty()
         return False
 
     def on_mouse_release(self, _x: int, _y: int, _button: int, _modifiers: int) -> bool:
@@ -811,6 +1788,7 @@ class TPlotManager(pyglet.event.EventDispatcher, Observer):
             return False
 
         tplot = self._current()
+        self.mark_dirty()
 
         if len(self._state.move_state.selected_point) == 2:
             # If moving obstruction
@@ -818,8 +1796,9 @@ class TPlotManager(pyglet.event.EventDispatcher, Observer):
             mnx, mxx, mny, mxy = self._state.move_state.point_move_bounds
             if self._state.move_state.move_type == 0:
                 # Moving a single point, must confine to the permutation's structure.
-                pnt = tplot.get_obstruction_gridded_perm_location(i)[j]
-                pnt.x, pnt.y = clamp(x, mnx, mxx), clamp(y, mny, mxy)
+                tplot.move_obstruction_point(
+                    i, j, clamp(x, mnx, mxx), clamp(y, mny, mxy)
+                )
             else:
                 # Moving all, , must confine to the permutation's structure.
                 all_pos = tplot.tiling.obstructions[i].pos
@@ -832,16 +1811,14 @@ class TPlotManager(pyglet.event.EventDispatcher, Observer):
                     ):
                         return False
 
-                for k in range(len(tplot.get_obstruction_gridded_perm_location(i))):
-                    pnt = tplot.get_obstruction_gridded_perm_location(i)[k]
-                    pnt.x += dx
-                    pnt.y += dy
+                tplot.translate_obstruction(i, dx, dy)
         else:
             # If moving requirement
             i, j, k = self._state.move_state.selected_point
             mnx, mxx, mny, mxy = self._state.move_state.point_move_bounds
-            pnt = tplot.get_requirement_gridded_perm_locations(i, j)[k]
-            pnt.x, pnt.y = clamp(x, mnx, mxx), clamp(y, mny, mxy)
+            tplot.move_requirement_point(
+                i, j, k, clamp(x, mnx, mxx), clamp(y, mny, mxy)
+            )
         return False
 
     ###################
@@ -856,24 +1833,26 @@ class TPlotManager(pyglet.event.EventDispatcher, Observer):
             tiling_json (str): A tiling json in string form.
         """
         if tiling_json:
+            from tilings import Tiling  # pylint: disable=import-outside-toplevel
+
             try:
                 self._add_tiling(Tiling.from_json(tiling_json))
             except ValueError:
                 pass
 
-    def _undo_deq(self) -> Deque[TPlot]:
-        """Getter for the undo deque.
+    def _undo_deq(self) -> Deque[PlotSnapshot]:
+        """Getter for the undo deque, the most recent snapshot is first.
 
         Returns:
-            Deque[TPlot]: The undo deque.
+            Deque[PlotSnapshot]: The undo deque.
         """
         return self.deques[0]
 
-    def _redo_deq(self) -> Deque[TPlot]:
-        """Getter for the redo deque.
+    def _redo_deq(self) -> Deque[PlotSnapshot]:
+        """Getter for the redo deque, the most recent snapshot is last.
 
         Returns:
-            Deque[TPlot]: The redo deque.
+            Deque[PlotSnapshot]: The redo deque.
         """
         return self.deques[1]
 
@@ -891,18 +1870,49 @@ class TPlotManager(pyglet.event.EventDispatcher, Observer):
         Returns:
             TPlot: The tiling plot currently being rendered.
         """
-        return self._undo_deq()[0]
+        assert self._plot is not None
+        return self._plot
 
     def _add_plot(self, drawing: TPlot) -> None:
-        """Add a new tiling plot, overtaking the current one if any.
+        """Add a new tiling plot, overtaking the current one if any. The current
+        one is kept as a snapshot for undo, dropping the oldest snapshots if they
+        exceed the history budget.
 
         Args:
             drawing (TPlot): The new tiling plot to render.
         """
-        self._undo_deq().appendleft(drawing)
-        self._redo_deq().clear()
-        if len(self._undo_deq()) > TPlotManager._MAX_DEQUEUE_SIZE:
-            self._undo_deq().pop()
+        if self._plot is not None:
+            snapshot = self._plot.snapshot()
+            self._undo_deq().appendleft(snapshot)
+            self._history_bytes += snapshot.nbytes
+        while self._redo_deq():
+            self._history_bytes -= self._redo_deq().pop().nbytes
+        self._trim_history()
+        self._plot = drawing
+        self._generation += 1
+        self.mark_dirty()
+
+    def _trim_history(self) -> None:
+        """Drop the snapshots furthest from the current tiling while they exceed
+        the history budget, the oldest undos first and then the last redos.
+        """
+        while self._history_bytes > self._history_budget and self._undo_deq():
+            self._history_bytes -= self._undo_deq().pop().nbytes
+        while self._history_bytes > self._history_budget and self._redo_deq():
+            self._history_bytes -= self._redo_deq().popleft().nbytes
+
+    def _next_plot(self, tiling: Tiling) -> TPlot:
+        """Create a tiling plot for a tiling derived from the current one. Gridded
+        perms that the two tilings share keep their position.
+
+        Args:
+            tiling (Tiling): The tiling to draw.
+
+        Returns:
+            TPlot: The new tiling plot.
+        """
+        layout = None if self._empty() else self._current().layout()
+        return TPlot(tiling, self._w, self._h, layout)
 
     def _add_tiling(self, tiling: Tiling) -> None:
         """Add a new tiling plot, overtaking the current one if any.
@@ -910,26 +1920,264 @@ class TPlotManager(pyglet.event.EventDispatcher, Observer):
         Args:
             tiling (Tiling): The tiling to use to create a tiling plot.
         """
-        self._add_plot(TPlot(tiling, self._w, self._h))
+        self._add_plot(self._next_plot(tiling))
+
+    def _busy(self) -> bool:
+        """Are any operations pending?
+
+        Returns:
+            bool: True iff there are jobs whose results have not been handled.
+        """
+        return bool(self._job_generations or self._job_reports)
+
+    def _run(
+        self, func: Callable[..., Any], *args: Any, action: Optional[str] = None
+    ) -> int:
+        """Start a job that runs a function in a worker process and make sure its
+        result is collected.
+
+        Args:
+            func (Callable[..., Any]): A function from the operations module.
+            args (Any): The arguments to call it with.
+            action (Optional[str]): The name of the operation whose limits apply.
+            Defaults to None, for the function's own.
+
+        Returns:
+            int: The id of the job.
+        """
+        # Jobs are also started while results are collected, so the poll is
+        # replaced rather than added to keep a single one.
+        pyglet.clock.unschedule(self._collect_results)
+        pyglet.clock.schedule_interval(
+            self._collect_results, TPlotManager._POLL_INTERVAL
+        )
+        self.mark_dirty()
+        return self._pool.submit(
+            func,
+            *args,
+            limits=self._action_limits.get(
+                action or func.__name__, self._default_limits
+            ),
+        )
+
+    def _submit(
+        self,
+        func: Callable[..., Any],
+        *args: Any,
+        unpack: Optional[Callable[[Any], Optional[Tiling]]] = None,
+    ) -> None:
+        """Run an operation on the current tiling in a worker process. Its result
+        is added as a new tiling plot once it arrives, unless the current tiling
+        has changed in the meantime.
+
+        Results are remembered, so repeating an operation on the same tiling, or on
+        a symmetry of it for most operations, gives its result at once. Only the
+        tiling's bytes are hashed here, finding its canonical form and mapping
+        results between symmetries are left to the worker processes.
+
+        Args:
+            func (Callable[..., Any]): A function from the operations module.
+            args (Any): The arguments that follow the tiling, which must be
+            hashable.
+            unpack (Optional[Callable[[Any], Optional[Tiling]]]): Called with the
+            result as soon as it arrives, even if it is not used, to get the tiling
+            from it. Defaults to None, for operations that return the tiling.
+        """
+        from tilings import Tiling  # pylint: disable=import-outside-toplevel
+
+        tiling = self._current().tiling
+        tiling_digest = hash_bytes(tiling.to_bytes())
+        symmetric = func.__name__ in operations.SYMMETRIC_OPERATIONS
+        known = self._memo.get(
+            OperationMemo.key(func.__name__, tiling_digest, args), last=not symmetric
+        )
+        # Results are queued under ids that the pool never uses, as an operation
+        # can take more than one job.
+        self._queue_id -= 1
+        operation = PendingOperation(
+            func, tiling, args, tiling_digest, unpack, self._queue_id, None
+        )
+        if known is not None:
+            self._job_results[operation.queue_id] = JobResult(
+                operation.queue_id, Tiling.from_bytes(known), None
+            )
+        elif not symmetric:
+            self._run_operation(operation)
+        else:
+            self._with_form(
+                tiling,
+                tiling_digest,
+                lambda form: self._run_operation(operation._replace(form=form)),
+                partial(self._finish_operation, operation),
+            )
+        self._job_generations[operation.queue_id] = self._generation
+        self._apply_ready_results()
+
+    def _with_form(
+        self,
+        tiling: Tiling,
+        tiling_digest: bytes,
+        found: Callable[[CanonicalForm], None],
+        failed: Callable[[JobResult], None],
+    ) -> None:
+        """Pass the canonical form of a tiling to a callback, at once if it is
+        remembered and otherwise once a worker process has found it.
+
+        Args:
+            tiling (Tiling): The tiling.
+            tiling_digest (bytes): The hash of the tiling's bytes.
+            found (Callable[[CanonicalForm], None]): Called with the form.
+            failed (Callable[[JobResult], None]): Called with the result of the job
+            instead, if it failed.
+        """
+        form = self._memo.form(tiling_digest)
+        if form is not None:
+            found(form)
+            return
+
+        def report(result: JobResult) -> None:
+            if result.error is None:
+                self._memo.put_form(tiling_digest, result.value)
+                found(result.value)
+            else:
+                failed(result)
+
+        self._submit_report(report, symmetry.canonical_form, tiling)
+
+    def _run_operation(self, operation: PendingOperation) -> None:
+        """Start the job that gives an operation's result. If the canonical form of
+        the tiling is known and a result for it is remembered, the job maps that
+        result back to the tiling, otherwise it runs the operation.
+
+        Args:
+            operation (PendingOperation): The operation.
+        """
+        func, tiling, args, _, _, _, form = operation
+        known = (
+            None
+            if form is None
+            else self._memo.get(
+                OperationMemo.symmetric_key(func.__name__, tiling, args, form)
+            )
+        )
+        if known is None:
+            sym = None if form is None else form.symmetry
+            job_id = self._run(memo.run, func, tiling, args, sym, action=func.__name__)
+        else:
+            assert form is not None
+            job_id = self._run(memo.restore, known, form.symmetry, action=func.__name__)
+            operation = operation._replace(unpack=None)
+        self._job_operations[job_id] = operation
+
+    def _finish_operation(self, operation: PendingOperation, result: JobResult) -> None:
+        """Remember the result of an operation and queue it to be applied.
+
+        Args:
+            operation (PendingOperation): The operation.
+            result (JobResult): The outcome of its last job.
+        """
+        if result.error is None:
+            func, tiling, args, tiling_digest, unpack, _, form = operation
+            value, data, symmetric_data = result.value
+            if data is not None:
+                self._memo.put(
+                    OperationMemo.key(func.__name__, tiling_digest, args), data
+                )
+            if symmetric_data is not None and form is not None:
+                self._memo.put(
+                    OperationMemo.symmetric_key(func.__name__, tiling, args, form),
+                    symmetric_data,
+                )
+            if unpack is not None:
+                value = unpack(value)
+            result = result._replace(value=value)
+        self._job_results[operation.queue_id] = result._replace(
+            job_id=operation.queue_id
+        )
+
+    def _submit_report(
+        self, report: Callable[[JobResult], None], func: Callable[..., Any], *args: Any
+    ) -> None:
+        """Run a function in a worker process and pass its result to a callback as
+        soon as it arrives.
+
+        Args:
+            report (Callable[[JobResult], None]): The callback.
+            func (Callable[..., Any]): A function from the operations or oeis module.
+            args (Any): The arguments to call it with.
+        """
+        self._job_reports[self._run(func, *args)] = report
 
-    def _factor_from_algorithm(self, cell: Tuple[int, int], fac_algo: Factor) -> None:
-        """Helper for factor actions.
+    def _collect_results(self, _dt: float) -> None:
+        """Gather finished jobs and apply their results in the order the jobs were
+        submitted, so that the undo history matches the order of the actions.
 
         Args:
-            cell (Tuple[int, int]): The clicked cell.
-            fac_algo (Factor): The facorize algorithm to use.
+            _dt (float): The time since the last check. Unused.
         """
-        components = fac_algo.get_components()
-        facs = fac_algo.factors()
-        for fac, component in zip(facs, components):
-            if cell in component:
-                self._add_tiling(fac)
+        for result in self._pool.poll():
+            if result.job_id in self._job_operations:
+                self._finish_operation(self._job_operations.pop(result.job_id), result)
+            elif result.job_id in self._job_reports:
+                self._job_reports.pop(result.job_id)(result)
+        self._apply_ready_results()
+        if not self._busy():
+            pyglet.clock.unschedule(self._collect_results)
+            self.mark_dirty()
+
+    def _apply_ready_results(self) -> None:
+        """Apply the results that have arrived, in the order the jobs were
+        submitted, up to the first job that is still running.
+        """
+        while self._job_generations:
+            job_id, generation = next(iter(self._job_generations.items()))
+            if job_id not in self._job_results:
                 break
+            del self._job_generations[job_id]
+            self._apply_result(generation, self._job_results.pop(job_id))
+
+    def _cancel_jobs(self) -> None:
+        """Cancel all pending operations, the current tiling is left as is."""
+        for job_id in (*self._job_operations, *self._job_reports):
+            self._pool.cancel(job_id)
+        self._job_generations.clear()
+        self._job_results.clear()
+        self._job_operations.clear()
+        self._job_reports.clear()
+        for printer in self._sequence_printers:
+            printer.stop("cancelled")
+        self._sequence_printers.clear()
+        self._sequence_jobs.clear()
+        pyglet.clock.unschedule(self._collect_results)
+        self.mark_dirty()
+
+    def _apply_result(self, generation: int, result: JobResult) -> None:
+        """Add the tiling an operation produced, if the tiling it was applied to
+        is still the current one.
+
+        Args:
+            generation (int): The value of the generation counter when the job was
+            submitted.
+            result (JobResult): The outcome of the job.
+        """
+        # pylint: disable-next=import-outside-toplevel
+        from tilings.exception import InvalidOperationError
+
+        if generation != self._generation:
+            return
+        if result.error is None:
+            if result.value is not None:
+                self._add_tiling(result.value)
+        elif not isinstance(result.error, (InvalidOperationError, NotImplementedError)):
+            if isinstance(result.error, LimitExceededError):
+                print(f"Operation stopped: {result.error}")
+            else:
+                print(f"Operation failed: {result.error!r}")
 
     def _set_move_boundaries(
         self,
         indices: Tuple[int, ...],
-        gp_loc: List[Point],
+        gp_loc: Sequence[Point],
         g_perm: GriddedPerm,
         tplot: TPlot,
     ) -> None:
@@ -938,7 +2186,7 @@ class TPlotManager(pyglet.event.EventDispatcher, Observer):
         Args:
             indices (Tuple[int, ...]): The indices for the permutation within either
             obstructions or requirements.
-            gp_loc (List[Point]): The location of the gridded permutation's points.
+            gp_loc (Sequence[Point]): The location of the gridded permutation's points.
             g_perm (GriddedPerm): The gridded permutation that is being moved.
             tplot (TPlot): The current tiling plot.
         """
@@ -1014,7 +2262,7 @@ class TPlotManager(pyglet.event.EventDispatcher, Observer):
         Returns:
             bool: True iff there is a tiling plot.
         """
-        return bool(self._undo_deq())
+        return self._plot is not None
 
     ###########
     # Actions #
@@ -1065,18 +2313,14 @@ class TPlotManager(pyglet.event.EventDispatcher, Observer):
             button (int): The mouse button clicked.
             _modifiers (int): If combinded with modifiers (e.g. ctrl). Unused.
         """
-        tplot = self._current()
+        cell = self._current().get_cell(Point(x, y))
         if button == pyglet.window.mouse.LEFT:
-            self._add_tiling(
-                tplot.tiling.add_single_cell_requirement(
-                    TPlotManager._POINT_PERM, tplot.get_cell(Point(x, y))
-                )
+            self._submit(
+                operations.add_single_cell_requirement, TPlotManager._POINT_PERM, cell
             )
         elif button == pyglet.window.mouse.RIGHT:
-            self._add_tiling(
-                tplot.tiling.add_single_cell_obstruction(
-                    TPlotManager._POINT_PERM, tplot.get_cell(Point(x, y))
-                )
+            self._submit(
+                operations.add_single_cell_obstruction, TPlotManager._POINT_PERM, cell
             )
 
     def _cell_insertion_custom(
@@ -1090,21 +2334,12 @@ class TPlotManager(pyglet.event.EventDispatcher, Observer):
             button (int): The mouse button clicked.
             _modifiers (int): If combinded with modifiers (e.g. ctrl). Unused.
         """
-        tplot = self._current()
+        cell = self._current().get_cell(Point(x, y))
+        patt = Perm.to_standard(self._custom_data)
         if button == pyglet.window.mouse.LEFT:
-            self._add_tiling(
-                tplot.tiling.add_single_cell_requirement(
-                    Perm.to_standard(self._custom_data),
-                    tplot.get_cell(Point(x, y)),
-                )
-            )
+            self._submit(operations.add_single_cell_requirement, patt, cell)
         elif button == pyglet.window.mouse.RIGHT:
-            self._add_tiling(
-                tplot.tiling.add_single_cell_obstruction(
-                    Perm.to_standard(self._custom_data),
-                    tplot.get_cell(Point(x, y)),
-                )
-            )
+            self._submit(operations.add_single_cell_obstruction, patt, cell)
 
     def _place_point(
         self, x: int, y: int, _button: int, _modifiers: int, force_dir: int = DIR_NONE
@@ -1121,10 +2356,11 @@ class TPlotManager(pyglet.event.EventDispatcher, Observer):
         tplot = self._current()
         ind = tplot.get_point_req_index(Point(x, y))
         if ind != TPlot.REQ_NOT_FOUND:
-            self._add_tiling(
-                tplot.tiling.place_point_of_gridded_permutation(
-                    tplot.tiling.requirements[ind[0]][ind[1]], ind[2], force_dir
-                )
+            self._submit(
+                operations.place_point,
+                tplot.tiling.requirements[ind[0]][ind[1]],
+                ind[2],
+                force_dir,
             )
 
     def _partial_place_point(
@@ -1142,10 +2378,11 @@ class TPlotManager(pyglet.event.EventDispatcher, Observer):
         tplot = self._current()
         ind = tplot.get_point_req_index(Point(x, y))
         if ind != TPlot.REQ_NOT_FOUND:
-            self._add_tiling(
-                tplot.tiling.partial_place_point_of_gridded_permutation(
-                    tplot.tiling.requirements[ind[0]][ind[1]], ind[2], force_dir
-                )
+            self._submit(
+                operations.partial_place_point,
+                tplot.tiling.requirements[ind[0]][ind[1]],
+                ind[2],
+                force_dir,
             )
 
     def _factor(self, x: int, y: int, _button: int, _modifiers: int) -> None:
@@ -1157,8 +2394,7 @@ class TPlotManager(pyglet.event.EventDispatcher, Observer):
             _button (int): The mouse button clicked. Unused.
             _modifiers (int): If combinded with modifiers (e.g. ctrl). Unused.
         """
-        tplot = self._current()
-        self._factor_from_algorithm(tplot.get_cell(Point(x, y)), Factor(tplot.tiling))
+        self._factor_cell(self._current().get_cell(Point(x, y)), False)
 
     def _factor_with_interleaving(
         self, x: int, y: int, _button: int, _modifiers: int
@@ -1171,10 +2407,53 @@ class TPlotManager(pyglet.event.EventDispatcher, Observer):
             _button (int): The mouse button clicked. Unused.
             _modifiers (int): If combinded with modifiers (e.g. ctrl). Unused.
         """
-        tplot = self._current()
-        self._factor_from_algorithm(
-            tplot.get_cell(Point(x, y)), FactorWithInterleaving(tplot.tiling)
-        )
+        self._factor_cell(self._current().get_cell(Point(x, y)), True)
+
+    def _factor_cell(self, cell: Tuple[int, int], interleaving: bool) -> None:
+        """Build the factor of the current tiling that a cell belongs to. Only that
+        factor is built. The components of the factors are remembered for recent
+        tilings, so they are only found once for each tiling.
+
+        Args:
+            cell (Tuple[int, int]): The cell.
+            interleaving (bool): Allow interleaving factors?
+        """
+        key = (self._current().tiling, interleaving)
+        components = self._factor_components.get(key)
+        if components is None:
+            self._submit(
+                operations.factor,
+                cell,
+                interleaving,
+                unpack=partial(self._unpack_factor, key),
+            )
+            return
+        self._factor_components.move_to_end(key)
+        component = next((comp for comp in components if cell in comp), None)
+        if component is not None:
+            self._submit(operations.factor_component, component)
+
+    def _unpack_factor(
+        self,
+        key: Tuple[Tiling, bool],
+        value: Tuple[Optional[Tiling], Tuple[operations.Component, ...]],
+    ) -> Optional[Tiling]:
+        """Remember the components of a tiling's factors and get the factor.
+
+        Args:
+            key (Tuple[Tiling, bool]): The tiling and whether the factors could
+            interleave.
+            value (Tuple[Optional[Tiling], Tuple[operations.Component, ...]]): The
+            result of operations.factor.
+
+        Returns:
+            Optional[Tiling]: The factor.
+        """
+        fac, components = value
+        self._factor_components[key] = components
+        if len(self._factor_components) > TPlotManager._FACTOR_MEMO_SIZE:
+            self._factor_components.popitem(last=False)
+        return fac
 
     def _fusion(self, x: int, y: int, _button: int, _modifiers: int, row: bool) -> None:
         """Fusion with either the clicked row or column.
@@ -1186,18 +2465,11 @@ class TPlotManager(pyglet.event.EventDispatcher, Observer):
             _modifiers (int): If combinded with modifiers (e.g. ctrl). Unused.
             row (bool): Set row in fusion?
         """
-        tplot = self._current()
-        c, r = tplot.get_cell(Point(x, y))
-        if not self._empty():
-            try:
-                if row:
-                    n_plot = TPlot(tplot.tiling.fusion(row=r), self._w, self._h)
-                else:
-                    n_plot = TPlot(tplot.tiling.fusion(col=c), self._w, self._h)
-                if n_plot is not None:
-                    self._add_plot(n_plot)
-            except (InvalidOperationError, NotImplementedError):
-                pass
+        c, r = self._current().get_cell(Point(x, y))
+        if row:
+            self._submit(operations.fusion, r, None)
+        else:
+            self._submit(operations.fusion, None, c)
 
     def _component_fusion(
         self, x: int, y: int, _button: int, _modifiers: int, row: bool
@@ -1211,22 +2483,11 @@ class TPlotManager(pyglet.event.EventDispatcher, Observer):
             _modifiers (int): If combinded with modifiers (e.g. ctrl). Unused.
             row (bool): Set row in fusion?
         """
-        tplot = self._current()
-        c, r = tplot.get_cell(Point(x, y))
-        if not self._empty():
-            try:
-                if row:
-                    n_plot = TPlot(
-                        tplot.tiling.component_fusion(row=r), self._w, self._h
-                    )
-                else:
-                    n_plot = TPlot(
-                        tplot.tiling.component_fusion(col=c), self._w, self._h
-                    )
-                if n_plot is not None:
-                    self._add_plot(n_plot)
-            except (InvalidOperationError, NotImplementedError):
-                pass
+        c, r = self._current().get_cell(Point(x, y))
+        if row:
+            self._submit(operations.component_fusion, r, None)
+        else:
+            self._submit(operations.component_fusion, None, c)
 
 
 TPlotManager.register_event_type(CustomEvents.ON_EXPORT)
@@ -1,7 +1,9 @@
 """A collection of various utility functionality."""
 
 import datetime
+import time
 
+import psutil
 import pyperclip
 
 
@@ -43,3 +45,21 @@ def clamp(value: float, min_value: float, max_value: float) -> float:
         float: The value clamped between boundaries
     """
     return min(max_value, max(value, min_value))
+
+
+class StartupReport:
+    """Prints how long after the process started each stage of startup was
+    reached.
+    """
+
+    def __init__(self) -> None:
+        """Note when the process started."""
+        self._started: float = psutil.Process().create_time()
+
+    def mark(self, stage: str) -> None:
+        """Print the time it took to reach a stage.
+
+        Args:
+            stage (str): A description of the stage.
+        """
+        print(f"startup: {stage} after {time.time() - self._started:.3f}s")
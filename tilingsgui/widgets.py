@@ -5,7 +5,7 @@ from typing import Callable, ClassVar, Dict, List, Optional, Tuple
 import pyglet
 
 from .geometry import Rectangle
-from .graphics import Color, GeoDrawer
+from .graphics import Color, IconAtlas, ShapeBatch
 
 RGB = Tuple[float, float, float]
 RGBA = Tuple[float, float, float, float]
@@ -16,17 +16,29 @@ class Text:
 
     _LEFT_PAD: ClassVar[int] = 5
 
-    def __init__(self, init_text: str, font_size: int, color: RGBA) -> None:
+    def __init__(
+        self,
+        init_text: str,
+        font_size: int,
+        color: RGBA,
+        shapes: Optional[ShapeBatch] = None,
+        layer: int = 0,
+    ) -> None:
         """Create an instance of a user editable text.
 
         Args:
             init_text (str): The initially set text value.
             font_size (int): The font size for the input field.
             color (Tuple[float, float, float, float]): The font color.
+            shapes (Optional[ShapeBatch], optional): The batch to draw the text in,
+            shared with the component that owns it. Defaults to a batch of its own.
+            layer (int, optional): The layer of the batch to draw the text in.
+            Defaults to 0.
         """
 
         self._font_size: int = font_size
-        self._batch: pyglet.graphics.Batch = pyglet.graphics.Batch()
+        self._shapes: ShapeBatch = ShapeBatch(layer + 1) if shapes is None else shapes
+        batch, group = self._shapes.layer(layer)
         self._document: pyglet.text.document.UnformattedDocument = (
             pyglet.text.document.UnformattedDocument(init_text)
         )
@@ -39,7 +51,8 @@ class Text:
                 width=100,
                 height=20,  # Will be updated in position()
                 multiline=False,
-                batch=self._batch,
+                batch=batch,
+                group=group,
             )
         )
         self._layout.content_valign = "center"
@@ -95,8 +108,8 @@ class Text:
         return self._document.text
 
     def draw(self) -> None:
-        """Draw the text."""
-        self._batch.draw()
+        """Draw the batch the text is in."""
+        self._shapes.draw()
 
     def move_text(self, motion: int) -> None:
         """Update the caret with events such as home, left, right, delete, etc.
@@ -116,6 +129,8 @@ class TextBox(Text):
         font_size: int,
         text_color: RGBA,
         box_color: RGB,
+        shapes: Optional[ShapeBatch] = None,
+        layer: int = 0,
     ) -> None:
         """Create an instance of a text box.
 
@@ -124,16 +139,14 @@ class TextBox(Text):
             font_size (int): The font size of the displayed text.
             text_color (Tuple[float, float, float, float]): The rgba color of the text.
             box_color (Tuple[float, float, float]): The rgb color of the box.
+            shapes (Optional[ShapeBatch], optional): The batch to draw the text box
+            in. Defaults to a batch of its own.
+            layer (int, optional): The layer of the batch to draw the box in, the text
+            is drawn in the one above it. Defaults to 0.
         """
-        super().__init__(init_text, font_size, text_color)
-        box_color_255 = Color.scale_to_255(box_color)
-        self._rectangle = pyglet.shapes.Rectangle(
-            x=0,
-            y=0,
-            width=100,
-            height=20,  # Will be updated in position()
-            color=box_color_255,
-            batch=self._batch,
+        super().__init__(init_text, font_size, text_color, shapes, layer + 1)
+        self._rectangle: pyglet.shapes.Rectangle = self._shapes.add_rectangle(
+            0, 0, 100, 20, box_color, layer  # Will be updated in position()
         )
 
     def position(self, x: float, y: float, w: float, h: float) -> None:
@@ -183,7 +196,10 @@ class Button:
             is called in click_check if the button was clicked. Defaults to None.
         """
         self._sprite: pyglet.sprite.Sprite = pyglet.sprite.Sprite(
-            pyglet.resource.image(image), x=0, y=0
+            IconAtlas.image(image), x=0, y=0
+        )
+        self._background: pyglet.shapes.Rectangle = pyglet.shapes.Rectangle(
+            0, 0, 0, 0, color=Color.scale_to_255(self._background_color())
         )
         self._x: float = 0
         self._y: float = 0
@@ -209,12 +225,21 @@ class Button:
         return False
 
     def draw(self) -> None:
-        """Draw the button."""
-        GeoDrawer.draw_rectangle(
-            self._x, self._y, self._w, self._h, Button._BUTTON_COLOR
-        )
+        """Draw the button on its own, for buttons that are not in a batch."""
+        self._background.draw()
         self._sprite.draw()
 
+    def add_to_batch(self, shapes: ShapeBatch, layer: int) -> None:
+        """Draw the button as part of a batch from now on.
+
+        Args:
+            shapes (ShapeBatch): The batch.
+            layer (int): The layer to draw the button's background in, its symbol
+            is drawn in the one above it.
+        """
+        self._background.batch, self._background.group = shapes.layer(layer)
+        self._sprite.batch, self._sprite.group = shapes.layer(layer + 1)
+
     def position(self, x: float, y: float, w: float, h: float) -> None:
         """Position the button within the viewport.
 
@@ -225,6 +250,8 @@ class Button:
             h (float): The vertical length of the button.
         """
         self._x, self._y, self._w, self._h = x, y, w, h
+        self._background.position = (x, y)
+        self._background.width, self._background.height = w, h
         if w > 0 and h > 0:
             # Scale to fit within the button bounds while maintaining aspect ratio
             # Handle both AbstractImage and Animation types
@@ -259,6 +286,14 @@ class Button:
         """
         return self._x < x < self._x + self._w and self._y < y < self._y + self._h
 
+    def _background_color(self) -> RGB:
+        """Get the color of the button's background.
+
+        Returns:
+            Tuple[float, float, float]: The rgb color.
+        """
+        return Button._BUTTON_COLOR
+
 
 class ToggleButton(Button):
     """A button that is either on or off."""
@@ -279,8 +314,8 @@ class ToggleButton(Button):
             is called in click_check if the button was clicked. Defaults to None.
             toggled (bool, optional): Start as toggled? Defaults to False.
         """
-        super().__init__(image, on_click)
         self._toggled: bool = toggled
+        super().__init__(image, on_click)
 
     def click_check(self, x: float, y: float) -> bool:
         """Checks if the button has been clicked and calls the on_click function
@@ -300,15 +335,26 @@ class ToggleButton(Button):
             return True
         return False
 
-    def draw(self) -> None:
-        """Draw the button."""
-        color = ToggleButton._TOGGLE_COLOR if self._toggled else Button._BUTTON_COLOR
-        GeoDrawer.draw_rectangle(self._x, self._y, self._w, self._h, color)
-        self._sprite.draw()
-
     def toggle(self) -> None:
         """If on, turn off and vice versa."""
-        self._toggled = not self._toggled
+        self._set_toggled(not self._toggled)
+
+    def _set_toggled(self, toggled: bool) -> None:
+        """Turn the button on or off and recolor its background.
+
+        Args:
+            toggled (bool): Turn on?
+        """
+        self._toggled = toggled
+        self._background.color = Color.scale_to_255(self._background_color())
+
+    def _background_color(self) -> RGB:
+        """Get the color of the button's background, which shows if it is on.
+
+        Returns:
+            Tuple[float, float, float]: The rgb color.
+        """
+        return ToggleButton._TOGGLE_COLOR if self._toggled else Button._BUTTON_COLOR
 
 
 class SelectionButton(ToggleButton):
@@ -334,7 +380,7 @@ class SelectionButton(ToggleButton):
             bool: True if clicked.
         """
         if self._hit_test(x, y):
-            self._toggled = True
+            self._set_toggled(True)
             return True
         return False
 
@@ -398,16 +444,25 @@ class SelectionGroup:
 
 
 class ButtonGrid:
-    """A positional object to place and group buttons together."""
+    """A positional object to place and group buttons together. Its buttons are
+    drawn in one batch, which is only changed when they are moved or toggled.
+    """
 
     _PADDING: ClassVar[int] = 2
 
-    def __init__(self, r: int, c: int) -> None:
+    def __init__(
+        self, r: int, c: int, shapes: Optional[ShapeBatch] = None, layer: int = 0
+    ) -> None:
         """Create a button grid with r rows and c columns.
 
         Args:
             r (int): The number of rows.
             c (int): The number of columns.
+            shapes (Optional[ShapeBatch], optional): The batch to draw the buttons
+            in. Defaults to a batch of its own.
+            layer (int, optional): The layer of the batch to draw the backgrounds
+            of the buttons in, their symbols are drawn in the one above it.
+            Defaults to 0.
         """
         self.rect: Rectangle = Rectangle(0, 0, 0, 0)
         self.button_w: float = 0
@@ -416,6 +471,8 @@ class ButtonGrid:
             [None for _ in range(c)] for _ in range(r)
         ]
         self.selection_groups: List[SelectionGroup] = []
+        self._shapes: ShapeBatch = ShapeBatch(layer + 2) if shapes is None else shapes
+        self._layer: int = layer
 
     def add_selection_group(
         self, grp: List[Tuple[int, int]], on_click: Optional[Callable[[int], None]]
@@ -453,13 +510,11 @@ class ButtonGrid:
             btn (Button): The button to add.
         """
         self.buttons[r][c] = btn
+        btn.add_to_batch(self._shapes, self._layer)
 
     def draw(self) -> None:
-        """Draw the button grid and all its buttons."""
-        for row in self.buttons:
-            for button in row:
-                if button is not None:
-                    button.draw()
+        """Draw the batch the button grid is in."""
+        self._shapes.draw()
 
     def click_check(self, x: float, y: float) -> None:
         """Check if the click coordinate (x, y) is within the grid and if so,
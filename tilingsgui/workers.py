@@ -0,0 +1,328 @@
+"""Running tiling operations in worker processes, so that the window stays
+responsive while they run. This module must not import pyglet as the worker
+processes import it.
+"""
+
+import importlib
+import multiprocessing
+import os
+import signal
+import time
+from collections import deque
+from multiprocessing.connection import Connection
+from typing import (
+    Any,
+    Callable,
+    ClassVar,
+    Deque,
+    List,
+    NamedTuple,
+    Optional,
+    Sequence,
+    Tuple,
+)
+
+import psutil
+
+
+class Limits(NamedTuple):
+    """Resource limits for a job. None means unlimited."""
+
+    seconds: Optional[float] = None
+    rss: Optional[int] = None
+
+    @classmethod
+    def default(cls) -> "Limits":
+        """The limits used unless configured otherwise: no time limit and half of
+        the machine's memory.
+
+        Returns:
+            Limits: The default limits.
+        """
+        return cls(seconds=None, rss=psutil.virtual_memory().total // 2)
+
+
+Job = Tuple[int, Callable[..., Any], Tuple[Any, ...], Limits]
+
+
+class WorkerDiedError(Exception):
+    """Raised in place of a result when the worker running a job exits."""
+
+
+class LimitExceededError(Exception):
+    """Raised in place of a result when a job exceeds one of its limits. The
+    worker running it is stopped.
+    """
+
+
+class TimeLimitExceededError(LimitExceededError):
+    """Raised in place of a result when a job runs for too long."""
+
+
+class MemoryLimitExceededError(LimitExceededError):
+    """Raised in place of a result when a job uses too much memory."""
+
+
+class JobResult(NamedTuple):
+    """The outcome of a job. Exactly one of value and error is meaningful."""
+
+    job_id: int
+    value: Any
+    error: Optional[BaseException]
+
+
+def _exit(_signum: int, _frame: Any) -> None:
+    """Signal handler that exits normally, so that the worker cleans up the
+    resources its imports created.
+    """
+    raise SystemExit(0)
+
+
+def _work(conn: Connection, preload: Sequence[str]) -> None:
+    """The main loop of a worker process. Receives jobs and sends back results
+    until told to stop.
+
+    Args:
+        conn (Connection): The worker's end of the pipe to the pool.
+        preload (Sequence[str]): Modules to import before waiting for jobs.
+    """
+    signal.signal(signal.SIGTERM, _exit)
+    for module in preload:
+        importlib.import_module(module)
+    while True:
+        try:
+            job = conn.recv()
+        except (EOFError, KeyboardInterrupt):
+            return
+        if job is None:
+            return
+        job_id, func, args, _ = job
+        try:
+            result = JobResult(job_id, func(*args), None)
+        except Exception as exc:  # pylint: disable=broad-except
+            result = JobResult(job_id, None, exc)
+        try:
+            conn.send(result)
+        except Exception as exc:  # pylint: disable=broad-except
+            conn.send(JobResult(job_id, None, RuntimeError(repr(exc))))
+
+
+class _Worker:
+    """A single worker process and the pool's end of the pipe to it."""
+
+    _STOP_TIMEOUT: ClassVar[float] = 1.0
+    _TERMINATE_TIMEOUT: ClassVar[float] = 0.5
+
+    def __init__(self, context: Any, preload: Sequence[str]) -> None:
+        """Start a worker process.
+
+        Args:
+            context (Any): The multiprocessing context to create it with.
+            preload (Sequence[str]): Modules the worker imports when it starts.
+        """
+        self._conn, child_conn = context.Pipe()
+        self._process = context.Process(
+            target=_work, args=(child_conn, tuple(preload)), daemon=True
+        )
+        self._process.start()
+        child_conn.close()
+        self.job_id: Optional[int] = None
+        self._limits: Limits = Limits()
+        self._started: float = 0.0
+
+    def send(self, job: Job) -> None:
+        """Hand a job to the worker, which must be idle.
+
+        Args:
+            job (Job): The job id, function, its arguments and limits.
+        """
+        self.job_id = job[0]
+        self._limits = job[3]
+        self._started = time.monotonic()
+        self._conn.send(job)
+
+    def exceeded_limit(self) -> Optional[LimitExceededError]:
+        """Check if the job the worker is running has exceeded its limits.
+
+        Returns:
+            Optional[LimitExceededError]: The exceeded limit, if any.
+        """
+        if self.job_id is None:
+            return None
+        seconds, rss = self._limits
+        if seconds is not None and time.monotonic() - self._started > seconds:
+            return TimeLimitExceededError(f"exceeded the time limit of {seconds:g}s")
+        if rss is not None:
+            try:
+                used = psutil.Process(self._process.pid).memory_info().rss
+            except psutil.Error:
+                return None
+            if used > rss:
+                return MemoryLimitExceededError(
+                    f"exceeded the memory limit of {rss / 2**20:g}MiB"
+                )
+        return None
+
+    def receive(self) -> Optional[JobResult]:
+        """Get the result of the worker's job without blocking.
+
+        Returns:
+            Optional[JobResult]: The result if the job is finished, else None.
+        """
+        if self.job_id is None:
+            return None
+        try:
+            if not self._conn.poll():
+                return None
+            result: JobResult = self._conn.recv()
+        except (EOFError, OSError):
+            result = JobResult(
+                self.job_id, None, WorkerDiedError("the worker process exited")
+            )
+        self.job_id = None
+        return result
+
+    def stop(self) -> None:
+        """Ask the worker to finish and wait a moment for it to do so."""
+        try:
+            self._conn.send(None)
+        except (BrokenPipeError, OSError):
+            pass
+        self._process.join(_Worker._STOP_TIMEOUT)
+        self.kill()
+
+    def kill(self) -> None:
+        """End the worker process now. It is given a moment to exit cleanly before
+        it is killed.
+        """
+        if self._process.is_alive():
+            self._process.terminate()
+            self._process.join(_Worker._TERMINATE_TIMEOUT)
+        if self._process.is_alive():
+            self._process.kill()
+            self._process.join()
+        self._conn.close()
+
+
+class WorkerPool:
+    """A pool of worker processes that runs jobs in the background. Jobs are
+    started in the order they are submitted and their results are collected by
+    calling poll, which never blocks.
+    """
+
+    def __init__(self, size: Optional[int] = None, preload: Sequence[str] = ()) -> None:
+        """Create a pool, its processes are started on demand or by start().
+
+        Args:
+            size (Optional[int]): The most processes to run at once. Defaults to
+            one less than the number of cpus, but at least 1 and at most 4.
+            preload (Sequence[str]): Modules each worker imports when it starts,
+            so that the first job does not pay for it. Defaults to none.
+        """
+        self._context = multiprocessing.get_context("spawn")
+        self._size: int = size or max(1, min(4, (os.cpu_count() or 2) - 1))
+        self._preload: Tuple[str, ...] = tuple(preload)
+        self._workers: List[_Worker] = []
+        self._queue: Deque[Job] = deque()
+        self._next_id: int = 0
+
+    def start(self) -> None:
+        """Start all worker processes now rather than when jobs arrive."""
+        while len(self._workers) < self._size:
+            self._workers.append(_Worker(self._context, self._preload))
+
+    def submit(
+        self, func: Callable[..., Any], *args: Any, limits: Limits = Limits()
+    ) -> int:
+        """Queue a job. Both the function and the arguments must be picklable and
+        the function must be importable without importing pyglet.
+
+        Args:
+            func (Callable[..., Any]): A module level function.
+            args (Any): The arguments to call it with.
+            limits (Limits): The time and memory the job may use once started.
+            Defaults to no limits.
+
+        Returns:
+            int: The id of the job, which its result will carry.
+        """
+        job_id = self._next_id
+        self._next_id += 1
+        self._queue.append((job_id, func, args, limits))
+        self._dispatch()
+        return job_id
+
+    def poll(self) -> List[JobResult]:
+        """Collect the results of finished jobs and start queued ones.
+
+        Returns:
+            List[JobResult]: The results that have arrived since the last poll.
+        """
+        results = []
+        for i, worker in enumerate(self._workers):
+            result = worker.receive()
+            if result is None and worker.job_id is not None:
+                error = worker.exceeded_limit()
+                if error is not None:
+                    result = JobResult(worker.job_id, None, error)
+            if result is not None:
+                results.append(result)
+                if isinstance(result.error, (WorkerDiedError, LimitExceededError)):
+                    self._replace(i)
+        self._dispatch()
+        return results
+
+    def cancel(self, job_id: int) -> None:
+        """Cancel a job. If it is running, its worker is stopped and replaced. No
+        result is returned for it.
+
+        Args:
+            job_id (int): The id of the job.
+        """
+        for job in self._queue:
+            if job[0] == job_id:
+                self._queue.remove(job)
+                return
+        for i, worker in enumerate(self._workers):
+            if worker.job_id == job_id:
+                self._replace(i)
+                self._dispatch()
+                return
+
+    def pending(self) -> int:
+        """The number of jobs that are queued or running.
+
+        Returns:
+            int: The number of unfinished jobs.
+        """
+        return len(self._queue) + sum(w.job_id is not None for w in self._workers)
+
+    def close(self) -> None:
+        """Drop all queued jobs and stop all workers."""
+        self._queue.clear()
+        for worker in self._workers:
+            if worker.job_id is None:
+                worker.stop()
+            else:
+                worker.kill()
+        self._workers.clear()
+
+    def _replace(self, index: int) -> None:
+        """Kill a worker and start a new one in its place.
+
+        Args:
+            index (int): The worker's index.
+        """
+        self._workers[index].kill()
+        self._workers[index] = _Worker(self._context, self._preload)
+
+    def _dispatch(self) -> None:
+        """Hand queued jobs to idle workers, starting new workers if needed."""
+        while self._queue:
+            worker = next((w for w in self._workers if w.job_id is None), None)
+            if worker is None:
+                if len(self._workers) >= self._size:
+                    return
+                worker = _Worker(self._context, self._preload)
+                self._workers.append(worker)
+            worker.send(self._queue.popleft())